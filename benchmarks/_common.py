@@ -0,0 +1,79 @@
+"""
+Shared helpers for the benchmarks.
+
+The benchmarks do not need a running Netbox instance: HTTP requests are served
+by an in-process transport, so that only the client-side overhead is measured.
+"""
+
+from typing import Any
+
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+import time
+import json
+
+import yaml
+
+
+ROOT_DIR = Path(__file__).parent.parent
+
+
+def load_schema(version: str = "v4.x") -> dict[str, Any]:
+    """
+    Load one of the OpenAPI schemas bundled with the test suite, preferring the
+    JSON file when it is available.
+    """
+
+    schema_dir = ROOT_DIR / "tests" / f"netbox-{version}"
+    json_path = schema_dir / "openapi.json"
+
+    if json_path.exists():
+        with open(json_path) as file:
+            return json.load(file)
+
+    with open(schema_dir / "openapi.yml") as file:
+        return yaml.load(file, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+
+
+def make_site(obj_id: int) -> dict[str, Any]:
+    return {
+        "id": obj_id,
+        "url": f"http://netbox.local/api/dcim/sites/{obj_id}/",
+        "display_url": f"http://netbox.local/dcim/sites/{obj_id}/",
+        "display": f"site-{obj_id}",
+        "name": f"site-{obj_id}",
+        "slug": f"site-{obj_id}",
+        "status": {"value": "active", "label": "Active"},
+        "tags": [],
+        "custom_fields": {},
+    }
+
+
+async def measure(
+    func: Callable[[], Awaitable[Any]],
+    duration: float = 2.0,
+) -> float:
+    """
+    Call ``func`` repeatedly for ``duration`` seconds.
+
+    :return: The number of calls per second.
+    """
+
+    await func()
+
+    count = 0
+    start = time.perf_counter()
+    deadline = start + duration
+
+    while (now := time.perf_counter()) < deadline:
+        await func()
+        count += 1
+
+    return count / (now - start)
+
+
+def report(name: str, before: float, after: float) -> None:
+    print(
+        f"{name:<40} before={before:>10.1f}/s  after={after:>10.1f}/s  "
+        f"speedup={after / before:>6.1f}x"
+    )
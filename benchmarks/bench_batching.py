@@ -0,0 +1,93 @@
+"""
+Simulate handlers concurrently looking up related objects by ID, with and
+without retrieve batching.
+
+Usage::
+
+   python benchmarks/bench_batching.py
+"""
+
+from functools import partial
+import time
+
+import anyio
+
+from httpx import AsyncClient, MockTransport, Request, Response
+
+from nopf.client._validator import SchemaValidators
+from nopf.client.batching import RetrieveBatcher
+from nopf.client.operation import Operation
+
+from _common import load_schema, make_site
+
+
+LATENCY = 0.005
+LOOKUPS = 500
+# Netbox serves a limited number of requests concurrently.
+SERVER_WORKERS = 8
+
+
+async def main() -> None:
+    root_schema = load_schema("v4.x")
+    validators = SchemaValidators(root_schema)
+    workers = anyio.Semaphore(SERVER_WORKERS)
+    requests = 0
+
+    async def handler(request: Request) -> Response:
+        nonlocal requests
+        requests += 1
+
+        async with workers:
+            await anyio.sleep(LATENCY)
+
+        if request.url.path == "/api/dcim/sites/":
+            object_ids = [int(obj_id) for obj_id in request.url.params.get_list("id")]
+            return Response(
+                200,
+                json={
+                    "count": len(object_ids),
+                    "next": None,
+                    "previous": None,
+                    "results": [make_site(obj_id) for obj_id in object_ids],
+                },
+            )
+
+        obj_id = int(request.url.path.rstrip("/").rsplit("/", 1)[-1])
+        return Response(200, json=make_site(obj_id))
+
+    client = AsyncClient(
+        base_url="http://netbox.local",
+        transport=MockTransport(handler),
+    )
+    list_operation = Operation(
+        client,
+        "get",
+        "/api/dcim/sites/",
+        root_schema["paths"]["/api/dcim/sites/"]["get"],
+        validators,
+    )
+
+    for batcher in [None, RetrieveBatcher(window=0, max_size=100)]:
+        operation = Operation(
+            client,
+            "get",
+            "/api/dcim/sites/{id}/",
+            root_schema["paths"]["/api/dcim/sites/{id}/"]["get"],
+            validators,
+            batcher=batcher,
+            list_operation=lambda: list_operation,
+        )
+        requests = 0
+        started_at = time.perf_counter()
+
+        async with anyio.create_task_group() as tg:
+            for obj_id in range(1, LOOKUPS + 1):
+                tg.start_soon(partial(operation, params={"id": obj_id}))
+
+        duration = time.perf_counter() - started_at
+        name = "batched" if batcher else "unbatched"
+        print(f"{name:<10} lookups={LOOKUPS} requests={requests:<4} {duration:.2f}s")
+
+
+if __name__ == "__main__":
+    anyio.run(main)
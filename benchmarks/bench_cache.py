@@ -0,0 +1,63 @@
+"""
+Compare repeated reads of the same objects with and without the read cache,
+against a transport simulating a fixed server-side latency.
+
+Usage::
+
+   python benchmarks/bench_cache.py
+"""
+
+import random
+
+import anyio
+
+from httpx import AsyncClient, MockTransport, Request, Response
+
+from nopf.client._validator import SchemaValidators
+from nopf.client.cache import ResponseCache
+from nopf.client.operation import Operation
+
+from _common import load_schema, make_site, measure, report
+
+
+LATENCY = 0.005
+OBJECT_COUNT = 50
+
+
+async def main() -> None:
+    root_schema = load_schema("v4.x")
+    validators = SchemaValidators(root_schema)
+
+    async def handler(request: Request) -> Response:
+        await anyio.sleep(LATENCY)
+        obj_id = int(request.url.path.rstrip("/").rsplit("/", 1)[-1])
+        return Response(200, json=make_site(obj_id))
+
+    client = AsyncClient(
+        base_url="http://netbox.local",
+        transport=MockTransport(handler),
+    )
+
+    def make_operation(cache: ResponseCache | None) -> Operation:
+        return Operation(
+            client,
+            "get",
+            "/api/dcim/sites/{id}/",
+            root_schema["paths"]["/api/dcim/sites/{id}/"]["get"],
+            validators,
+            cache=cache,
+        )
+
+    uncached = make_operation(None)
+    cached = make_operation(ResponseCache(max_size=1000, ttl=60))
+
+    async def read(operation: Operation) -> None:
+        await operation(params={"id": random.randint(1, OBJECT_COUNT)})
+
+    before = await measure(lambda: read(uncached))
+    after = await measure(lambda: read(cached))
+    report(f"dcim_sites_retrieve ({OBJECT_COUNT} objects)", before, after)
+
+
+if __name__ == "__main__":
+    anyio.run(main)
@@ -0,0 +1,77 @@
+"""
+Measure what building every operation upfront costs at startup, in time and
+resident memory, compared to building them on first lookup.
+
+Usage::
+
+   python benchmarks/bench_client_startup.py
+"""
+
+from pathlib import Path
+import tempfile
+import json
+import time
+import gc
+
+from nopf.client import NetboxClient
+from nopf.settings import Settings
+
+from _common import load_schema
+
+
+def rss() -> int:
+    with open("/proc/self/statm") as file:
+        pages = int(file.read().split()[1])
+
+    return pages * 4096
+
+
+def main() -> None:
+    for version in ["v3.6.x", "v4.x"]:
+        schema = load_schema(version)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            schema_path = Path(tmpdir) / "openapi.json"
+
+            with open(schema_path, "w") as file:
+                json.dump(schema, file)
+
+            settings = Settings(
+                netbox_api="http://netbox.local",
+                netbox_token="t0k3n",
+                netbox_schema=str(schema_path),
+                server_callback_name="bench",
+            )
+
+            gc.collect()
+            rss_before = rss()
+            started_at = time.perf_counter()
+            client = NetboxClient(settings)
+            lazy_duration = time.perf_counter() - started_at
+            gc.collect()
+            lazy_rss = rss() - rss_before
+
+            operation_ids = [
+                operation_spec["operationId"]
+                for path_spec in client._schema["paths"].values()
+                for operation_spec in path_spec.values()
+            ]
+
+            # Building every operation is what the client used to do eagerly.
+            started_at = time.perf_counter()
+            for operation_id in operation_ids:
+                getattr(client.operations, operation_id)
+            eager_duration = time.perf_counter() - started_at
+            gc.collect()
+            eager_rss = rss() - rss_before - lazy_rss
+
+        print(
+            f"{version:<8} operations={len(operation_ids):<5} "
+            f"client init={lazy_duration:.2f}s  "
+            f"saved: {eager_duration * 1000:.1f}ms, "
+            f"{eager_rss / 1024 / 1024:.1f}MiB RSS"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Simulate a burst of handlers concurrently reading the same site, with
+and without request coalescing.
+
+Usage::
+
+   python benchmarks/bench_coalescing.py
+"""
+
+from functools import partial
+import time
+
+import anyio
+
+from httpx import AsyncClient, MockTransport, Request, Response
+
+from nopf.client._validator import SchemaValidators
+from nopf.client.coalescing import RequestCoalescer
+from nopf.client.operation import Operation
+
+from _common import load_schema, make_site
+
+
+LATENCY = 0.005
+BURST = 500
+# Netbox serves a limited number of requests concurrently.
+SERVER_WORKERS = 8
+
+
+async def main() -> None:
+    root_schema = load_schema("v4.x")
+    validators = SchemaValidators(root_schema)
+    workers = anyio.Semaphore(SERVER_WORKERS)
+    requests = 0
+
+    async def handler(request: Request) -> Response:
+        nonlocal requests
+        requests += 1
+
+        async with workers:
+            await anyio.sleep(LATENCY)
+
+        return Response(200, json=make_site(1))
+
+    client = AsyncClient(
+        base_url="http://netbox.local",
+        transport=MockTransport(handler),
+    )
+
+    for coalescer in [None, RequestCoalescer()]:
+        operation = Operation(
+            client,
+            "get",
+            "/api/dcim/sites/{id}/",
+            root_schema["paths"]["/api/dcim/sites/{id}/"]["get"],
+            validators,
+            coalescer=coalescer,
+        )
+        requests = 0
+        started_at = time.perf_counter()
+
+        async with anyio.create_task_group() as tg:
+            for _ in range(BURST):
+                tg.start_soon(partial(operation, params={"id": 1}))
+
+        duration = time.perf_counter() - started_at
+        name = "coalesced" if coalescer else "uncoalesced"
+        print(f"{name:<12} burst={BURST} requests={requests:<4} {duration:.2f}s")
+
+
+if __name__ == "__main__":
+    anyio.run(main)
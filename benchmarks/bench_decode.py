@@ -0,0 +1,44 @@
+"""
+Compare the cost of decoding list responses twice (for validation, then by the
+caller) with decoding them once through ``Result``, with the standard library
+and with ``orjson`` when it is installed.
+
+Usage::
+
+   python benchmarks/bench_decode.py
+"""
+
+import json
+
+import anyio
+
+from nopf.client import operation as operation_module
+
+from _common import make_site, measure, report
+
+
+async def main() -> None:
+    body = json.dumps(
+        {
+            "count": 1000,
+            "next": None,
+            "previous": None,
+            "results": [make_site(obj_id) for obj_id in range(1000)],
+        }
+    ).encode()
+
+    async def decode_twice() -> None:
+        json.loads(body)
+        json.loads(body)
+
+    async def decode_once() -> None:
+        operation_module.json_loads(body)
+
+    before = await measure(decode_twice)
+    after = await measure(decode_once)
+    name = operation_module.json_loads.__module__
+    report(f"list of 1000 sites (decoder: {name})", before, after)
+
+
+if __name__ == "__main__":
+    anyio.run(main)
@@ -0,0 +1,97 @@
+"""
+Simulate reads served by a Netbox where a few gunicorn workers are slow, with
+and without request hedging, and compare their latency percentiles.
+
+Usage::
+
+   python benchmarks/bench_hedging.py
+"""
+
+import random
+import time
+
+import anyio
+
+from httpx import AsyncClient, MockTransport, Request, Response
+
+from nopf.client._validator import SchemaValidators
+from nopf.client.hedging import RequestHedger
+from nopf.client.operation import Operation, ValidationPolicy
+
+from _common import load_schema, make_site
+
+
+LATENCY = 0.002
+SLOW_LATENCY = 0.1
+# Share of the requests served by a slow worker.
+SLOW_RATE = 0.03
+REQUESTS = 1000
+CONCURRENCY = 8
+
+
+def percentile(samples: list[float], percent: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(percent / 100 * len(samples)))]
+
+
+async def main() -> None:
+    root_schema = load_schema("v4.x")
+    validators = SchemaValidators(root_schema)
+    requests = 0
+
+    async def handler(request: Request) -> Response:
+        nonlocal requests
+        requests += 1
+
+        slow = random.random() < SLOW_RATE
+        await anyio.sleep(SLOW_LATENCY if slow else LATENCY)
+        return Response(200, json=make_site(1))
+
+    client = AsyncClient(
+        base_url="http://netbox.local",
+        transport=MockTransport(handler),
+    )
+
+    for name, hedger in [
+        ("plain", None),
+        ("hedged", RequestHedger(percentile=95.0, budget=5.0)),
+    ]:
+        random.seed(0)
+        operation = Operation(
+            client,
+            "get",
+            "/api/dcim/sites/{id}/",
+            root_schema["paths"]["/api/dcim/sites/{id}/"]["get"],
+            validators,
+            # Only the network latency is of interest here.
+            validation=ValidationPolicy(mode="off"),
+            hedger=hedger,
+        )
+        latencies: list[float] = []
+        requests = 0
+        limit = anyio.Semaphore(CONCURRENCY)
+
+        async def retrieve(
+            operation: Operation = operation,
+            latencies: list[float] = latencies,
+            limit: anyio.Semaphore = limit,
+        ) -> None:
+            async with limit:
+                started_at = time.perf_counter()
+                await operation(params={"id": 1})
+                latencies.append(time.perf_counter() - started_at)
+
+        async with anyio.create_task_group() as tg:
+            for _ in range(REQUESTS):
+                tg.start_soon(retrieve)
+
+        print(
+            f"{name:<7} requests={requests:<5} "
+            f"p50={percentile(latencies, 50) * 1000:.1f}ms "
+            f"p99={percentile(latencies, 99) * 1000:.1f}ms "
+            f"max={max(latencies) * 1000:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    anyio.run(main)
@@ -0,0 +1,129 @@
+"""
+Compare fetching every object of a model by following ``next`` links one page
+at a time, with ``Operation.iterate`` and ``Operation.paginate`` fetching
+pages concurrently.
+
+The transport simulates a fixed server-side latency per page. Response
+validation is disabled, so that only the network round-trips are compared.
+
+Usage::
+
+   python benchmarks/bench_iterate.py
+"""
+
+from typing import Any
+
+import time
+
+import anyio
+
+from httpx import AsyncClient, MockTransport, Request, Response
+
+from nopf.client._validator import SchemaValidators
+from nopf.client.operation import Operation, ValidationPolicy
+
+from _common import load_schema, make_site
+
+
+OBJECT_COUNT = 5000
+PAGE_SIZE = 100
+LATENCY = 0.02
+
+
+async def main() -> None:
+    root_schema = load_schema("v4.x")
+    sites = [make_site(obj_id) for obj_id in range(1, OBJECT_COUNT + 1)]
+
+    async def handler(request: Request) -> Response:
+        limit = int(request.url.params["limit"])
+        offset = int(request.url.params["offset"])
+        await anyio.sleep(LATENCY)
+
+        next_url = None
+        if offset + limit < len(sites):
+            next_url = str(
+                request.url.copy_merge_params({"offset": offset + limit}),
+            )
+
+        return Response(
+            200,
+            json={
+                "count": len(sites),
+                "next": next_url,
+                "previous": None,
+                "results": sites[offset : offset + limit],
+            },
+        )
+
+    client = AsyncClient(
+        base_url="http://netbox.local",
+        transport=MockTransport(handler),
+    )
+    operation = Operation(
+        client,
+        "get",
+        "/api/dcim/sites/",
+        root_schema["paths"]["/api/dcim/sites/"]["get"],
+        SchemaValidators(root_schema),
+        ValidationPolicy(mode="off"),
+    )
+
+    async def follow_next() -> list[Any]:
+        results: list[Any] = []
+        offset = 0
+
+        while True:
+            response = await operation(
+                params={"limit": PAGE_SIZE, "offset": offset},
+            )
+            page = response.json()
+            results.extend(page["results"])
+
+            if page["next"] is None:
+                return results
+
+            offset += PAGE_SIZE
+
+    started_at = time.perf_counter()
+    assert len(await follow_next()) == OBJECT_COUNT
+    sequential = time.perf_counter() - started_at
+
+    print(f"{'follow next':<20} {sequential:.2f}s")
+
+    for concurrency in [1, 4, 8, 16]:
+        started_at = time.perf_counter()
+        results = [
+            item
+            async for item in operation.iterate(
+                page_size=PAGE_SIZE,
+                concurrency=concurrency,
+            )
+        ]
+        assert len(results) == OBJECT_COUNT
+        duration = time.perf_counter() - started_at
+
+        print(
+            f"{f'iterate x{concurrency}':<20} {duration:.2f}s  "
+            f"speedup={sequential / duration:.1f}x"
+        )
+
+    for concurrency in [1, 4, 8, 16]:
+        started_at = time.perf_counter()
+
+        async with operation.paginate(
+            page_size=PAGE_SIZE,
+            concurrency=concurrency,
+        ) as items:
+            results = [item async for item in items]
+
+        assert len(results) == OBJECT_COUNT
+        duration = time.perf_counter() - started_at
+
+        print(
+            f"{f'paginate x{concurrency}':<20} {duration:.2f}s  "
+            f"speedup={sequential / duration:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    anyio.run(main)
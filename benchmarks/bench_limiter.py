@@ -0,0 +1,105 @@
+"""
+Simulate a burst of handlers reading sites from an overloaded Netbox, which
+rejects requests with a ``503`` once its backlog is full, with and without
+the adaptive concurrency limiter.
+
+Usage::
+
+   python benchmarks/bench_limiter.py
+"""
+
+import time
+
+import anyio
+
+from httpx import AsyncClient, MockTransport, Request, Response
+
+from nopf.client._validator import SchemaValidators
+from nopf.client.limiter import AdaptiveLimiter
+from nopf.client.operation import Operation
+
+from _common import load_schema, make_site
+
+
+LATENCY = 0.005
+BURST = 500
+# Netbox serves a limited number of requests concurrently, and queues a
+# limited number of them.
+SERVER_WORKERS = 8
+SERVER_BACKLOG = 16
+
+
+async def main() -> None:
+    root_schema = load_schema("v4.x")
+    validators = SchemaValidators(root_schema)
+    workers = anyio.Semaphore(SERVER_WORKERS)
+    pending = 0
+
+    async def handler(request: Request) -> Response:
+        nonlocal pending
+
+        if pending >= SERVER_WORKERS + SERVER_BACKLOG:
+            return Response(503, headers={"Retry-After": "0.01"})
+
+        pending += 1
+
+        try:
+            async with workers:
+                await anyio.sleep(LATENCY)
+
+        finally:
+            pending -= 1
+
+        object_id = int(request.url.path.rstrip("/").rsplit("/", 1)[-1])
+        return Response(200, json=make_site(object_id))
+
+    client = AsyncClient(
+        base_url="http://netbox.local",
+        transport=MockTransport(handler),
+    )
+
+    for name, limiter in [
+        ("unlimited", None),
+        (
+            "adaptive",
+            AdaptiveLimiter(
+                initial_limit=10,
+                max_limit=100,
+                latency_threshold=1.0,
+                failure_threshold=0,
+                recovery_time=0,
+            ),
+        ),
+    ]:
+        operation = Operation(
+            client,
+            "get",
+            "/api/dcim/sites/{id}/",
+            root_schema["paths"]["/api/dcim/sites/{id}/"]["get"],
+            validators,
+            limiter=limiter,
+        )
+        statuses: dict[int, int] = {}
+        started_at = time.perf_counter()
+
+        async def retrieve(
+            object_id: int,
+            operation: Operation = operation,
+            statuses: dict[int, int] = statuses,
+        ) -> None:
+            result = await operation(params={"id": object_id})
+            statuses[result.status_code] = statuses.get(result.status_code, 0) + 1
+
+        async with anyio.create_task_group() as tg:
+            for object_id in range(1, BURST + 1):
+                tg.start_soon(retrieve, object_id)
+
+        duration = time.perf_counter() - started_at
+        print(
+            f"{name:<10} requests={BURST} ok={statuses.get(200, 0):<4} "
+            f"rejected={statuses.get(503, 0):<4} {duration:.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    anyio.run(main)
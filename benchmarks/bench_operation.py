@@ -0,0 +1,106 @@
+"""
+Compare the per-call overhead of ``Operation`` before and after validators are
+compiled once per operation.
+
+Usage::
+
+   python benchmarks/bench_operation.py
+"""
+
+from typing import Any
+
+from copy import deepcopy
+
+import anyio
+
+from httpx import AsyncClient, MockTransport, Request, Response
+
+from nopf.client._validator import FixedOAS30Validator, SchemaValidators
+from nopf.client.operation import Operation
+
+from _common import load_schema, make_site, measure, report
+
+
+def legacy_validate(
+    root_schema: dict[str, Any],
+    operation_spec: dict[str, Any],
+    params: dict[str, Any],
+    status_code: str,
+    payload: Any,
+) -> None:
+    # Validation as performed by ``Operation.__call__`` before validators were
+    # compiled once and cached.
+    for param_spec in operation_spec.get("parameters", []):
+        if param_spec["name"] in params:
+            schema = deepcopy(param_spec["schema"])
+            schema["components"] = root_schema["components"]
+            FixedOAS30Validator(schema).validate(params[param_spec["name"]])
+
+    response_spec = operation_spec["responses"][status_code]
+    schema = deepcopy(response_spec["content"]["application/json"]["schema"])
+    schema["components"] = root_schema["components"]
+    FixedOAS30Validator(schema).validate(payload)
+
+
+async def main() -> None:
+    root_schema = load_schema("v4.x")
+
+    cases = [
+        (
+            "dcim_sites_retrieve",
+            "/api/dcim/sites/{id}/",
+            {"id": 1},
+            make_site(1),
+        ),
+        (
+            "dcim_sites_list",
+            "/api/dcim/sites/",
+            {"name": ["site-1"], "limit": 50},
+            {
+                "count": 50,
+                "next": None,
+                "previous": None,
+                "results": [make_site(i) for i in range(50)],
+            },
+        ),
+    ]
+
+    for operation_id, path, params, payload in cases:
+        operation_spec = root_schema["paths"][path]["get"]
+        assert operation_spec["operationId"] == operation_id
+
+        def handler(request: Request, payload: Any = payload) -> Response:
+            return Response(200, json=payload)
+
+        client = AsyncClient(
+            base_url="http://netbox.local",
+            transport=MockTransport(handler),
+        )
+        operation = Operation(
+            client,
+            "get",
+            path,
+            operation_spec,
+            SchemaValidators(root_schema),
+        )
+
+        async def legacy_call(
+            client: AsyncClient = client,
+            path: str = path,
+            params: dict[str, Any] = params,
+            operation_spec: dict[str, Any] = operation_spec,
+        ) -> None:
+            response = await client.get(path.format(**params), params=params)
+            legacy_validate(root_schema, operation_spec, params, "200", response.json())
+
+        async def call(
+            operation: Operation = operation,
+            params: dict[str, Any] = params,
+        ) -> None:
+            await operation(params=params)
+
+        report(operation_id, await measure(legacy_call), await measure(call))
+
+
+if __name__ == "__main__":
+    anyio.run(main)
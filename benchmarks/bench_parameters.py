@@ -0,0 +1,100 @@
+"""
+Compare the cost of preparing a request for ``dcim_devices_list`` (several
+hundred declared query filters) when scanning every declared parameter, and
+when looking up only the supplied parameters in the pre-computed index.
+
+Usage::
+
+   python benchmarks/bench_parameters.py
+"""
+
+from typing import Any
+
+import anyio
+
+from httpx import AsyncClient
+
+from nopf.client._validator import SchemaValidators, json_pointer
+from nopf.client.operation import Operation
+
+from _common import load_schema, measure, report
+
+
+def legacy_prepare(
+    operation: Operation,
+    validators: SchemaValidators,
+    operation_spec: dict[str, Any],
+    path: str,
+    params: dict[str, Any],
+) -> tuple[str, dict[str, list[Any]]]:
+    # Parameter handling as performed by ``Operation.__call__`` before the
+    # parameters were indexed (with validators already cached).
+    path_params: dict[str, Any] = {}
+    query_params: dict[str, list[Any]] = {}
+
+    for param_index, param_spec in enumerate(operation_spec.get("parameters", [])):
+        param_name = param_spec["name"]
+
+        if param_spec.get("required", False) and param_name not in params:
+            raise ValueError(f"Missing parameter: {param_name}")
+
+        if param_name in params:
+            param_value = params[param_name]
+            validators.get(
+                json_pointer("paths", path, "get", "parameters", str(param_index))
+                + "/schema"
+            ).validate(param_value)
+
+            match param_spec["in"]:
+                case "path":
+                    path_params[param_name] = param_value
+
+                case "query":
+                    if not isinstance(param_value, list):
+                        param_value = [param_value]
+
+                    for value in param_value:
+                        query_params.setdefault(param_name, []).append(value)
+
+    return path.format(**path_params), query_params
+
+
+async def main() -> None:
+    root_schema = load_schema("v4.x")
+    path = "/api/dcim/devices/"
+    operation_spec = root_schema["paths"][path]["get"]
+    validators = SchemaValidators(root_schema)
+    operation = Operation(
+        AsyncClient(base_url="http://netbox.local"),
+        "get",
+        path,
+        operation_spec,
+        validators,
+    )
+
+    print(f"dcim_devices_list: {len(operation_spec['parameters'])} parameters")
+
+    for params in [
+        {"site_id": [1]},
+        {"site_id": [1], "role": ["leaf"], "limit": 50, "offset": 100},
+    ]:
+        legacy_result = legacy_prepare(
+            operation, validators, operation_spec, path, params
+        )
+        assert operation._prepare(params) == legacy_result
+
+        async def legacy_call(params: dict[str, Any] = params) -> None:
+            legacy_prepare(operation, validators, operation_spec, path, params)
+
+        async def call(params: dict[str, Any] = params) -> None:
+            operation._prepare(params)
+
+        report(
+            f"{len(params)} parameter(s)",
+            await measure(legacy_call),
+            await measure(call),
+        )
+
+
+if __name__ == "__main__":
+    anyio.run(main)
@@ -0,0 +1,101 @@
+"""
+Simulate webhook handlers reading sites while a background task resyncs all
+sites, saturating the connection pool, with and without request priorities.
+
+Usage::
+
+   python benchmarks/bench_priority.py
+"""
+
+import time
+
+import anyio
+
+from httpx import AsyncClient, MockTransport, Request, Response
+
+from nopf.client._validator import SchemaValidators
+from nopf.client.operation import Operation, ValidationPolicy
+from nopf.client.priority import Priority, PriorityScheduler, request_priority
+
+from _common import load_schema, make_site
+
+
+LATENCY = 0.005
+POOL_SIZE = 8
+RESYNC_REQUESTS = 2000
+RESYNC_CONCURRENCY = 64
+HANDLER_REQUESTS = 50
+
+
+def percentile(samples: list[float], percent: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(percent / 100 * len(samples)))]
+
+
+async def main() -> None:
+    root_schema = load_schema("v4.x")
+    validators = SchemaValidators(root_schema)
+
+    async def handler(request: Request) -> Response:
+        await anyio.sleep(LATENCY)
+        return Response(200, json=make_site(1))
+
+    client = AsyncClient(
+        base_url="http://netbox.local",
+        transport=MockTransport(handler),
+    )
+
+    for name, task_priority in [("fifo", "high"), ("priorities", "low")]:
+        # Without priorities, requests wait for a connection in FIFO order.
+        operation = Operation(
+            client,
+            "get",
+            "/api/dcim/sites/{id}/",
+            root_schema["paths"]["/api/dcim/sites/{id}/"]["get"],
+            validators,
+            validation=ValidationPolicy(mode="off"),
+            scheduler=PriorityScheduler(lambda: POOL_SIZE),
+        )
+        latencies: list[float] = []
+
+        async def resync(
+            operation: Operation = operation,
+            task_priority: Priority = task_priority,
+        ) -> None:
+            limit = anyio.Semaphore(RESYNC_CONCURRENCY)
+
+            async def retrieve(object_id: int) -> None:
+                async with limit:
+                    await operation(params={"id": object_id})
+
+            with request_priority(task_priority):
+                async with anyio.create_task_group() as tg:
+                    for object_id in range(1, RESYNC_REQUESTS + 1):
+                        tg.start_soon(retrieve, object_id)
+
+        async def handle(
+            operation: Operation = operation,
+            latencies: list[float] = latencies,
+        ) -> None:
+            for _ in range(HANDLER_REQUESTS):
+                started_at = time.perf_counter()
+
+                with request_priority("high"):
+                    await operation(params={"id": 1})
+
+                latencies.append(time.perf_counter() - started_at)
+                await anyio.sleep(LATENCY)
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(resync)
+            await anyio.sleep(LATENCY)
+            tg.start_soon(handle)
+
+        print(
+            f"{name:<10} handler p50={percentile(latencies, 50) * 1000:.1f}ms "
+            f"p99={percentile(latencies, 99) * 1000:.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    anyio.run(main)
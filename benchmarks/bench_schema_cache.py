@@ -0,0 +1,70 @@
+"""
+Measure the client startup time with a cold schema cache (parse and validate
+the source schema), with a warm one, and with a warm cache of a schema pruned
+to a handful of operations.
+
+Usage::
+
+   python benchmarks/bench_schema_cache.py
+"""
+
+from pathlib import Path
+import tempfile
+import json
+import time
+
+from nopf.client import NetboxClient
+from nopf.settings import Settings
+
+from _common import load_schema
+
+
+OPERATIONS = [
+    "dcim_sites_list",
+    "dcim_sites_retrieve",
+    "dcim_sites_create",
+    "dcim_devices_list",
+    "dcim_devices_retrieve",
+]
+
+
+def startup(settings: Settings) -> float:
+    started_at = time.perf_counter()
+    NetboxClient(settings)
+    return time.perf_counter() - started_at
+
+
+def main() -> None:
+    for version in ["v3.6.x", "v4.x"]:
+        schema = load_schema(version)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            schema_path = Path(tmpdir) / "openapi.json"
+
+            with open(schema_path, "w") as file:
+                json.dump(schema, file)
+
+            settings = Settings(
+                netbox_api="http://netbox.local",
+                netbox_token="t0k3n",
+                netbox_schema=str(schema_path),
+                netbox_schema_cache_dir=str(Path(tmpdir) / "cache"),
+                server_callback_name="bench",
+            )
+
+            cold = startup(settings)
+            warm = startup(settings)
+
+            settings.netbox_schema_operations = OPERATIONS
+            startup(settings)
+            pruned = startup(settings)
+
+        print(
+            f"{version:<8} cold={cold:.2f}s  "
+            f"cached={warm * 1000:.0f}ms ({cold / warm:.0f}x)  "
+            f"cached+pruned={pruned * 1000:.0f}ms ({cold / pruned:.0f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Compare reading a large list response in one go with streaming its
+``results``: time to the first object, total time, and peak memory.
+
+The body is served in chunks with a small delay between them, simulating a
+slow network transfer.
+
+Usage::
+
+   python benchmarks/bench_stream.py
+"""
+
+from collections.abc import AsyncIterator
+import tracemalloc
+import time
+import json
+
+import anyio
+
+from httpx import AsyncClient, MockTransport, Request, Response
+
+from nopf.client._validator import SchemaValidators
+from nopf.client.operation import Operation
+
+from _common import load_schema, make_site
+
+
+OBJECT_COUNT = 20000
+CHUNK_SIZE = 64 * 1024
+CHUNK_DELAY = 0.001
+
+
+async def main() -> None:
+    root_schema = load_schema("v4.x")
+    body = json.dumps(
+        {
+            "count": OBJECT_COUNT,
+            "next": None,
+            "previous": None,
+            "results": [make_site(obj_id) for obj_id in range(OBJECT_COUNT)],
+        }
+    ).encode()
+
+    async def chunks() -> AsyncIterator[bytes]:
+        for offset in range(0, len(body), CHUNK_SIZE):
+            await anyio.sleep(CHUNK_DELAY)
+            yield body[offset : offset + CHUNK_SIZE]
+
+    def handler(request: Request) -> Response:
+        return Response(200, content=chunks())
+
+    client = AsyncClient(
+        base_url="http://netbox.local",
+        transport=MockTransport(handler),
+    )
+    operation = Operation(
+        client,
+        "get",
+        "/api/dcim/sites/",
+        root_schema["paths"]["/api/dcim/sites/"]["get"],
+        SchemaValidators(root_schema),
+    )
+    operation.compile()
+
+    async def read_all() -> AsyncIterator[object]:
+        response = await operation()
+        for item in response.json()["results"]:
+            yield item
+
+    print(f"body={len(body) / 1024 / 1024:.1f}MiB objects={OBJECT_COUNT}")
+
+    for name, iterate in [("read + json()", read_all), ("stream", operation.stream)]:
+        tracemalloc.start()
+        started_at = time.perf_counter()
+        first_item_at = None
+        count = 0
+
+        async for _ in iterate():
+            if first_item_at is None:
+                first_item_at = time.perf_counter() - started_at
+
+            count += 1
+
+        duration = time.perf_counter() - started_at
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        assert count == OBJECT_COUNT
+        print(
+            f"{name:<16} first object={first_item_at * 1000:>7.1f}ms  "
+            f"total={duration:.2f}s  peak={peak / 1024 / 1024:.1f}MiB"
+        )
+
+
+if __name__ == "__main__":
+    anyio.run(main)
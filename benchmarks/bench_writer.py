@@ -0,0 +1,94 @@
+"""
+Simulate a handler updating many interfaces of a device, one PATCH per object,
+and through the write-behind batcher.
+
+Usage::
+
+   python benchmarks/bench_writer.py
+"""
+
+from functools import partial
+import time
+import json
+
+import anyio
+
+from httpx import AsyncClient, MockTransport, Request, Response
+
+from nopf.client._validator import SchemaValidators
+from nopf.client.operation import Operation
+from nopf.client.writer import BulkWriter
+
+from _common import load_schema, make_site
+
+
+LATENCY = 0.005
+WRITES = 500
+# Netbox serves a limited number of requests concurrently.
+SERVER_WORKERS = 8
+
+
+async def main() -> None:
+    root_schema = load_schema("v4.x")
+    validators = SchemaValidators(root_schema)
+    workers = anyio.Semaphore(SERVER_WORKERS)
+    requests = 0
+
+    async def handler(request: Request) -> Response:
+        nonlocal requests
+        requests += 1
+
+        async with workers:
+            await anyio.sleep(LATENCY)
+
+        body = json.loads(request.content)
+
+        if isinstance(body, list):
+            return Response(
+                200,
+                json=[{**make_site(obj["id"]), **obj} for obj in body],
+            )
+
+        obj_id = int(request.url.path.rstrip("/").rsplit("/", 1)[-1])
+        return Response(200, json={**make_site(obj_id), **body})
+
+    client = AsyncClient(
+        base_url="http://netbox.local",
+        transport=MockTransport(handler),
+    )
+    operations = {
+        operation_spec["operationId"]: Operation(
+            client,
+            method,
+            path,
+            operation_spec,
+            validators,
+        )
+        for path in ["/api/dcim/sites/", "/api/dcim/sites/{id}/"]
+        for method, operation_spec in root_schema["paths"][path].items()
+    }
+    writer = BulkWriter(operations.__getitem__, max_size=100, window=0.01)
+
+    for name, partial_update in [
+        ("per object", operations["dcim_sites_partial_update"]),
+        ("write-behind", writer.dcim_sites_partial_update),
+    ]:
+        requests = 0
+        started_at = time.perf_counter()
+
+        async with anyio.create_task_group() as tg:
+            for obj_id in range(1, WRITES + 1):
+                tg.start_soon(
+                    partial(
+                        partial_update,
+                        params={"id": obj_id},
+                        body={"description": "updated"},
+                    ),
+                )
+
+        duration = time.perf_counter() - started_at
+        print(f"{name:<14} writes={WRITES} requests={requests:<4} {duration:.2f}s")
+
+
+if __name__ == "__main__":
+    anyio.run(main)
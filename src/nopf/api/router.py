@@ -4,18 +4,22 @@ FastAPI routes.
 
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, Response, HTTPException
+from fastapi import APIRouter, Depends, Request, Response, HTTPException
 
+from nopf.settings import Settings
 from nopf.schema import WebhookPayload
 from nopf.core.channel import (
+    ChannelFullError,
     ChannelSender,
+    ChannelStats,
+    Event,
     EventCreate,
     EventUpdate,
     EventDelete,
 )
 
 from .security import verify_netbox_request_signature
-from .deps import get_channel
+from .deps import get_channel, get_settings
 
 
 router = APIRouter()
@@ -31,19 +35,44 @@ def health() -> Response:
     return Response(content="OK", media_type="text/plain", status_code=200)
 
 
+@router.get("/stats/channel")
+def channel_stats(
+    channel: Annotated[ChannelSender, Depends(get_channel)],
+) -> ChannelStats:
+    """
+    Number of webhook events waiting to be processed (``depth``), their total
+    size in bytes (``bytes``), and number of webhooks rejected because the
+    channel was full (``shed``).
+    Used for monitoring purposes.
+    """
+
+    return channel.limits.stats
+
+
 @router.post(
     "/callback/{model_name}",
     dependencies=[Depends(verify_netbox_request_signature)],
 )
 async def handle_netbox_webhook(
+    request: Request,
     model_name: str,
     payload: WebhookPayload,
     channel: Annotated[ChannelSender, Depends(get_channel)],
+    settings: Annotated[Settings, Depends(get_settings)],
 ) -> Response:
     """
     Actual webhook callback route, dispatching the event to the correct
     event handlers.
 
+    If ``server_async_ack`` is enabled, a ``202 Accepted`` response is
+    returned as soon as the event is enqueued, instead of waiting for the
+    handlers to complete.
+
+    If too many events are waiting to be processed (see the
+    ``channel_max_events`` and ``channel_max_bytes`` settings), a
+    ``429 Too Many Requests`` response is returned, with a ``Retry-After``
+    header. The size of an event is the size of the raw request body.
+
     .. note::
 
        Netbox does not include the fully qualified model name in the payload.
@@ -63,14 +92,38 @@ async def handle_netbox_webhook(
     # the model name in the payload with the fully qualified model name.
     payload.model = model_name
 
+    event: Event
+
     match payload.event:
         case "created":
-            await channel.send(EventCreate(payload=payload))
+            event = EventCreate(payload=payload)
 
         case "updated":
-            await channel.send(EventUpdate(payload=payload))
+            event = EventUpdate(payload=payload)
 
         case "deleted":
-            await channel.send(EventDelete(payload=payload))
+            event = EventDelete(payload=payload)
+
+        case _:
+            return Response(content="OK", media_type="text/plain", status_code=200)
+
+    try:
+        # The raw body is measured, the parsed event is not serialized again.
+        channel.admit(event, len(await request.body()))
+
+    except ChannelFullError:
+        return Response(
+            content="Too Many Requests",
+            media_type="text/plain",
+            status_code=429,
+            headers={"Retry-After": str(settings.server_retry_after)},
+        )
+
+    # The room of the event is released by the channel once processed (or if
+    # it could not be enqueued).
+    if settings.server_async_ack:
+        await channel.post(event)
+        return Response(content="Accepted", media_type="text/plain", status_code=202)
 
+    await channel.send(event)
     return Response(content="OK", media_type="text/plain", status_code=200)
@@ -7,24 +7,60 @@ The Netbox HTTP Client is generated dynamically from the OpenAPI schema.
    but also from a JSON file, or a YAML file.
 
    Using a JSON file is recommended as it is the fastest option.
+
+   The parsed and validated schema can also be cached on disk (see the
+   ``netbox_schema_cache_dir`` setting), in which case subsequent startups
+   skip both steps, as long as the source schema did not change. When the
+   schema is fetched from Netbox, :meth:`NetboxClient.load` only downloads it
+   if the Netbox version changed since it was cached.
 """
 
-from contextvars import ContextVar
-from urllib.parse import urlparse
-from pathlib import Path
+from typing import Any
 
-import yaml
-import json
+from collections.abc import Callable, Iterator
+from contextlib import AbstractAsyncContextManager, nullcontext
+from contextvars import ContextVar
+from threading import Lock
 import re
 
 from logbook import Logger  # type: ignore
 
-from httpx import Client, AsyncClient, Request, Response
-from openapi_spec_validator import validate, OpenAPIV30SpecValidator
+from anyio import create_task_group
+
+from httpx import (
+    AsyncClient,
+    AsyncBaseTransport,
+    HTTPError,
+    Limits,
+    Request,
+    Response,
+    USE_CLIENT_DEFAULT,
+)
 
 from nopf.settings import Settings
+from nopf.schema import WebhookPayload
+
+from .operation import (
+    Operation,
+    Projection,
+    ValidationPolicy,
+    ValidationStats,
+    acquire_slot,
+)
+from .cache import ResponseCache, model_collections
+from .coalescing import RequestCoalescer, CoalescingStats
+from .batching import RetrieveBatcher, BatchingStats
+from .writer import BulkWriter
+from .limiter import AdaptiveLimiter
+from .hedging import RequestHedger, HedgingStats
+from .priority import PriorityScheduler, SchedulingStats
+from .balancer import EndpointBalancer, EndpointStats, Route
+from .graphql import GRAPHQL_COLLECTION, GRAPHQL_PATH, query_data, query_key
+from ._validator import SchemaValidators
+from ._schema import load_schema, load_schema_async
+
 
-from .operation import Operation
+logger = Logger("nopf.client")
 
 
 _client: ContextVar["NetboxClient | None"] = ContextVar(
@@ -53,9 +89,34 @@ class NetboxClient:
 
         return value
 
-    def __init__(self, settings: Settings) -> None:
+    @classmethod
+    async def load(
+        cls,
+        settings: Settings,
+        transport: AsyncBaseTransport | None = None,
+    ) -> "NetboxClient":
+        """
+        Create a new client, loading the OpenAPI schema without blocking the
+        event loop.
+
+        :param settings: The operator settings.
+        :param transport: HTTP transport used to send requests to Netbox (defaults to the ``httpx`` network transport).
+        :return: The Netbox HTTP client.
+        """
+
+        schema = await load_schema_async(settings, transport)
+        return cls(settings, transport, schema=schema)
+
+    def __init__(
+        self,
+        settings: Settings,
+        transport: AsyncBaseTransport | None = None,
+        schema: dict[str, Any] | None = None,
+    ) -> None:
         """
         :param settings: The operator settings.
+        :param transport: HTTP transport used to send requests to Netbox (defaults to the ``httpx`` network transport).
+        :param schema: Already loaded OpenAPI schema (loaded from ``settings.netbox_schema`` if not given).
         """
 
         self._logger = Logger("nopf.client")
@@ -64,6 +125,14 @@ class NetboxClient:
             base_url=settings.netbox_api,
             verify=settings.netbox_ssl_verify,
             follow_redirects=True,
+            transport=transport,
+            http2=settings.netbox_http2,
+            limits=Limits(
+                max_connections=settings.netbox_max_connections,
+                max_keepalive_connections=settings.netbox_max_keepalive_connections,
+                keepalive_expiry=settings.netbox_keepalive_expiry,
+            ),
+            timeout=settings.netbox_timeout,
             headers={
                 "Authorization": f"Token {settings.netbox_token}",
                 "Accept": "application/json",
@@ -71,59 +140,113 @@ class NetboxClient:
             },
             event_hooks={
                 "request": [self._log_request],
-                "response": [Response.aread, self._log_response],
+                "response": [self._log_response],
             },
         )
 
-        netbox_schema_url = urlparse(settings.netbox_schema)
-
-        match netbox_schema_url.scheme:
-            case "http" | "https":
-                with Client(follow_redirects=True, timeout=10) as sync_client:
-                    resp = sync_client.get(
-                        settings.netbox_schema,
-                        headers={"Accept": "application/json"},
-                    )
-                    resp.raise_for_status()
-                    self._schema = resp.json()
-
-            case "" | "file":
-                netbox_schema_path = Path(netbox_schema_url.path)
-                ext = netbox_schema_path.suffix.lower()
-
-                match ext:
-                    case ".json":
-                        with open(netbox_schema_path) as file:
-                            self._schema = json.load(file)
-
-                    case ".yml" | ".yaml":
-                        with open(netbox_schema_path) as file:
-                            self._schema = yaml.safe_load(file)
-
-                    case _:
-                        raise ValueError(f"Unsupported schema file format: {ext}")
-
-            case _:
-                raise ValueError(
-                    f"Unsupported schema URL scheme: {netbox_schema_url.scheme}"
-                )
+        self._schema = schema if schema is not None else load_schema(settings)
+        self._timeouts = settings.netbox_operation_timeouts
 
-        validate(self._schema, cls=OpenAPIV30SpecValidator)
-
-        operations: dict[str, Operation] = {}
+        self._http = client
+        self._validators = SchemaValidators(self._schema)
+        self._validation = ValidationPolicy(
+            mode=settings.netbox_response_validation,
+            sample_interval=settings.netbox_response_validation_sample_interval,
+            sample_items=settings.netbox_response_validation_sample_items,
+        )
+        self._projection = Projection(
+            exclude=settings.netbox_exclude_fields,
+            omit=settings.netbox_omit_fields,
+        )
+        self._cache = None
+        self._collections: dict[str, str] = {}
+
+        if settings.netbox_cache_size > 0:
+            self._cache = ResponseCache(
+                max_size=settings.netbox_cache_size,
+                ttl=settings.netbox_cache_ttl,
+            )
+            self._collections = model_collections(self._schema)
+
+        self._graphql_cache = None
+
+        if settings.netbox_graphql_cache_size > 0:
+            self._graphql_cache = ResponseCache(
+                max_size=settings.netbox_graphql_cache_size,
+                ttl=settings.netbox_cache_ttl,
+            )
+
+        self._coalescer = None
+
+        if settings.netbox_coalesce_reads:
+            self._coalescer = RequestCoalescer()
+
+        self._batcher = None
+
+        if settings.netbox_batch_retrieves:
+            self._batcher = RetrieveBatcher(
+                window=settings.netbox_batch_window,
+                max_size=settings.netbox_batch_max_size,
+            )
+
+        self._limiter = None
+
+        if settings.netbox_adaptive_concurrency:
+            self._limiter = AdaptiveLimiter(
+                initial_limit=settings.netbox_concurrency_limit,
+                max_limit=settings.netbox_concurrency_max_limit,
+                latency_threshold=settings.netbox_concurrency_latency_threshold,
+                failure_threshold=settings.netbox_circuit_failure_threshold,
+                recovery_time=settings.netbox_circuit_recovery_time,
+            )
+
+        self._scheduler = None
+
+        if settings.netbox_request_priorities:
+            limiter = self._limiter
+            max_connections = settings.netbox_max_connections
+            self._scheduler = PriorityScheduler(
+                # Requests wait for a slot here, rather than in the limiter.
+                (lambda: limiter.limit)
+                if limiter is not None
+                else (lambda: max_connections),
+            )
+
+        self._balancer = None
+
+        if settings.netbox_api_endpoints or settings.netbox_api_read_endpoints:
+            self._balancer = EndpointBalancer(
+                primary=settings.netbox_api_endpoints or [settings.netbox_api],
+                read_only=settings.netbox_api_read_endpoints,
+                failure_threshold=settings.netbox_endpoint_failure_threshold,
+                ejection_time=settings.netbox_endpoint_ejection_time,
+            )
+
+        self._hedger = None
+
+        if settings.netbox_hedge_reads:
+            self._hedger = RequestHedger(
+                percentile=settings.netbox_hedge_percentile,
+                budget=settings.netbox_hedge_budget,
+            )
+
+        # Operations are built on first lookup, only the index of their
+        # location in the schema is computed upfront.
+        operation_index: dict[str, tuple[str, str]] = {}
 
         for path, path_spec in self._schema["paths"].items():
             for method, operation_spec in path_spec.items():
-                operation_id = operation_spec["operationId"]
-                operations[operation_id] = Operation(
-                    client,
-                    method,
-                    path,
-                    operation_spec,
-                    self._schema,
-                )
+                operation_index[operation_spec["operationId"]] = (path, method)
 
-        self._operations = Operations(operations)
+        self._operations = Operations(operation_index, self._make_operation)
+        self._writer = None
+
+        if settings.netbox_write_batch_size > 0:
+            self._writer = BulkWriter(
+                lambda operation_id: getattr(self._operations, operation_id),
+                max_size=settings.netbox_write_batch_size,
+                window=settings.netbox_write_batch_window,
+            )
         self._version = Version(self._schema["info"]["version"])
 
     @property
@@ -161,6 +284,336 @@ class NetboxClient:
 
         return self._operations
 
+    @property
+    def validation_stats(self) -> ValidationStats:
+        """
+        Response validation counters, summed over all operations.
+        """
+
+        stats = ValidationStats()
+
+        for operation in self._operations:
+            stats.validated += operation.validation_stats.validated
+            stats.skipped += operation.validation_stats.skipped
+            stats.duration += operation.validation_stats.duration
+
+        return stats
+
+    @property
+    def writer(self) -> BulkWriter | None:
+        """
+        Write-behind batcher, folding ``*_create`` and ``*_partial_update``
+        calls into bulk requests, or ``None`` if it is disabled (see the
+        ``netbox_write_batch_size`` setting).
+        """
+
+        return self._writer
+
+    @property
+    def limiter(self) -> AdaptiveLimiter | None:
+        """
+        Adaptive concurrency limiter and circuit breaker of the client (see
+        its ``state``), or ``None`` if it is disabled (see the
+        ``netbox_adaptive_concurrency`` setting).
+        """
+
+        return self._limiter
+
+    @property
+    def cache(self) -> ResponseCache | None:
+        """
+        Read cache of the client, or ``None`` if it is disabled (see the
+        ``netbox_cache_size`` setting).
+        """
+
+        return self._cache
+
+    @property
+    def graphql_cache(self) -> ResponseCache | None:
+        """
+        Cache of the GraphQL query results, or ``None`` if it is disabled (see
+        the ``netbox_graphql_cache_size`` setting).
+        """
+
+        return self._graphql_cache
+
+    @property
+    def coalescing_stats(self) -> CoalescingStats:
+        """
+        Request coalescing counters (always zero if it is disabled, see the
+        ``netbox_coalesce_reads`` setting).
+        """
+
+        if self._coalescer is None:
+            return CoalescingStats()
+
+        return self._coalescer.stats
+
+    @property
+    def batching_stats(self) -> BatchingStats:
+        """
+        Retrieve batching counters (always zero if it is disabled, see the
+        ``netbox_batch_retrieves`` setting).
+        """
+
+        if self._batcher is None:
+            return BatchingStats()
+
+        return self._batcher.stats
+
+    @property
+    def hedging_stats(self) -> HedgingStats:
+        """
+        Request hedging counters (always zero if it is disabled, see the
+        ``netbox_hedge_reads`` setting).
+        """
+
+        if self._hedger is None:
+            return HedgingStats()
+
+        return self._hedger.stats
+
+    @property
+    def scheduling_stats(self) -> SchedulingStats:
+        """
+        Request scheduling state and counters (always zero if it is disabled,
+        see the ``netbox_request_priorities`` setting).
+        """
+
+        if self._scheduler is None:
+            return SchedulingStats()
+
+        return self._scheduler.stats
+
+    @property
+    def endpoint_stats(self) -> list[EndpointStats]:
+        """
+        State and counters of each Netbox endpoint (empty if a single endpoint
+        is used, see the ``netbox_api_endpoints`` and
+        ``netbox_api_read_endpoints`` settings).
+        """
+
+        if self._balancer is None:
+            return []
+
+        return self._balancer.stats
+
+    def invalidate(self, payload: WebhookPayload) -> None:
+        """
+        Evict the cached responses of the object a webhook was received for.
+
+        .. note::
+
+           This is called by the operator's controller for every webhook.
+
+        :param payload: The webhook payload.
+        """
+
+        # GraphQL queries may read any object.
+        if self._graphql_cache is not None:
+            self._graphql_cache.clear()
+
+        if self._cache is None:
+            return
+
+        url = payload.data.get("url")
+
+        if isinstance(url, str):
+            self._cache.invalidate_url(url)
+            return
+
+        # Otherwise, the object is found by its model and ID.
+        object_id = payload.data.get("id")
+        collection = self._collections.get(payload.model)
+
+        if collection is not None:
+            self._cache.invalidate(collection, object_id)
+
+        else:
+            self._cache.invalidate_id(object_id)
+
+    async def graphql(
+        self,
+        query: str,
+        variables: dict[str, Any] | None = None,
+        *,
+        cache: bool = True,
+    ) -> dict[str, Any]:
+        """
+        Send a GraphQL query to Netbox, using the same connection pool,
+        authentication and logging as the REST operations.
+
+        .. code-block:: python
+
+           data = await client.graphql(
+               "query ($id: ID!) {"
+               "  device(id: $id) {"
+               "    name site { slug }"
+               "    interfaces { name ip_addresses { address } }"
+               "  }"
+               "}",
+               {"id": 1},
+           )
+
+        Results are cached by the hash of the document and the variables (see
+        the ``netbox_graphql_cache_size`` setting). The cache is cleared for
+        every webhook, and every successful write of the client.
+
+        Queries are scheduled and limited like the REST operations (see the
+        ``netbox_request_priorities`` and ``netbox_adaptive_concurrency``
+        settings). If several Netbox endpoints are configured, they are
+        balanced like the ``GET`` operations (see the
+        ``netbox_api_read_endpoints`` setting).
+
+        :param query: The GraphQL document.
+        :param variables: The variables of the query.
+        :param cache: Whether to use the cache (if enabled).
+        :return: The ``data`` of the response.
+        :raises nopf.client.graphql.GraphQLError: If Netbox returns errors.
+        :raises httpx.HTTPStatusError: If the request failed otherwise.
+        """
+
+        variables = variables or {}
+        graphql_cache = self._graphql_cache if cache else None
+        key = query_key(query, variables)
+
+        generation = None
+
+        if graphql_cache is not None:
+            data = graphql_cache.get(key)
+
+            if data is not None:
+                return data
+
+            # Results read before an invalidation are not stored after it.
+            generation = graphql_cache.generation(GRAPHQL_COLLECTION)
+
+        # Queries only read objects, so they can be sent to the replicas.
+        route_context: AbstractAsyncContextManager[Route | None] = nullcontext()
+
+        if self._balancer is not None:
+            route_context = self._balancer.route(read=True)
+
+        async with (
+            acquire_slot(self._scheduler, self._limiter) as permit,
+            route_context as route,
+            self._http.stream(
+                "POST",
+                GRAPHQL_PATH if route is None else route.url(GRAPHQL_PATH),
+                json={"query": query, "variables": variables},
+                timeout=self._timeouts.get("graphql", USE_CLIENT_DEFAULT),
+            ) as response,
+        ):
+            if permit is not None:
+                permit.record(response)
+
+            if route is not None:
+                route.record(response)
+
+            await response.aread()
+
+        data = query_data(response)
+
+        if graphql_cache is not None:
+            graphql_cache.put(key, GRAPHQL_COLLECTION, None, data, generation)
+
+        return data
+
+    async def prewarm(self, connections: int) -> None:
+        """
+        Open connections to the Netbox API ahead of their first use, by sending
+        concurrent requests to the API status endpoint. They are then kept in
+        the connection pool, until they expire.
+
+        .. note::
+
+           This is called by the operator at startup, before accepting
+           webhooks (see the ``netbox_prewarm_connections`` setting). Failed
+           requests are logged, and ignored.
+
+        If several Netbox endpoints are configured, connections are opened to
+        each of them.
+
+        :param connections: Number of connections to open (per endpoint).
+        """
+
+        urls = ["/api/status/"]
+
+        if self._balancer is not None:
+            urls = [f"{url}/api/status/" for url in self._balancer.urls]
+
+        async def connect(url: str) -> None:
+            try:
+                await self._http.get(url)
+
+            except HTTPError as err:
+                self._logger.warning(
+                    "Could not pre-warm netbox connection",
+                    extra={
+                        "exc.type": type(err).__name__,
+                        "exc.message": str(err),
+                    },
+                )
+
+        async with create_task_group() as tg:
+            for url in urls:
+                for _ in range(connections):
+                    tg.start_soon(connect, url)
+
+    def _make_operation(self, path: str, method: str) -> Operation:
+        spec = self._schema["paths"][path][method]
+
+        return Operation(
+            self._http,
+            method,
+            path,
+            spec,
+            self._validators,
+            self._validation.model_copy(),
+            self._cache,
+            self._coalescer,
+            self._batcher,
+            self._list_operation(path, method, spec["operationId"]),
+            self._timeouts.get(spec["operationId"]),
+            self._limiter,
+            self._hedger,
+            self._scheduler,
+            self._balancer,
+            self._projection.model_copy(deep=True),
+            self._graphql_cache,
+        )
+
+    def _list_operation(
+        self,
+        path: str,
+        method: str,
+        operation_id: str,
+    ) -> Callable[[], Operation] | None:
+        # A `*_retrieve` operation can be batched into the `*_list` operation
+        # of its collection, if it can filter objects by ID.
+        if self._batcher is None or method != "get" or not path.endswith("/{id}/"):
+            return None
+
+        if not operation_id.endswith("_retrieve"):
+            return None
+
+        list_operation_id = operation_id.removesuffix("_retrieve") + "_list"
+        collection = path.removesuffix("{id}/")
+        list_spec = self._schema["paths"].get(collection, {}).get("get", {})
+
+        if list_spec.get("operationId") != list_operation_id:
+            return None
+
+        if not any(
+            param_spec["in"] == "query"
+            and param_spec["name"] == "id"
+            and param_spec.get("schema", {}).get("type") == "array"
+            for param_spec in list_spec.get("parameters", [])
+        ):
+            return None
+
+        return lambda: getattr(self._operations, list_operation_id)
+
     async def _log_request(self, request: Request) -> None:
         self._logger.info(
             "netbox request",
@@ -179,6 +632,9 @@ class NetboxClient:
         }
 
         if response.is_error:
+            # Only error bodies are logged, successful responses may be
+            # streamed by the caller.
+            await response.aread()
             log = self._logger.error
             extra["response.body"] = response.text
 
@@ -255,10 +711,31 @@ class Version:
 class Operations:
     """
     Operations container implementing dynamic lookup via ``__getattr__``.
+
+    Operations are built on first lookup, and then cached.
     """
 
-    def __init__(self, operations: dict[str, Operation]):
-        self._operations = operations
+    def __init__(
+        self,
+        index: dict[str, tuple[str, str]],
+        factory: Callable[[str, str], Operation],
+    ):
+        """
+        :param index: Path and method of each operation, by operation ID.
+        :param factory: Callable building an operation from its path and method.
+        """
+
+        self._index = index
+        self._factory = factory
+        self._operations: dict[str, Operation] = {}
+        self._lock = Lock()
+
+    def __iter__(self) -> Iterator[Operation]:
+        """
+        Iterate over the operations built so far.
+        """
+
+        return iter(list(self._operations.values()))
 
     def __getattr__(self, operation_id: str) -> Operation:
         """
@@ -268,4 +745,42 @@ class Operations:
         :return: The operation callable.
         """
 
-        return self._operations[operation_id]
+        operation = self._operations.get(operation_id)
+
+        if operation is None:
+            path, method = self._index[operation_id]
+
+            # Operations may be built concurrently by the warm-up thread.
+            with self._lock:
+                operation = self._operations.get(operation_id)
+
+                if operation is None:
+                    operation = self._factory(path, method)
+                    self._operations[operation_id] = operation
+
+        return operation
+
+    def warmup(self, operation_ids: list[str]) -> None:
+        """
+        Build the given operations and compile their validators ahead of their
+        first call.
+
+        .. note::
+
+           This is CPU-bound, the operator runs it in a worker thread.
+
+        Unknown operation IDs are skipped with a warning: the warm-up is an
+        optimization, it must not prevent the operator from starting.
+
+        :param operation_ids: IDs of the operations to build.
+        """
+
+        for operation_id in operation_ids:
+            if operation_id not in self._index:
+                logger.warning(
+                    "Skipping warm-up of unknown operation",
+                    extra={"operation.id": operation_id},
+                )
+                continue
+
+            getattr(self, operation_id).compile()
@@ -0,0 +1,402 @@
+from typing import Any, Literal
+
+from contextlib import suppress
+from urllib.parse import urlparse
+from pathlib import Path
+import tempfile
+import hashlib
+import pickle
+import json
+import time
+import os
+
+import yaml
+
+from logbook import Logger  # type: ignore
+
+from anyio import to_thread
+from httpx import Client, AsyncClient, AsyncBaseTransport, HTTPError
+from openapi_spec_validator import validate, OpenAPIV30SpecValidator
+
+from nopf.settings import Settings
+
+
+type SchemaFormat = Literal["json", "yaml"]
+
+
+# Bump when the layout of the cached schemas changes.
+CACHE_VERSION = "1"
+
+# Operations used by the operator itself, always kept when pruning the schema.
+FRAMEWORK_OPERATIONS = [
+    "extras_webhooks_list",
+    "extras_webhooks_create",
+    "extras_webhooks_bulk_destroy",
+    "extras_event_rules_list",
+    "extras_event_rules_create",
+    "extras_event_rules_bulk_destroy",
+]
+
+
+logger = Logger("nopf.client")
+
+
+def load_schema(settings: Settings) -> dict[str, Any]:
+    """
+    Load the OpenAPI schema of the Netbox API, from the compiled schema cache
+    when possible.
+    """
+
+    content, fmt = read_schema(settings)
+    return compile_schema(content, fmt, settings)
+
+
+async def load_schema_async(
+    settings: Settings,
+    transport: AsyncBaseTransport | None = None,
+) -> dict[str, Any]:
+    """
+    Load the OpenAPI schema of the Netbox API without blocking the event loop.
+
+    When fetching the schema from Netbox with the schema cache enabled, the
+    Netbox version is checked first (via ``/api/status/``): if a schema was
+    already cached for this version, it is used without downloading it again.
+    """
+
+    netbox_schema_url = urlparse(settings.netbox_schema)
+
+    if netbox_schema_url.scheme not in ("http", "https"):
+        return await to_thread.run_sync(load_schema, settings)
+
+    version_key = None
+
+    async with AsyncClient(
+        base_url=settings.netbox_api,
+        verify=settings.netbox_ssl_verify,
+        follow_redirects=True,
+        timeout=10,
+        transport=transport,
+    ) as client:
+        if settings.netbox_schema_cache_dir:
+            cache = schema_cache(settings)
+            netbox_version = await fetch_netbox_version(client, settings)
+
+            if netbox_version is not None:
+                version_key = fingerprint(
+                    f"{settings.netbox_schema}\0{netbox_version}".encode(),
+                    schema_operations(settings),
+                )
+                schema = await to_thread.run_sync(cache.load, version_key)
+
+                if schema is not None:
+                    return schema
+
+        resp = await client.get(
+            settings.netbox_schema,
+            headers={"Accept": "application/json"},
+        )
+        resp.raise_for_status()
+
+    # The schema is only stored under the version key, which is the one
+    # looked up on the next startup.
+    return await to_thread.run_sync(
+        compile_schema,
+        resp.content,
+        "json",
+        settings,
+        version_key,
+    )
+
+
+async def fetch_netbox_version(client: AsyncClient, settings: Settings) -> str | None:
+    try:
+        resp = await client.get(
+            "/api/status/",
+            headers={
+                "Authorization": f"Token {settings.netbox_token}",
+                "Accept": "application/json",
+            },
+        )
+        resp.raise_for_status()
+        return resp.json()["netbox-version"]
+
+    except (HTTPError, ValueError, KeyError, TypeError) as err:
+        logger.warning(
+            "Could not fetch the Netbox version, ignoring the schema cache",
+            extra={
+                "exc.type": type(err).__name__,
+                "exc.message": str(err),
+            },
+        )
+        return None
+
+
+def read_schema(settings: Settings) -> tuple[bytes, SchemaFormat]:
+    netbox_schema_url = urlparse(settings.netbox_schema)
+
+    match netbox_schema_url.scheme:
+        case "http" | "https":
+            with Client(follow_redirects=True, timeout=10) as sync_client:
+                resp = sync_client.get(
+                    settings.netbox_schema,
+                    headers={"Accept": "application/json"},
+                )
+                resp.raise_for_status()
+                return resp.content, "json"
+
+        case "" | "file":
+            netbox_schema_path = Path(netbox_schema_url.path)
+            ext = netbox_schema_path.suffix.lower()
+
+            match ext:
+                case ".json":
+                    return netbox_schema_path.read_bytes(), "json"
+
+                case ".yml" | ".yaml":
+                    return netbox_schema_path.read_bytes(), "yaml"
+
+                case _:
+                    raise ValueError(f"Unsupported schema file format: {ext}")
+
+        case _:
+            raise ValueError(
+                f"Unsupported schema URL scheme: {netbox_schema_url.scheme}"
+            )
+
+
+def compile_schema(
+    content: bytes,
+    fmt: SchemaFormat,
+    settings: Settings,
+    cache_key: str | None = None,
+) -> dict[str, Any]:
+    """
+    Parse, validate and prune the OpenAPI schema.
+
+    When the schema cache is enabled, the result is stored on disk, keyed by
+    ``cache_key`` (the fingerprint of the source by default). If it is found
+    there, parsing and validation are skipped entirely.
+    """
+
+    operation_ids = schema_operations(settings)
+
+    cache = None
+    key = ""
+
+    if settings.netbox_schema_cache_dir:
+        cache = schema_cache(settings)
+        key = cache_key or fingerprint(content, operation_ids)
+        schema = cache.load(key)
+
+        if schema is not None:
+            return schema
+
+    match fmt:
+        case "json":
+            schema = json.loads(content)
+
+        case "yaml":
+            schema = yaml.safe_load(content)
+
+    validate(schema, cls=OpenAPIV30SpecValidator)
+
+    if operation_ids:
+        schema = prune_schema(schema, operation_ids)
+
+    if cache is not None:
+        cache.store(key, schema)
+
+    return schema
+
+
+def schema_cache(settings: Settings) -> "SchemaCache":
+    return SchemaCache(
+        Path(settings.netbox_schema_cache_dir),
+        max_entries=settings.netbox_schema_cache_max_entries,
+    )
+
+
+def schema_operations(settings: Settings) -> list[str]:
+    if not settings.netbox_schema_operations:
+        return []
+
+    return sorted(set(settings.netbox_schema_operations) | set(FRAMEWORK_OPERATIONS))
+
+
+def fingerprint(content: bytes, operation_ids: list[str]) -> str:
+    hashobj = hashlib.sha256()
+    hashobj.update(f"nopf-schema-v{CACHE_VERSION}\0".encode())
+    hashobj.update(",".join(operation_ids).encode())
+    hashobj.update(b"\0")
+    hashobj.update(content)
+    return hashobj.hexdigest()
+
+
+def prune_schema(
+    schema: dict[str, Any],
+    operation_ids: list[str],
+) -> dict[str, Any]:
+    """
+    Keep only the given operations, and the component schemas they reference
+    (directly or not).
+    """
+
+    kept_operation_ids = set(operation_ids)
+    paths: dict[str, Any] = {}
+
+    for path, path_spec in schema["paths"].items():
+        kept_path_spec = {
+            method: operation_spec
+            for method, operation_spec in path_spec.items()
+            if operation_spec["operationId"] in kept_operation_ids
+        }
+
+        if kept_path_spec:
+            paths[path] = kept_path_spec
+
+    component_schemas = schema.get("components", {}).get("schemas", {})
+    kept_component_schemas: dict[str, Any] = {}
+    pending: list[Any] = [paths]
+
+    while pending:
+        node = pending.pop()
+
+        if isinstance(node, dict):
+            ref = node.get("$ref")
+
+            if isinstance(ref, str) and ref.startswith("#/components/schemas/"):
+                name = ref.rsplit("/", 1)[-1]
+
+                if name not in kept_component_schemas:
+                    kept_component_schemas[name] = component_schemas[name]
+                    pending.append(component_schemas[name])
+
+            pending.extend(node.values())
+
+        elif isinstance(node, list):
+            pending.extend(node)
+
+    return {
+        **schema,
+        "paths": paths,
+        "components": {
+            **schema.get("components", {}),
+            "schemas": kept_component_schemas,
+        },
+    }
+
+
+class SchemaCache:
+    """
+    On-disk cache of compiled (parsed, validated and pruned) schemas.
+
+    Only the ``max_entries`` most recently used entries are kept (all of them
+    if ``0``).
+    """
+
+    def __init__(self, directory: Path, max_entries: int = 0) -> None:
+        self.directory = directory
+        self.max_entries = max_entries
+
+    def load(self, key: str) -> dict[str, Any] | None:
+        path = self.directory / f"{key}.pickle"
+
+        try:
+            with open(path, "rb") as file:
+                schema = pickle.load(file)
+
+        except FileNotFoundError:
+            return None
+
+        except (OSError, EOFError, pickle.UnpicklingError) as err:
+            logger.warning(
+                "Ignoring unreadable schema cache entry",
+                extra={
+                    "cache.key": key,
+                    "exc.type": type(err).__name__,
+                    "exc.message": str(err),
+                },
+            )
+            return None
+
+        self._touch(path)
+        return schema
+
+    def store(self, key: str, schema: dict[str, Any]) -> None:
+        # The cache is an optimization: failing to fill it must not prevent
+        # the schema from being used.
+        try:
+            path = self._write(key, schema)
+
+        except Exception as err:
+            logger.warning(
+                "Could not store schema cache entry",
+                extra={
+                    "cache.key": key,
+                    "exc.type": type(err).__name__,
+                    "exc.message": str(err),
+                },
+            )
+            return
+
+        self._touch(path)
+        self.prune()
+
+    def prune(self) -> None:
+        if self.max_entries <= 0:
+            return
+
+        entries: list[tuple[int, Path]] = []
+
+        try:
+            for path in self.directory.glob("*.pickle"):
+                try:
+                    entries.append((path.stat().st_mtime_ns, path))
+
+                except FileNotFoundError:
+                    # Evicted concurrently by another process.
+                    continue
+
+            entries.sort(reverse=True)
+
+            for _, path in entries[self.max_entries :]:
+                path.unlink(missing_ok=True)
+
+        except OSError as err:
+            logger.warning(
+                "Could not prune schema cache",
+                extra={
+                    "exc.type": type(err).__name__,
+                    "exc.message": str(err),
+                },
+            )
+
+    def _write(self, key: str, schema: dict[str, Any]) -> Path:
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temporary file first, so that a concurrent reader never
+        # sees a partially written entry.
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+
+        try:
+            with os.fdopen(fd, "wb") as file:
+                pickle.dump(schema, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+            path = self.directory / f"{key}.pickle"
+            os.replace(tmp_path, path)
+
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+        return path
+
+    def _touch(self, path: Path) -> None:
+        # The modification time orders the entries by last use. It is set
+        # explicitly, as the file system may only record it with a coarse
+        # resolution. This is best-effort, the entry may have been evicted
+        # concurrently.
+        now = time.time_ns()
+
+        with suppress(OSError):
+            os.utime(path, ns=(now, now))
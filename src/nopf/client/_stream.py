@@ -0,0 +1,134 @@
+from typing import Any
+
+from collections.abc import AsyncIterator
+import codecs
+import json
+
+
+WHITESPACE = " \t\n\r"
+
+# Consumed input is dropped from the buffer once it exceeds this size.
+COMPACT_THRESHOLD = 64 * 1024
+
+
+class ResultsDecoder:
+    """
+    Incremental decoder of the ``results`` array of a paginated list response.
+
+    Items are decoded one by one as the body is received, the other members of
+    the envelope (``count``, ``next``, ...) are collected in ``envelope``.
+    """
+
+    def __init__(self, chunks: AsyncIterator[bytes]) -> None:
+        self.envelope: dict[str, Any] = {}
+
+        self._chunks = chunks
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    async def items(self) -> AsyncIterator[Any]:
+        await self._expect("{")
+
+        if await self._peek() == "}":
+            self._pos += 1
+            return
+
+        while True:
+            key = await self._value()
+            await self._expect(":")
+
+            if key == "results":
+                async for item in self._array():
+                    yield item
+
+            else:
+                self.envelope[key] = await self._value()
+
+            if await self._next_separator("}"):
+                return
+
+    async def _array(self) -> AsyncIterator[Any]:
+        await self._expect("[")
+
+        if await self._peek() == "]":
+            self._pos += 1
+            return
+
+        while True:
+            yield await self._value()
+
+            if await self._next_separator("]"):
+                return
+
+    async def _next_separator(self, closing: str) -> bool:
+        char = await self._peek()
+        self._pos += 1
+
+        if char == ",":
+            return False
+
+        if char == closing:
+            return True
+
+        raise ValueError(f"Expected ',' or '{closing}', got: {char!r}")
+
+    async def _expect(self, expected: str) -> None:
+        char = await self._peek()
+
+        if char != expected:
+            raise ValueError(f"Expected '{expected}', got: {char!r}")
+
+        self._pos += 1
+
+    async def _peek(self) -> str:
+        while True:
+            while self._pos < len(self._buffer):
+                if self._buffer[self._pos] not in WHITESPACE:
+                    return self._buffer[self._pos]
+
+                self._pos += 1
+
+            if not await self._fill():
+                raise ValueError("Unexpected end of stream")
+
+    async def _value(self) -> Any:
+        await self._peek()
+
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+
+            except json.JSONDecodeError:
+                if not await self._fill():
+                    raise
+
+                continue
+
+            # A value ending with the buffer might be truncated (i.e. a number).
+            if end == len(self._buffer) and await self._fill():
+                continue
+
+            self._pos = end
+            return value
+
+    async def _fill(self) -> bool:
+        if self._eof:
+            return False
+
+        if self._pos > COMPACT_THRESHOLD:
+            self._buffer = self._buffer[self._pos :]
+            self._pos = 0
+
+        try:
+            chunk = await anext(self._chunks)
+
+        except StopAsyncIteration:
+            self._eof = True
+            self._buffer += self._utf8.decode(b"", final=True)
+            return False
+
+        self._buffer += self._utf8.decode(chunk)
+        return True
@@ -52,3 +52,99 @@ FixedOAS30Validator = create(
     format_checker=OAS30Validator.FORMAT_CHECKER,
     id_of=lambda schema: cast(Mapping[str, Any], schema).get("id", ""),
 )
+
+
+def json_pointer(*segments: str) -> str:
+    return "".join(
+        "/" + segment.replace("~", "~0").replace("/", "~1") for segment in segments
+    )
+
+
+class SchemaValidators:
+    """
+    Cache of compiled validators for the sub-schemas of an OpenAPI document.
+
+    Every validator is derived from a single validator of the whole document,
+    so they all share the same reference resolver: ``#/components/...``
+    references are resolved against the document, without copying it into each
+    sub-schema.
+    """
+
+    def __init__(self, root_schema: dict[str, Any]) -> None:
+        """
+        :param root_schema: The OpenAPI document.
+        """
+
+        self.root_schema = root_schema
+        self._root_validator = FixedOAS30Validator(root_schema)
+        self._validators: dict[tuple[str, bool], Validator] = {}
+
+    def resolve(self, pointer: str) -> Any:
+        """
+        Get the node located at the given JSON pointer.
+
+        :param pointer: JSON pointer in the OpenAPI document.
+        :return: The node.
+        """
+
+        node: Any = self.root_schema
+
+        for segment in pointer.split("/")[1:]:
+            segment = segment.replace("~1", "/").replace("~0", "~")
+            node = node[int(segment)] if isinstance(node, list) else node[segment]
+
+        return node
+
+    def get(self, pointer: str, projected: bool = False) -> Validator:
+        """
+        Get the validator of the sub-schema located at the given JSON pointer,
+        compiling it on first use.
+
+        Projected objects (see the ``brief``, ``fields``, ``exclude`` and
+        ``omit`` query parameters of Netbox) may miss required fields: the
+        fields that are present are validated, but the ``required`` keyword of
+        the projected objects is ignored. The objects nested in them are
+        validated as usual.
+
+        :param pointer: JSON pointer to the sub-schema in the OpenAPI document.
+        :param projected: Whether the validated objects are projected (either the object itself, or the ``results`` of a paginated list).
+        :return: The compiled validator.
+        """
+
+        validator = self._validators.get((pointer, projected))
+
+        if validator is None:
+            schema = self.resolve(pointer)
+
+            if projected:
+                schema = self._projected(schema)
+
+            validator = self._root_validator.evolve(schema=schema)
+            self._validators[(pointer, projected)] = validator
+
+        return validator
+
+    def _projected(self, schema: dict[str, Any]) -> dict[str, Any]:
+        schema = self._dereference(schema)
+        properties = schema.get("properties", {})
+
+        if "count" in properties and "results" in properties:
+            results = properties["results"]
+            return {
+                **schema,
+                "properties": {
+                    **properties,
+                    "results": {
+                        **results,
+                        "items": self._projected(results["items"]),
+                    },
+                },
+            }
+
+        return {key: value for key, value in schema.items() if key != "required"}
+
+    def _dereference(self, schema: dict[str, Any]) -> dict[str, Any]:
+        while "$ref" in schema:
+            schema = self.resolve(schema["$ref"].removeprefix("#"))
+
+        return schema
@@ -0,0 +1,222 @@
+"""
+Load balancing of the requests sent to Netbox across several endpoints (app
+replicas, and read-only replicas).
+"""
+
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+import time
+
+from httpx import Response, TransportError
+from pydantic import BaseModel
+
+
+class EndpointStats(BaseModel):
+    """
+    State and counters of a Netbox endpoint.
+    """
+
+    url: str
+    """
+    URL of the endpoint.
+    """
+
+    read_only: bool
+    """
+    Whether only ``GET`` requests are sent to this endpoint.
+    """
+
+    outstanding: int
+    """
+    Number of requests currently sent to this endpoint.
+    """
+
+    requests: int
+    """
+    Number of requests sent to this endpoint.
+    """
+
+    failures: int
+    """
+    Number of failed requests (``5xx`` responses, or transport errors).
+    """
+
+    ejected: bool
+    """
+    Whether the endpoint is currently ejected, after consecutive failures.
+    """
+
+
+class Endpoint:
+    def __init__(self, url: str, read_only: bool) -> None:
+        self.url = url.rstrip("/")
+        self.read_only = read_only
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejected_until = float("-inf")
+
+
+class Route:
+    """
+    Endpoint selected for a single request (see ``EndpointBalancer.route``).
+    """
+
+    def __init__(self, endpoint: Endpoint) -> None:
+        self.endpoint = endpoint
+        self.response: Response | None = None
+
+    def url(self, path: str) -> str:
+        """
+        Absolute URL of an API path on the selected endpoint.
+
+        :param path: The API path (i.e. ``/api/dcim/sites/``).
+        :return: The URL.
+        """
+
+        return f"{self.endpoint.url}/{path.lstrip('/')}"
+
+    def record(self, response: Response) -> None:
+        """
+        Record the response of the request, used to check the health of the
+        endpoint once the request is done.
+
+        :param response: The HTTP response.
+        """
+
+        self.response = response
+
+
+class EndpointBalancer:
+    """
+    Send each request to the healthy endpoint with the least outstanding
+    requests: ``GET`` requests to the read-only endpoints (if any), other
+    requests to the primary endpoints.
+
+    An endpoint is ejected for ``ejection_time`` seconds after
+    ``failure_threshold`` consecutive failures (``5xx`` responses, or
+    transport errors). If all read-only endpoints are ejected, ``GET``
+    requests are sent to the primary endpoints. If all candidate endpoints are
+    ejected, requests are still sent to the one with the least outstanding
+    requests.
+    """
+
+    def __init__(
+        self,
+        primary: list[str],
+        read_only: list[str],
+        failure_threshold: int,
+        ejection_time: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        :param primary: URLs of the primary endpoints.
+        :param read_only: URLs of the read-only endpoints.
+        :param failure_threshold: Number of consecutive failures ejecting an endpoint (endpoints are never ejected if ``0``).
+        :param ejection_time: Time an endpoint stays ejected, in seconds.
+        :param clock: Monotonic clock, in seconds.
+        """
+
+        if not primary:
+            raise ValueError("At least one primary endpoint is required")
+
+        self.failure_threshold = failure_threshold
+        self.ejection_time = ejection_time
+
+        self._clock = clock
+        self._primary = [Endpoint(url, read_only=False) for url in primary]
+        self._read_only = [Endpoint(url, read_only=True) for url in read_only]
+        self._next = 0
+
+    @property
+    def urls(self) -> list[str]:
+        """
+        URLs of all the endpoints.
+        """
+
+        return [endpoint.url for endpoint in self._primary + self._read_only]
+
+    @property
+    def stats(self) -> list[EndpointStats]:
+        """
+        State and counters of each endpoint.
+        """
+
+        now = self._clock()
+
+        return [
+            EndpointStats(
+                url=endpoint.url,
+                read_only=endpoint.read_only,
+                outstanding=endpoint.outstanding,
+                requests=endpoint.requests,
+                failures=endpoint.failures,
+                ejected=endpoint.ejected_until > now,
+            )
+            for endpoint in self._primary + self._read_only
+        ]
+
+    @asynccontextmanager
+    async def route(self, read: bool) -> AsyncIterator[Route]:
+        """
+        Select an endpoint, and count the request as outstanding on it while
+        it is sent.
+
+        :param read: Whether the request is a read (``GET``) request.
+        :return: The route, on which the response must be recorded.
+        """
+
+        endpoint = self._select(read)
+        endpoint.outstanding += 1
+        endpoint.requests += 1
+        route = Route(endpoint)
+        failed = None
+
+        try:
+            yield route
+
+        except TransportError:
+            failed = True
+            raise
+
+        finally:
+            endpoint.outstanding -= 1
+
+            # Otherwise, only the recorded response (if any) is taken into
+            # account.
+            if failed is None and route.response is not None:
+                failed = route.response.status_code >= 500
+
+            if failed is not None:
+                self._record(endpoint, failed)
+
+    def _select(self, read: bool) -> Endpoint:
+        now = self._clock()
+        candidates = self._read_only if read and self._read_only else self._primary
+        healthy = [ep for ep in candidates if ep.ejected_until <= now]
+
+        if not healthy and candidates is self._read_only:
+            candidates = self._primary
+            healthy = [ep for ep in candidates if ep.ejected_until <= now]
+
+        if not healthy:
+            healthy = candidates
+
+        # Ties are broken in a round-robin fashion.
+        self._next += 1
+        offset = self._next % len(healthy)
+        rotated = healthy[offset:] + healthy[:offset]
+        return min(rotated, key=lambda ep: ep.outstanding)
+
+    def _record(self, endpoint: Endpoint, failed: bool) -> None:
+        if not failed:
+            endpoint.consecutive_failures = 0
+            return
+
+        endpoint.failures += 1
+        endpoint.consecutive_failures += 1
+
+        if 0 < self.failure_threshold <= endpoint.consecutive_failures:
+            endpoint.consecutive_failures = 0
+            endpoint.ejected_until = self._clock() + self.ejection_time
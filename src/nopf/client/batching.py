@@ -0,0 +1,146 @@
+"""
+Batching of ``*_retrieve`` calls into ``*_list`` calls.
+"""
+
+from typing import TYPE_CHECKING, Any
+
+from anyio import Event, sleep
+
+from pydantic import BaseModel
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .operation import Operation, Projection, Result, ValidationPolicy
+
+
+class BatchingStats(BaseModel):
+    """
+    Retrieve batching counters.
+    """
+
+    loads: int = 0
+    """
+    Number of batched ``*_retrieve`` calls.
+    """
+
+    batches: int = 0
+    """
+    Number of ``*_list`` calls they were batched into.
+    """
+
+
+class _Batch:
+    def __init__(self) -> None:
+        self.object_ids: dict[str, Any] = {}
+        self.done = Event()
+        self.result: Result | None = None
+        self.items: dict[str, Any] = {}
+        self.error: Exception | None = None
+
+
+class RetrieveBatcher:
+    """
+    DataLoader-style batching: the ``*_retrieve`` calls of a collection issued
+    within the same batching window are sent as a single ``*_list`` call,
+    filtered by ``id``. Its results are then dispatched to each caller.
+
+    Only the calls with the same validation policy and projection are batched
+    together.
+    """
+
+    def __init__(self, window: float, max_size: int) -> None:
+        """
+        :param window: Time to wait for other calls before sending a batch, in seconds (if ``0``, wait for a single scheduling tick).
+        :param max_size: Maximum number of objects per batch.
+        """
+
+        self.window = window
+        self.max_size = max_size
+        self.stats = BatchingStats()
+        self._batches: dict[tuple[str, str, str], _Batch] = {}
+
+    async def load(
+        self,
+        list_operation: "Operation",
+        object_id: Any,
+        policy: "ValidationPolicy",
+        projection: "Projection",
+    ) -> tuple["Result", Any | None]:
+        """
+        Load an object by ID through a batched list call.
+
+        :param list_operation: The ``*_list`` operation of the collection.
+        :param object_id: ID of the object.
+        :param policy: Validation policy of the list call.
+        :param projection: Projection of the list call.
+        :return: The result of the list call, and the object (``None`` if not found, or if the list call failed).
+        """
+
+        self.stats.loads += 1
+        key = (
+            list_operation.name,
+            policy.model_dump_json(),
+            projection.model_dump_json(),
+        )
+
+        while True:
+            batch = self._batches.get(key)
+
+            if batch is None:
+                batch = _Batch()
+                batch.object_ids[str(object_id)] = object_id
+                self._batches[key] = batch
+                await self._run(key, list_operation, batch, policy, projection)
+
+            else:
+                batch.object_ids[str(object_id)] = object_id
+
+                # Full batches are closed, the next call starts a new one.
+                if len(batch.object_ids) >= self.max_size:
+                    self._close(key, batch)
+
+                await batch.done.wait()
+
+            if batch.error is not None:
+                raise batch.error
+
+            # The call sending the batch was cancelled, try again.
+            if batch.result is None:
+                continue
+
+            return batch.result, batch.items.get(str(object_id))
+
+    async def _run(
+        self,
+        key: tuple[str, str, str],
+        list_operation: "Operation",
+        batch: _Batch,
+        policy: "ValidationPolicy",
+        projection: "Projection",
+    ) -> None:
+        try:
+            await sleep(self.window)
+            self._close(key, batch)
+
+            object_ids = list(batch.object_ids.values())
+            self.stats.batches += 1
+            result = await list_operation(
+                params={"id": object_ids, "limit": len(object_ids)},
+                validation=policy,
+                projection=projection,
+            )
+
+            if result.is_success:
+                batch.items = {str(item["id"]): item for item in result.data["results"]}
+
+            batch.result = result
+
+        except Exception as err:
+            batch.error = err
+
+        finally:
+            self._close(key, batch)
+            batch.done.set()
+
+    def _close(self, key: tuple[str, str, str], batch: _Batch) -> None:
+        if self._batches.get(key) is batch:
+            del self._batches[key]
@@ -0,0 +1,355 @@
+"""
+Read cache of the Netbox HTTP client.
+
+Responses of ``*_retrieve`` and ``*_list`` operations are cached, and evicted
+when the operator receives a webhook for the corresponding object, or when the
+client writes to it.
+"""
+
+from typing import Any
+
+from collections.abc import Callable, Hashable
+from collections import OrderedDict
+import time
+import json
+import re
+
+from pydantic import BaseModel
+
+
+type CacheKey = tuple[str, str]
+
+
+# Only plain collection and object endpoints are cached, their content only
+# depends on the objects of that collection.
+_COLLECTION_PATH = re.compile(r"^(/api/[^/{}]+/(?:[^/{}]+/)+?)(\{id\}/)?$")
+_OBJECT_URL = re.compile(r"(/api/[^/]+/(?:[^/]+/)+?)(\d+)/$")
+_COMPONENT_REF = re.compile(r"^#/components/schemas/(?:Paginated(\w+)List|(\w+))$")
+
+
+def request_key(operation_id: str, params: dict[str, Any]) -> CacheKey:
+    """
+    Key identifying a read request: the operation and its normalized
+    parameters.
+
+    :param operation_id: ID of the operation.
+    :param params: The path and query parameters.
+    :return: The request key.
+    """
+
+    normalized = {
+        name: sorted(value, key=str) if isinstance(value, list) else value
+        for name, value in params.items()
+    }
+    return operation_id, json.dumps(normalized, sort_keys=True, default=str)
+
+
+def collection_of(operation_id: str, method: str, path: str) -> str | None:
+    """
+    Collection of objects read by an operation, if its responses can be
+    cached.
+
+    :param operation_id: ID of the operation.
+    :param method: HTTP method of the operation.
+    :param path: Path of the operation.
+    :return: The path of the collection, or ``None``.
+    """
+
+    if method != "get":
+        return None
+
+    if not operation_id.endswith(("_retrieve", "_list")):
+        return None
+
+    match = _COLLECTION_PATH.match(path)
+    if match is None:
+        return None
+
+    return match.group(1)
+
+
+def written_collection(method: str, path: str) -> str | None:
+    """
+    Collection of objects modified by an operation.
+
+    :param method: HTTP method of the operation.
+    :param path: Path of the operation.
+    :return: The path of the collection, or ``None`` for read operations.
+    """
+
+    if method == "get":
+        return None
+
+    match = _COLLECTION_PATH.match(path)
+    if match is None:
+        return None
+
+    return match.group(1)
+
+
+def model_collections(schema: dict[str, Any]) -> dict[str, str]:
+    """
+    Collection of the objects of each model (i.e. ``/api/dcim/sites/`` for
+    ``dcim.site``), found from the response schemas of the read operations.
+
+    :param schema: The OpenAPI schema.
+    :return: The path of the collections, by model name.
+    """
+
+    collections: dict[str, str] = {}
+
+    for path, path_spec in schema["paths"].items():
+        operation_spec = path_spec.get("get")
+        if operation_spec is None:
+            continue
+
+        collection = collection_of(operation_spec["operationId"], "get", path)
+        if collection is None:
+            continue
+
+        response_schema = (
+            operation_spec["responses"]
+            .get("200", {})
+            .get("content", {})
+            .get("application/json", {})
+            .get("schema", {})
+        )
+        match = _COMPONENT_REF.match(response_schema.get("$ref", ""))
+        if match is None:
+            continue
+
+        # Models are named after their serializer, in the application of the
+        # collection (i.e. `/api/plugins/<app>/<collection>/`).
+        app = collection.strip("/").split("/")[-2]
+        model = (match.group(1) or match.group(2)).lower()
+        collections[f"{app}.{model}"] = collection
+
+    return collections
+
+
+class CacheStats(BaseModel):
+    """
+    Read cache counters.
+    """
+
+    hits: int = 0
+    """
+    Number of requests served from the cache.
+    """
+
+    misses: int = 0
+    """
+    Number of cacheable requests sent to Netbox.
+    """
+
+    evictions: int = 0
+    """
+    Number of entries evicted because the cache was full, or expired.
+    """
+
+    invalidations: int = 0
+    """
+    Number of entries evicted because the object changed.
+    """
+
+    stale: int = 0
+    """
+    Number of results not stored, because the object changed while they were
+    read.
+    """
+
+
+class ResponseCache:
+    """
+    Size-bounded LRU cache, with a TTL, of the results of read operations.
+
+    Each entry is tagged with the collection it was read from (and the object
+    ID for ``*_retrieve`` operations), so that it can be invalidated when an
+    object of this collection changes.
+
+    Invalidations are also recorded as a generation of each collection: a
+    result read before an invalidation, and stored after it, is dropped (see
+    ``generation``).
+
+    .. note::
+
+       Cached results are shared between callers, they must not be mutated.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        :param max_size: Maximum number of entries.
+        :param ttl: Lifetime of an entry, in seconds (entries do not expire if ``0``).
+        :param clock: Monotonic clock, in seconds.
+        """
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stats = CacheStats()
+
+        self._clock = clock
+        self._entries: OrderedDict[CacheKey, tuple[float, str, Hashable, Any]] = (
+            OrderedDict()
+        )
+
+        # Bumped when the entries of a collection (or of all of them) are
+        # invalidated.
+        self._generations: dict[str, int] = {}
+        self._epoch = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: CacheKey) -> Any | None:
+        """
+        Lookup a cached result.
+
+        :param key: The request key (see ``request_key``).
+        :return: The cached result, or ``None``.
+        """
+
+        entry = self._entries.get(key)
+
+        if entry is not None and self.ttl > 0 and entry[0] <= self._clock():
+            del self._entries[key]
+            self.stats.evictions += 1
+            entry = None
+
+        if entry is None:
+            self.stats.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return entry[3]
+
+    def generation(self, collection: str) -> tuple[int, int]:
+        """
+        Current generation of a collection, to be taken before reading a
+        result, and given back when storing it.
+
+        :param collection: Path of the collection.
+        :return: The generation.
+        """
+
+        return self._epoch, self._generations.get(collection, 0)
+
+    def put(
+        self,
+        key: CacheKey,
+        collection: str,
+        object_id: Hashable,
+        result: Any,
+        generation: tuple[int, int] | None = None,
+    ) -> None:
+        """
+        Store a result.
+
+        :param key: The request key (see ``request_key``).
+        :param collection: Path of the collection the result was read from.
+        :param object_id: ID of the object for ``*_retrieve`` operations, ``None`` for ``*_list`` operations.
+        :param result: The result.
+        :param generation: Generation of the collection when the result was read (see ``generation``), the result is not stored if it changed since then.
+        """
+
+        if generation is not None and generation != self.generation(collection):
+            self.stats.stale += 1
+            return
+
+        expires_at = self._clock() + self.ttl
+        self._entries[key] = (expires_at, collection, object_id, result)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def invalidate(self, collection: str, object_id: Hashable) -> None:
+        """
+        Evict the entries of an object: its ``*_retrieve`` results, and the
+        ``*_list`` results of its collection.
+
+        :param collection: Path of the collection.
+        :param object_id: ID of the object.
+        """
+
+        stale_keys = [
+            key
+            for key, (_, entry_collection, entry_object_id, _) in self._entries.items()
+            if entry_collection == collection
+            and (entry_object_id is None or str(entry_object_id) == str(object_id))
+        ]
+
+        self._generations[collection] = self._generations.get(collection, 0) + 1
+        self._evict(stale_keys)
+
+    def invalidate_collection(self, collection: str) -> None:
+        """
+        Evict the entries of all the objects of a collection.
+
+        :param collection: Path of the collection.
+        """
+
+        stale_keys = [
+            key
+            for key, (_, entry_collection, _, _) in self._entries.items()
+            if entry_collection == collection
+        ]
+
+        self._generations[collection] = self._generations.get(collection, 0) + 1
+        self._evict(stale_keys)
+
+    def invalidate_id(self, object_id: Hashable) -> None:
+        """
+        Evict the entries of an object whose collection is unknown: the
+        ``*_retrieve`` results of any collection with this object ID, and all
+        the ``*_list`` results.
+
+        :param object_id: ID of the object.
+        """
+
+        stale_keys = [
+            key
+            for key, (_, _, entry_object_id, _) in self._entries.items()
+            if entry_object_id is None or str(entry_object_id) == str(object_id)
+        ]
+
+        self._epoch += 1
+        self._evict(stale_keys)
+
+    def invalidate_url(self, url: str) -> None:
+        """
+        Evict the entries of the object at the given API URL (as found in the
+        ``url`` field of Netbox objects). If the URL is not recognized, the
+        whole cache is cleared.
+
+        :param url: URL of the object.
+        """
+
+        match = _OBJECT_URL.search(url)
+
+        if match is None:
+            self.clear()
+            return
+
+        self.invalidate(match.group(1), match.group(2))
+
+    def clear(self) -> None:
+        """
+        Evict all entries.
+        """
+
+        self._epoch += 1
+        self.stats.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def _evict(self, keys: list[CacheKey]) -> None:
+        for key in keys:
+            del self._entries[key]
+
+        self.stats.invalidations += len(keys)
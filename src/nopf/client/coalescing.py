@@ -0,0 +1,91 @@
+"""
+Coalescing of identical concurrent read requests.
+"""
+
+from typing import Any
+
+from collections.abc import Awaitable, Callable, Hashable
+
+from anyio import Event
+
+from pydantic import BaseModel
+
+
+class CoalescingStats(BaseModel):
+    """
+    Request coalescing counters.
+    """
+
+    executed: int = 0
+    """
+    Number of requests actually sent to Netbox.
+    """
+
+    coalesced: int = 0
+    """
+    Number of requests that shared the response of an identical in-flight
+    request.
+    """
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = Event()
+        self.result: Any = None
+        self.error: Exception | None = None
+        self.completed = False
+
+
+class RequestCoalescer:
+    """
+    Single-flight execution of identical requests: while a request is in
+    flight, identical requests wait for it and share its result (or its
+    error), instead of being sent again.
+
+    .. note::
+
+       The shared result must not be mutated by the callers.
+    """
+
+    def __init__(self) -> None:
+        self.stats = CoalescingStats()
+        self._calls: dict[Hashable, _Call] = {}
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``func``, unless an identical request is already in flight.
+
+        :param key: Key identifying the request.
+        :param func: Callable sending the request.
+        :return: The result of ``func``, or of the in-flight request.
+        """
+
+        while (call := self._calls.get(key)) is not None:
+            self.stats.coalesced += 1
+            await call.done.wait()
+
+            if call.error is not None:
+                raise call.error
+
+            if call.completed:
+                return call.result
+
+            # The in-flight request was cancelled, send it ourselves.
+            self.stats.coalesced -= 1
+
+        call = _Call()
+        self._calls[key] = call
+        self.stats.executed += 1
+
+        try:
+            call.result = await func()
+            call.completed = True
+            return call.result
+
+        except Exception as err:
+            call.error = err
+            raise
+
+        finally:
+            del self._calls[key]
+            call.done.set()
@@ -0,0 +1,84 @@
+"""
+GraphQL queries sent to Netbox.
+
+A single query can fetch an object with its related objects (i.e. a device
+with its interfaces, IP addresses and site), which would take several
+requests with the REST API.
+"""
+
+from typing import Any
+
+from hashlib import sha256
+import json
+
+from httpx import Response
+
+from .cache import CacheKey
+
+
+GRAPHQL_PATH = "/graphql/"
+
+GRAPHQL_COLLECTION = "graphql"
+"""
+Collection of the GraphQL results in their cache (they are all evicted when
+any object changes, as a query can read objects from any collection).
+"""
+
+
+class GraphQLError(RuntimeError):
+    """
+    Raised when Netbox returns errors for a GraphQL query.
+    """
+
+    def __init__(self, errors: list[Any]) -> None:
+        """
+        :param errors: The ``errors`` of the response.
+        """
+
+        messages = "; ".join(
+            error.get("message", str(error)) if isinstance(error, dict) else str(error)
+            for error in errors
+        )
+        super().__init__(f"GraphQL query failed: {messages}")
+        self.errors = errors
+
+
+def query_key(query: str, variables: dict[str, Any]) -> CacheKey:
+    """
+    Key identifying a GraphQL query: the hash of its document, and its
+    normalized variables.
+
+    :param query: The GraphQL document.
+    :param variables: The variables of the query.
+    :return: The cache key.
+    """
+
+    document_hash = sha256(query.encode()).hexdigest()
+    return document_hash, json.dumps(variables, sort_keys=True, default=str)
+
+
+def query_data(response: Response) -> dict[str, Any]:
+    """
+    Extract the ``data`` of a GraphQL response.
+
+    :param response: The HTTP response.
+    :return: The data.
+    :raises GraphQLError: If the response contains errors, or has no ``data``.
+    :raises httpx.HTTPStatusError: If the request failed without GraphQL errors.
+    """
+
+    try:
+        body = response.json()
+
+    except ValueError:
+        body = None
+
+    if isinstance(body, dict) and body.get("errors"):
+        raise GraphQLError(body["errors"])
+
+    response.raise_for_status()
+
+    if not isinstance(body, dict) or not isinstance(body.get("data"), dict):
+        raise GraphQLError(["Malformed response body"])
+
+    return body["data"]
@@ -0,0 +1,214 @@
+"""
+Hedging of idempotent requests, to cut their tail latency.
+"""
+
+from typing import TYPE_CHECKING
+
+from collections.abc import Awaitable, Callable
+from collections import deque
+from math import ceil
+import time
+
+from anyio import Event, create_task_group, move_on_after
+
+from pydantic import BaseModel
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .operation import Result
+
+
+class HedgingStats(BaseModel):
+    """
+    Request hedging counters.
+    """
+
+    requests: int = 0
+    """
+    Number of hedgeable requests.
+    """
+
+    hedged: int = 0
+    """
+    Number of duplicate requests sent.
+    """
+
+    wins: int = 0
+    """
+    Number of requests answered by their duplicate first.
+    """
+
+
+class LatencyWindow:
+    """
+    Latencies of the most recent requests of an operation.
+    """
+
+    def __init__(self, size: int) -> None:
+        """
+        :param size: Number of latencies kept.
+        """
+
+        self._samples: deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, latency: float) -> None:
+        """
+        Record the latency of a request.
+
+        :param latency: The latency, in seconds.
+        """
+
+        self._samples.append(latency)
+
+    def percentile(self, percent: float) -> float:
+        """
+        Compute a percentile of the recorded latencies (nearest-rank method).
+
+        :param percent: The percentile, between ``0`` and ``100``.
+        :return: The latency, in seconds.
+        :raises ValueError: If no latency was recorded.
+        """
+
+        if not self._samples:
+            raise ValueError("No latency recorded")
+
+        samples = sorted(self._samples)
+        rank = max(1, ceil(percent / 100 * len(samples)))
+        return samples[rank - 1]
+
+
+class RequestHedger:
+    """
+    Send a duplicate of a request when no response arrived within the
+    ``percentile`` of the recent latencies of its operation, and use the first
+    response received (the other request is cancelled).
+
+    At most ``budget`` percent of the requests are hedged, so that hedging
+    does not add much load on Netbox when it is slow as a whole.
+
+    Only the latency of the original request is recorded. If it is cancelled
+    because its duplicate answered first, the time it waited is recorded as a
+    lower bound of its latency, so that the percentile is not biased towards
+    the fastest responses.
+
+    .. note::
+
+       Only idempotent requests must be hedged.
+    """
+
+    def __init__(
+        self,
+        percentile: float,
+        budget: float,
+        window: int = 100,
+        min_samples: int = 20,
+    ) -> None:
+        """
+        :param percentile: Percentile of the recent latencies after which a request is hedged.
+        :param budget: Maximum percentage of hedged requests.
+        :param window: Number of recent latencies kept per operation.
+        :param min_samples: Number of latencies to observe before hedging the requests of an operation.
+        """
+
+        self.percentile = percentile
+        self.budget = budget
+        self.window = window
+        self.min_samples = min_samples
+        self.stats = HedgingStats()
+
+    def latency_window(self) -> LatencyWindow:
+        """
+        Create the latency window of an operation.
+
+        :return: The latency window.
+        """
+
+        return LatencyWindow(self.window)
+
+    async def run(
+        self,
+        latencies: LatencyWindow,
+        send: Callable[[], Awaitable["Result"]],
+    ) -> "Result":
+        """
+        Send a request, hedging it if it is too slow.
+
+        :param latencies: The latency window of the operation.
+        :param send: Callable sending the request.
+        :return: The first response received.
+        :raises Exception: The error of the first request, if all requests failed.
+        """
+
+        self.stats.requests += 1
+
+        # Not enough samples yet, or no budget left: no need to watch the
+        # request.
+        if len(latencies) < self.min_samples or not self._within_budget():
+            started_at = time.perf_counter()
+            result = await send()
+            latencies.record(time.perf_counter() - started_at)
+            return result
+
+        delay = latencies.percentile(self.percentile)
+        results: list[Result] = []
+        errors: list[Exception] = []
+        done = Event()
+        attempts = 1
+
+        async with create_task_group() as tg:
+
+            async def attempt(hedge: bool) -> None:
+                started_at = time.perf_counter()
+
+                try:
+                    result = await send()
+
+                except Exception as err:
+                    errors.append(err)
+
+                    if len(errors) == attempts:
+                        done.set()
+
+                    return
+
+                except BaseException:
+                    # Cancelled, the original request took at least that
+                    # long.
+                    if not hedge:
+                        latencies.record(time.perf_counter() - started_at)
+
+                    raise
+
+                if not hedge:
+                    latencies.record(time.perf_counter() - started_at)
+
+                if not results:
+                    self.stats.wins += int(hedge)
+
+                # The first response wins, the other request (if any) is
+                # cancelled.
+                results.append(result)
+                done.set()
+
+                if attempts > 1:
+                    tg.cancel_scope.cancel()
+
+            tg.start_soon(attempt, False)
+
+            with move_on_after(delay):
+                await done.wait()
+
+            if not done.is_set() and self._within_budget():
+                attempts += 1
+                self.stats.hedged += 1
+                tg.start_soon(attempt, True)
+
+        if results:
+            return results[0]
+
+        raise errors[0]
+
+    def _within_budget(self) -> bool:
+        return self.stats.hedged < self.budget / 100 * self.stats.requests
@@ -0,0 +1,364 @@
+"""
+Adaptive concurrency limiting of the requests sent to Netbox, with a circuit
+breaker.
+"""
+
+from typing import Literal
+
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+from datetime import datetime, UTC
+import time
+
+from anyio import Event, sleep
+
+from httpx import Response, TransportError
+from pydantic import BaseModel
+
+
+type CircuitState = Literal["closed", "open", "half_open"]
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised when a request is rejected because Netbox is considered down.
+    """
+
+
+class LimiterState(BaseModel):
+    """
+    Current state of the concurrency limiter.
+    """
+
+    limit: int
+    """
+    Current maximum number of concurrent requests.
+    """
+
+    in_flight: int
+    """
+    Number of requests currently sent to Netbox.
+    """
+
+    queued: int
+    """
+    Number of requests waiting for a slot.
+    """
+
+    circuit: CircuitState
+    """
+    State of the circuit breaker:
+
+    * ``closed``: requests are sent
+    * ``open``: requests fail fast with a ``CircuitOpenError``
+    * ``half_open``: a single probe request is sent to check if Netbox recovered
+    """
+
+    retry_after: float
+    """
+    Time until requests are sent again after a ``Retry-After`` response, in
+    seconds (``0`` if not throttled).
+    """
+
+    decreases: int
+    """
+    Number of times the limit was decreased.
+    """
+
+    rejected: int
+    """
+    Number of requests rejected by the circuit breaker.
+    """
+
+
+def retry_after_delay(response: Response, now: datetime | None = None) -> float | None:
+    """
+    Delay requested by the ``Retry-After`` header of a response.
+
+    :param response: The HTTP response.
+    :param now: Current date, for HTTP-date values (defaults to now).
+    :return: The delay in seconds, or ``None`` if there is no valid header.
+    """
+
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+
+    except ValueError:
+        pass
+
+    try:
+        date = parsedate_to_datetime(value)
+
+    except (TypeError, ValueError):
+        return None
+
+    now = now or datetime.now(UTC)
+    return max(0.0, (date - now).total_seconds())
+
+
+class Permit:
+    """
+    Slot acquired for a single request (see ``AdaptiveLimiter.acquire``).
+    """
+
+    def __init__(self, clock: Callable[[], float]) -> None:
+        self.started_at = clock()
+        self.response: Response | None = None
+        self.latency: float | None = None
+
+        self._clock = clock
+
+    def record(self, response: Response) -> None:
+        """
+        Record the response of the request, and its latency, used to adapt the
+        limit once the slot is released.
+
+        :param response: The HTTP response.
+        """
+
+        self.response = response
+        self.latency = self._clock() - self.started_at
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limiter: the limit grows by one every ``limit``
+    successful requests, and is multiplied by ``backoff`` when Netbox shows
+    signs of overload (``429`` and ``5xx`` responses, transport errors, or
+    responses slower than ``latency_threshold``). Requests sent before the
+    last decrease do not decrease it again.
+
+    New requests are held back until the delay of a ``Retry-After`` header
+    has elapsed.
+
+    After ``failure_threshold`` consecutive failures (``5xx`` responses or
+    transport errors), the circuit opens: requests fail fast with a
+    ``CircuitOpenError`` for ``recovery_time`` seconds. Then a single probe
+    request is let through, closing the circuit if it succeeds.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int,
+        max_limit: int,
+        latency_threshold: float,
+        failure_threshold: int,
+        recovery_time: float,
+        min_limit: int = 1,
+        backoff: float = 0.5,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        :param initial_limit: Initial maximum number of concurrent requests.
+        :param max_limit: Upper bound of the limit.
+        :param latency_threshold: Latency above which a response is considered a sign of overload, in seconds.
+        :param failure_threshold: Number of consecutive failures opening the circuit (the circuit breaker is disabled if ``0``).
+        :param recovery_time: Time the circuit stays open, in seconds.
+        :param min_limit: Lower bound of the limit.
+        :param backoff: Factor applied to the limit on overload.
+        :param clock: Monotonic clock, in seconds.
+        """
+
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.latency_threshold = latency_threshold
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+        self.backoff = backoff
+
+        self._clock = clock
+        self._limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self._in_flight = 0
+        self._waiters: list[Event] = []
+        self._decreased_at = float("-inf")
+        self._decreases = 0
+        self._blocked_until = float("-inf")
+        self._circuit: CircuitState = "closed"
+        self._opened_until = float("-inf")
+        self._probing = False
+        self._failures = 0
+        self._rejected = 0
+
+    @property
+    def limit(self) -> int:
+        """
+        Current maximum number of concurrent requests.
+        """
+
+        return int(self._limit)
+
+    @property
+    def state(self) -> LimiterState:
+        """
+        Current state of the limiter.
+        """
+
+        now = self._clock()
+        circuit = self._circuit
+
+        if circuit == "open" and now >= self._opened_until:
+            circuit = "half_open"
+
+        return LimiterState(
+            limit=self.limit,
+            in_flight=self._in_flight,
+            queued=len(self._waiters),
+            circuit=circuit,
+            retry_after=max(0.0, self._blocked_until - now),
+            decreases=self._decreases,
+            rejected=self._rejected,
+        )
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Permit]:
+        """
+        Wait for a slot, and hold it while sending a request.
+
+        :return: The permit, on which the response must be recorded.
+        :raises CircuitOpenError: If the circuit is open.
+        """
+
+        probe = await self._wait_turn()
+        permit = Permit(self._clock)
+        failed = None
+
+        try:
+            yield permit
+
+        except TransportError:
+            failed = True
+            raise
+
+        finally:
+            # Otherwise, only the recorded response (if any) is taken into
+            # account.
+            if failed is None:
+                failed = self._is_failure(permit.response)
+
+            self._release(permit, probe, failed)
+
+    async def _wait_turn(self) -> bool:
+        # Fail fast, without waiting for a slot.
+        self._check_circuit()
+
+        if self._in_flight < int(self._limit) and not self._waiters:
+            self._in_flight += 1
+
+        else:
+            # Slots are handed over to waiters in FIFO order (see `_wake`).
+            event = Event()
+            self._waiters.append(event)
+
+            try:
+                await event.wait()
+
+            except BaseException:
+                if event in self._waiters:
+                    self._waiters.remove(event)
+
+                else:
+                    self._in_flight -= 1
+                    self._wake()
+
+                raise
+
+        try:
+            while True:
+                probe = self._check_circuit()
+                delay = self._blocked_until - self._clock()
+
+                if delay <= 0:
+                    self._probing = probe
+                    return probe
+
+                await sleep(delay)
+
+        except BaseException:
+            self._in_flight -= 1
+            self._wake()
+            raise
+
+    def _check_circuit(self) -> bool:
+        if self._circuit == "open":
+            if self._clock() < self._opened_until:
+                self._rejected += 1
+                raise CircuitOpenError("Netbox circuit breaker is open")
+
+            self._circuit = "half_open"
+
+        if self._circuit == "half_open":
+            if self._probing:
+                self._rejected += 1
+                raise CircuitOpenError("Netbox circuit breaker is half-open")
+
+            return True
+
+        return False
+
+    def _release(self, permit: Permit, probe: bool, failed: bool | None) -> None:
+        self._in_flight -= 1
+        now = self._clock()
+
+        if probe:
+            self._probing = False
+
+        if failed is not None:
+            response = permit.response
+            overloaded = (
+                failed
+                or (response is not None and response.status_code == 429)
+                or (
+                    permit.latency is not None
+                    and permit.latency > self.latency_threshold
+                )
+            )
+
+            if overloaded:
+                if permit.started_at >= self._decreased_at:
+                    self._limit = max(self.min_limit, self._limit * self.backoff)
+                    self._decreased_at = now
+                    self._decreases += 1
+
+            else:
+                self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+
+            if response is not None and response.status_code in (429, 503):
+                delay = retry_after_delay(response)
+
+                if delay is not None:
+                    self._blocked_until = max(self._blocked_until, now + delay)
+
+            if failed:
+                self._failures += 1
+
+                if probe or (
+                    self.failure_threshold > 0
+                    and self._failures >= self.failure_threshold
+                ):
+                    self._circuit = "open"
+                    self._opened_until = now + self.recovery_time
+
+            else:
+                self._failures = 0
+
+                if probe:
+                    self._circuit = "closed"
+
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._in_flight < int(self._limit) and self._waiters:
+            self._in_flight += 1
+            self._waiters.pop(0).set()
+
+    @staticmethod
+    def _is_failure(response: Response | None) -> bool | None:
+        if response is None:
+            return None
+
+        return response.status_code >= 500
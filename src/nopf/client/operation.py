@@ -1,11 +1,314 @@
-from typing import Any
+from typing import Any, Literal
 
-from copy import deepcopy
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import (
+    AbstractAsyncContextManager,
+    AsyncExitStack,
+    asynccontextmanager,
+    nullcontext,
+)
+from string import Formatter
+from math import ceil
+import random
+import time
 
-from httpx import AsyncClient as HTTPClient, Response
+from anyio import Event, Semaphore, create_memory_object_stream, create_task_group
+from pydantic import BaseModel
+from httpx import AsyncClient as HTTPClient, Request, Response, USE_CLIENT_DEFAULT
 from jsonschema import ValidationError  # type: ignore
+from jsonschema.protocols import Validator
 
-from ._validator import FixedOAS30Validator
+from ._validator import SchemaValidators, json_pointer
+from ._stream import ResultsDecoder
+from .cache import ResponseCache, collection_of, request_key, written_collection
+from .coalescing import RequestCoalescer
+from .batching import RetrieveBatcher
+from .limiter import AdaptiveLimiter, Permit
+from .hedging import RequestHedger
+from .priority import Priority, PriorityScheduler, current_priority, request_priority
+from .balancer import EndpointBalancer, Route
+
+try:
+    from orjson import loads as json_loads
+
+except ImportError:  # pragma: no cover
+    from json import loads as json_loads  # type: ignore[assignment]
+
+
+type ValidationMode = Literal["strict", "sampled", "off"]
+
+
+class ValidationPolicy(BaseModel):
+    """
+    How the responses of an operation are validated against the OpenAPI schema.
+    """
+
+    mode: ValidationMode = "strict"
+    """
+    Either ``strict`` (validate every response), ``sampled`` (validate a
+    sample of the responses) or ``off``.
+    """
+
+    sample_interval: int = 10
+    """
+    In ``sampled`` mode, validate 1 response every N responses.
+    """
+
+    sample_items: float = 10.0
+    """
+    In ``sampled`` mode, percentage of the ``results`` items of a paginated
+    list response that are validated.
+    """
+
+
+class Projection(BaseModel):
+    """
+    Fields of the objects returned by the read operations of Netbox, to reduce
+    the size of the responses, and their decoding time.
+
+    .. note::
+
+       Objects missing required fields because of the projection are still
+       accepted by the response validation.
+    """
+
+    brief: bool = False
+    """
+    Return the brief representation of the objects (``brief`` query
+    parameter).
+    """
+
+    fields: list[str] = []
+    """
+    Only return these fields (``fields`` query parameter, Netbox 4.0+).
+    """
+
+    exclude: list[str] = []
+    """
+    Exclude these fields (``exclude`` query parameter, i.e.
+    ``config_context`` on devices and virtual machines).
+    """
+
+    omit: list[str] = []
+    """
+    Omit these fields (``omit`` query parameter, Netbox 4.3+).
+    """
+
+    def query_params(self) -> dict[str, list[Any]]:
+        """
+        Query parameters requesting the projection.
+
+        :return: The query parameters (empty if nothing is projected).
+        """
+
+        query_params: dict[str, list[Any]] = {}
+
+        if self.brief:
+            query_params["brief"] = ["true"]
+
+        for name, values in [
+            ("fields", self.fields),
+            ("exclude", self.exclude),
+            ("omit", self.omit),
+        ]:
+            if values:
+                query_params[name] = [",".join(values)]
+
+        return query_params
+
+
+PROJECTION_PARAMS = ("brief", "fields", "exclude", "omit")
+
+
+class ValidationStats(BaseModel):
+    """
+    Response validation counters.
+    """
+
+    validated: int = 0
+    """
+    Number of validated responses.
+    """
+
+    skipped: int = 0
+    """
+    Number of responses that were not validated.
+    """
+
+    duration: float = 0.0
+    """
+    Total time spent validating responses, in seconds.
+    """
+
+
+class Result:
+    """
+    Response of an operation.
+
+    It behaves like the ``httpx.Response`` it wraps (attributes are delegated
+    to it), but its JSON body is decoded at most once, and shared between the
+    response validation and the caller.
+
+    .. note::
+
+       If `orjson <https://github.com/ijl/orjson>`_ is installed (see the
+       ``fast`` extra), it is used to decode the body.
+    """
+
+    def __init__(self, response: Response) -> None:
+        """
+        :param response: The HTTP response.
+        """
+
+        self.response = response
+        self._data: Any = None
+        self._decoded = False
+        self._encoded = True
+
+    @classmethod
+    def from_data(cls, status_code: int, data: Any, request: Request) -> "Result":
+        """
+        Build a result that was not received as is from Netbox (i.e. an item
+        of a batched request).
+
+        The data is used as is, the body is only encoded if it is read (see
+        ``content``).
+
+        :param status_code: HTTP status code.
+        :param data: Decoded JSON body.
+        :param request: The request the result answers.
+        :return: The result.
+        """
+
+        result = cls(
+            Response(
+                status_code,
+                headers={"Content-Type": "application/json"},
+                request=request,
+            ),
+        )
+        result._data = data
+        result._decoded = True
+        result._encoded = False
+        return result
+
+    @property
+    def data(self) -> Any:
+        """
+        Decoded JSON body of the response.
+        """
+
+        if not self._decoded:
+            self._data = json_loads(self.response.content)
+            self._decoded = True
+
+        return self._data
+
+    @property
+    def content(self) -> bytes:
+        """
+        Body of the response.
+        """
+
+        return self._encode().content
+
+    @property
+    def text(self) -> str:
+        """
+        Body of the response, as text.
+        """
+
+        return self._encode().text
+
+    def _encode(self) -> Response:
+        if not self._encoded:
+            self.response = Response(
+                self.response.status_code,
+                json=self._data,
+                request=self.response.request,
+            )
+            self._encoded = True
+
+        return self.response
+
+    def json(self) -> Any:
+        """
+        Same as ``data``, for compatibility with ``httpx.Response.json()``.
+        """
+
+        return self.data
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.response, name)
+
+
+def acquire_slot(
+    scheduler: PriorityScheduler | None,
+    limiter: AdaptiveLimiter | None,
+) -> AbstractAsyncContextManager[Permit | None]:
+    """
+    Wait for a slot to send a request to Netbox, from the priority scheduler
+    (with the priority of the current context), then from the adaptive
+    limiter.
+
+    :param scheduler: The priority scheduler, if enabled.
+    :param limiter: The adaptive limiter, if enabled.
+    :return: Async context manager holding the slot, and giving the permit on which the response must be recorded (``None`` if the limiter is disabled).
+    """
+
+    if scheduler is None and limiter is None:
+        return nullcontext()
+
+    return _acquire_slot(scheduler, limiter)
+
+
+@asynccontextmanager
+async def _acquire_slot(
+    scheduler: PriorityScheduler | None,
+    limiter: AdaptiveLimiter | None,
+) -> AsyncIterator[Permit | None]:
+    async with AsyncExitStack() as stack:
+        if scheduler is not None:
+            await stack.enter_async_context(scheduler.acquire(current_priority()))
+
+        if limiter is None:
+            yield None
+
+        else:
+            yield await stack.enter_async_context(limiter.acquire())
+
+
+class _PendingPage:
+    # Page of a paginated list, fetched while the previous ones are consumed.
+
+    def __init__(self) -> None:
+        self.ready = Event()
+        self.data: dict[str, Any] = {}
+        self.error: Exception | None = None
+
+    async def fetch(
+        self,
+        fetch_page: Callable[[int], Awaitable[dict[str, Any]]],
+        offset: int,
+    ) -> None:
+        # Errors are raised to the consumer when it reaches the page, so that
+        # the results of the previous pages are yielded first.
+        try:
+            self.data = await fetch_page(offset)
+
+        except Exception as err:
+            self.error = err
+
+        finally:
+            self.ready.set()
+
+    async def results(self) -> list[Any]:
+        await self.ready.wait()
+
+        if self.error is not None:
+            raise self.error
+
+        return self.data["results"]
 
 
 class Operation:
@@ -15,93 +318,730 @@ class Operation:
         method: str,
         path: str,
         spec: dict[str, Any],
-        root_schema: dict[str, Any],
+        validators: SchemaValidators,
+        validation: ValidationPolicy | None = None,
+        cache: ResponseCache | None = None,
+        coalescer: RequestCoalescer | None = None,
+        batcher: RetrieveBatcher | None = None,
+        list_operation: Callable[[], "Operation"] | None = None,
+        timeout: float | None = None,
+        limiter: AdaptiveLimiter | None = None,
+        hedger: RequestHedger | None = None,
+        scheduler: PriorityScheduler | None = None,
+        balancer: EndpointBalancer | None = None,
+        projection: Projection | None = None,
+        graphql_cache: ResponseCache | None = None,
     ) -> None:
         self.name = spec["operationId"]
         self.__doc__ = spec.get("description", "")
 
+        self.validation = validation or ValidationPolicy()
+        self.projection = projection or Projection()
+        self.validation_stats = ValidationStats()
+        self._responses_seen = 0
+
         self._client = client
         self._method = method
         self._path = path
         self._spec = spec
-        self._root_schema = root_schema
+        self._validators = validators
+        self._pointer = json_pointer("paths", path, method)
+        self._cache = cache
+        self._coalescer = coalescer
+        self._graphql_cache = graphql_cache
+        self._batch = None
+
+        if batcher is not None and list_operation is not None:
+            self._batch = (batcher, list_operation)
+        self._collection = collection_of(self.name, method, path)
+        self._written_collection = written_collection(method, path)
+        self._timeout = USE_CLIENT_DEFAULT if timeout is None else timeout
+        self._limiter = limiter
+        self._scheduler = scheduler
+        self._balancer = balancer
+        self._hedging = None
+
+        if hedger is not None and method == "get":
+            self._hedging = (hedger, hedger.latency_window())
+
+        # Index the parameters by name, so that a call only has to look at the
+        # parameters it is given, instead of scanning all the parameters
+        # declared by the operation (list operations declare hundreds of
+        # filters).
+        self._parameters: dict[str, tuple[str, str]] = {}
+        required_params: list[str] = []
+
+        for param_index, param_spec in enumerate(spec.get("parameters", [])):
+            param_name = param_spec["name"]
+            param_pointer = self._pointer + json_pointer(
+                "parameters",
+                str(param_index),
+                "schema",
+            )
+            self._parameters[param_name] = (param_spec["in"], param_pointer)
+
+            if param_spec.get("required", False):
+                required_params.append(param_name)
+
+        self._required_params = tuple(required_params)
+        self._path_template = [
+            (literal, field_name)
+            for literal, field_name, _, _ in Formatter().parse(path)
+        ]
+
+    def compile(self) -> None:
+        """
+        Compile the validators of the parameters and responses of the operation
+        ahead of their first use.
+        """
+
+        for _, param_pointer in self._parameters.values():
+            self._validators.get(param_pointer)
+
+        for status_code in self._spec["responses"]:
+            if self._response_schema(status_code):
+                self._validators.get(self._response_pointer(status_code))
+
+    def _response_schema(self, status_code: str) -> dict[str, Any]:
+        response_spec = self._spec["responses"].get(status_code, {})
+        return (
+            response_spec.get("content", {})
+            .get("application/json", {})
+            .get("schema", {})
+        )
+
+    def _response_pointer(self, status_code: str) -> str:
+        return self._pointer + json_pointer(
+            "responses",
+            status_code,
+            "content",
+            "application/json",
+            "schema",
+        )
+
+    def _prepare(
+        self,
+        params: dict[str, Any],
+    ) -> tuple[str, dict[str, list[Any]]]:
+        for param_name in self._required_params:
+            if param_name not in params:
+                raise ValueError(
+                    f"Operation({self.name}): Missing parameter: {param_name}"
+                )
+
+        path_params: dict[str, Any] = {}
+        query_params: dict[str, list[Any]] = {}
+
+        for param_name, param_value in params.items():
+            param = self._parameters.get(param_name)
+            if param is None:
+                # Otherwise silently dropped, and the response would not be
+                # validated as a projection.
+                if param_name in PROJECTION_PARAMS:
+                    raise ValueError(
+                        f"Operation({self.name}): Undeclared parameter: "
+                        f"{param_name} (use the projection argument)"
+                    )
+
+                continue
+
+            param_in, param_pointer = param
+
+            try:
+                validator = self._validators.get(param_pointer)
+                validator.validate(param_value)
+
+            except ValidationError as err:
+                raise ValueError(
+                    f"Operation({self.name}): Invalid parameter: {param_name}"
+                ) from err
+
+            match param_in:
+                case "path":
+                    path_params[param_name] = param_value
+
+                case "query":
+                    if not isinstance(param_value, list):
+                        param_value = [param_value]
+
+                    query_params[param_name] = param_value
+
+        path = "".join(
+            literal if field_name is None else f"{literal}{path_params[field_name]}"
+            for literal, field_name in self._path_template
+        )
+
+        return path, query_params
 
     async def __call__(
         self,
         *,
         params: dict[str, Any] | None = None,
         body: Any | None = None,
-    ) -> Response:
-        if params is None:
-            params = {}
+        validation: ValidationPolicy | ValidationMode | None = None,
+        priority: Priority | None = None,
+        projection: Projection | None = None,
+    ) -> Result:
+        if priority is not None:
+            with request_priority(priority):
+                return await self(
+                    params=params,
+                    body=body,
+                    validation=validation,
+                    projection=projection,
+                )
 
-        path_params: dict[str, str] = {}
-        query_params: dict[str, list[str]] = {}
+        params = params or {}
+        path, query_params = self._prepare(params)
+        policy = self._policy(validation)
 
-        for param_spec in self._spec.get("parameters", []):
-            param_name = param_spec["name"]
-            required = param_spec.get("required", False)
+        projection_params = self._project(query_params, projection)
+        key_params = {**params, **projection_params}
 
-            if required and param_name not in params:
-                raise ValueError(
-                    f"Operation({self.name}): Missing parameter: {param_name}"
+        cache = self._cache if body is None else None
+        collection = self._collection
+        cache_key = None
+
+        if cache is not None and collection is not None:
+            cache_key = request_key(self.name, key_params)
+            cached_result = cache.get(cache_key)
+
+            if cached_result is not None:
+                return cached_result
+
+        batch = self._batch if body is None and params.keys() == {"id"} else None
+
+        async def send() -> Result:
+            # Results read before an invalidation are not stored after it.
+            generation = None
+
+            if cache is not None and collection is not None:
+                generation = cache.generation(collection)
+
+            if batch is not None:
+                batcher, list_operation = batch
+                result = await self._load(
+                    batcher,
+                    list_operation(),
+                    path,
+                    params["id"],
+                    policy,
+                    projection or self.projection,
                 )
 
-            if param_name in params:
-                expected_param_schema = deepcopy(param_spec["schema"])
-                expected_param_schema["components"] = self._root_schema["components"]
-                param_value = params[param_name]
+            else:
+                result = await self._send(path, query_params, body, policy)
 
-                try:
-                    validator = FixedOAS30Validator(expected_param_schema)
-                    validator.validate(param_value)
+            if (
+                cache is not None
+                and collection is not None
+                and cache_key is not None
+                and result.is_success
+            ):
+                object_id = params.get("id") if self._path.endswith("{id}/") else None
+                cache.put(cache_key, collection, object_id, result, generation)
 
-                except ValidationError as err:
-                    raise ValueError(
-                        f"Operation({self.name}): Invalid parameter: {param_name}"
-                    ) from err
-
-                match param_spec["in"]:
-                    case "path":
-                        path_params[param_name] = param_value
-
-                    case "query":
-                        if not isinstance(param_value, list):
-                            param_value = [param_value]
-
-                        for value in param_value:
-                            query_params.setdefault(param_name, []).append(value)
-
-        path = self._path.format(**path_params)
-        response = await self._client.request(
-            self._method,
-            path,
-            params=query_params,
-            json=body,
+            if result.is_success:
+                self._invalidate_written(params)
+
+            return result
+
+        if self._coalescer is not None and self._method == "get" and body is None:
+            # Requests only share a response validated the same way, and sent
+            # with the same priority: a follower must not wait for a leader
+            # scheduled after it.
+            coalescing_key = (
+                request_key(self.name, key_params),
+                tuple(policy.model_dump().values()),
+                current_priority() if self._scheduler is not None else None,
+            )
+            return await self._coalescer.run(coalescing_key, send)
+
+        return await send()
+
+    def _invalidate_written(self, params: dict[str, Any]) -> None:
+        # Later reads of the client must see its own writes.
+        if self._written_collection is None:
+            return
+
+        if self._graphql_cache is not None:
+            # A query can read objects from any collection.
+            self._graphql_cache.clear()
+
+        if self._cache is None:
+            return
+
+        if self._path.endswith("{id}/"):
+            self._cache.invalidate(self._written_collection, params.get("id"))
+
+        else:
+            # Creates, and bulk updates or deletes.
+            self._cache.invalidate_collection(self._written_collection)
+
+    async def _load(
+        self,
+        batcher: RetrieveBatcher,
+        list_operation: "Operation",
+        path: str,
+        object_id: Any,
+        policy: ValidationPolicy,
+        projection: Projection,
+    ) -> Result:
+        # The list call is sent with the validation policy and projection of
+        # the retrieve call, so that batched calls return the same results.
+        list_result, item = await batcher.load(
+            list_operation,
+            object_id,
+            policy,
+            projection,
         )
-        await response.aread()
 
-        status_code = f"{response.status_code}"
+        if not list_result.is_success:
+            return list_result
+
+        request = Request(self._method, self._client.base_url.join(path))
+
+        if item is None:
+            return Result.from_data(404, {"detail": "Not found."}, request)
+
+        return Result.from_data(200, item, request)
+
+    async def _send(
+        self,
+        path: str,
+        query_params: dict[str, list[Any]],
+        body: Any | None,
+        policy: ValidationPolicy,
+    ) -> Result:
+        hedging = self._hedging if body is None else None
 
-        if status_code in self._spec["responses"]:
-            response_spec = self._spec["responses"][status_code]
-            response_schema = deepcopy(
-                response_spec.get("content", {})
-                .get("application/json", {})
-                .get("schema", {})
+        if hedging is None:
+            result = await self._request(path, query_params, body)
+
+        else:
+            # Only the response used is validated.
+            hedger, latencies = hedging
+            result = await hedger.run(
+                latencies,
+                lambda: self._request(path, query_params, body),
             )
 
-            if response_schema:
-                response_schema["components"] = self._root_schema["components"]
-                response_data = response.json()
+        self._validate_response(result, policy, self._is_projected(query_params))
+        return result
 
-                try:
-                    validator = FixedOAS30Validator(response_schema)
-                    validator.validate(response_data)
+    async def _request(
+        self,
+        path: str,
+        query_params: dict[str, list[Any]],
+        body: Any | None,
+    ) -> Result:
+        async with (
+            self._acquire() as permit,
+            self._route() as route,
+            self._client.stream(
+                self._method,
+                path if route is None else route.url(path),
+                params=query_params,
+                json=body,
+                timeout=self._timeout,
+            ) as response,
+        ):
+            # The latency is measured up to the headers, so that it does not
+            # grow with the size of the body.
+            if permit is not None:
+                permit.record(response)
 
-                except ValidationError as err:
-                    raise ValueError(
-                        f"Operation({self.name}): Invalid response"
-                    ) from err
+            if route is not None:
+                route.record(response)
+
+            await response.aread()
+
+        return Result(response)
+
+    def _acquire(self) -> AbstractAsyncContextManager[Permit | None]:
+        return acquire_slot(self._scheduler, self._limiter)
+
+    def _route(self) -> AbstractAsyncContextManager[Route | None]:
+        if self._balancer is None:
+            return nullcontext()
+
+        return self._balancer.route(read=self._method == "get")
+
+    async def iterate(
+        self,
+        *,
+        params: dict[str, Any] | None = None,
+        page_size: int = 100,
+        concurrency: int = 4,
+        validation: ValidationPolicy | ValidationMode | None = None,
+        projection: Projection | None = None,
+    ) -> AsyncIterator[Any]:
+        """
+        Iterate over the ``results`` of a paginated list operation.
+
+        The first page gives the total ``count``, the remaining pages are then
+        fetched by offset, ``concurrency`` pages at a time. Results are yielded
+        in order.
+
+        No task is left running while the results are consumed, so the loop
+        can be left at any time. To fetch the next pages while the results of
+        the previous ones are consumed, use ``paginate``.
+
+        :param params: The path and query parameters (``limit`` is overridden by ``page_size``, ``offset`` is the starting offset).
+        :param page_size: Number of objects per page.
+        :param concurrency: Maximum number of pages fetched concurrently.
+        :param validation: Response validation policy, see ``__call__``.
+        :param projection: Fields of the objects, see ``__call__``.
+        :return: Async iterator over the objects.
+        """
+
+        fetch_page, first_page, offsets = await self._first_page(
+            params,
+            page_size,
+            validation,
+            projection,
+        )
+        concurrency = max(concurrency, 1)
+
+        for item in first_page["results"]:
+            yield item
+
+        for index in range(0, len(offsets), concurrency):
+            batch = offsets[index : index + concurrency]
+            pages = [_PendingPage() for _ in batch]
+
+            # The task group is closed before the results are yielded.
+            async with create_task_group() as tg:
+                for page, offset in zip(pages, batch, strict=True):
+                    tg.start_soon(page.fetch, fetch_page, offset)
+
+            for page in pages:
+                for item in await page.results():
+                    yield item
+
+    @asynccontextmanager
+    async def paginate(
+        self,
+        *,
+        params: dict[str, Any] | None = None,
+        page_size: int = 100,
+        concurrency: int = 4,
+        validation: ValidationPolicy | ValidationMode | None = None,
+        projection: Projection | None = None,
+    ) -> AsyncIterator[AsyncIterator[Any]]:
+        """
+        Iterate over the ``results`` of a paginated list operation, fetching
+        the next pages in the background.
+
+        The first page gives the total ``count``, the remaining pages are then
+        fetched by offset while the results of the previous ones are consumed:
+        at most ``concurrency`` pages are fetched concurrently, and at most
+        ``concurrency`` pages are buffered ahead of the consumer. Results are
+        yielded in order.
+
+        The pending fetches are cancelled when the context manager exits.
+
+        :param params: The path and query parameters (``limit`` is overridden by ``page_size``, ``offset`` is the starting offset).
+        :param page_size: Number of objects per page.
+        :param concurrency: Maximum number of pages fetched concurrently.
+        :param validation: Response validation policy, see ``__call__``.
+        :param projection: Fields of the objects, see ``__call__``.
+        :return: Async context manager of an async iterator over the objects.
+        """
+
+        fetch_page, first_page, offsets = await self._first_page(
+            params,
+            page_size,
+            validation,
+            projection,
+        )
+        concurrency = max(concurrency, 1)
+
+        fetching = Semaphore(concurrency)
+        pages_tx, pages_rx = create_memory_object_stream[_PendingPage](concurrency)
+
+        async def fetch_into(page: _PendingPage, offset: int) -> None:
+            try:
+                await page.fetch(fetch_page, offset)
+
+            finally:
+                fetching.release()
+
+        async def produce() -> None:
+            async with pages_tx:
+                for offset in offsets:
+                    await fetching.acquire()
+                    page = _PendingPage()
+                    tg.start_soon(fetch_into, page, offset)
+                    await pages_tx.send(page)
+
+        async def results() -> AsyncIterator[Any]:
+            for item in first_page["results"]:
+                yield item
+
+            async for page in pages_rx:
+                for item in await page.results():
+                    yield item
+
+        stop: BaseException | None = None
+
+        async with create_task_group() as tg, pages_rx:
+            tg.start_soon(produce)
+
+            try:
+                yield results()
+
+            except Exception as err:
+                # Raised once the task group is closed, so that it is not
+                # wrapped in an exception group.
+                stop = err
+
+            finally:
+                tg.cancel_scope.cancel()
+
+        if stop is not None:
+            raise stop
+
+    async def _first_page(
+        self,
+        params: dict[str, Any] | None,
+        page_size: int,
+        validation: ValidationPolicy | ValidationMode | None,
+        projection: Projection | None,
+    ) -> tuple[Callable[[int], Awaitable[dict[str, Any]]], dict[str, Any], range]:
+        if "limit" not in self._parameters or "offset" not in self._parameters:
+            raise ValueError(f"Operation({self.name}): Not a paginated operation")
+
+        params = params or {}
+        page_size = max(page_size, 1)
+        start = params.get("offset", 0)
+
+        async def fetch_page(offset: int) -> dict[str, Any]:
+            response = await self(
+                params={**params, "limit": page_size, "offset": offset},
+                validation=validation,
+                projection=projection,
+            )
+            response.raise_for_status()
+            return response.data
+
+        first_page = await fetch_page(start)
+        offsets = range(start + page_size, first_page["count"], page_size)
+        return fetch_page, first_page, offsets
+
+    async def stream(
+        self,
+        *,
+        params: dict[str, Any] | None = None,
+        validation: ValidationPolicy | ValidationMode | None = None,
+        projection: Projection | None = None,
+    ) -> AsyncIterator[Any]:
+        """
+        Stream the ``results`` of a list operation: they are decoded (and
+        validated) one by one as the response body is received, instead of
+        reading the whole body first.
+
+        The concurrency limit and endpoint slots are released once the
+        response headers are received, so that client calls can be made while
+        iterating. The connection is still used until the iterator is
+        exhausted or closed.
+
+        :param params: The path and query parameters.
+        :param validation: Response validation policy, see ``__call__``.
+        :param projection: Fields of the objects, see ``__call__``.
+        :return: Async iterator over the objects.
+        """
+
+        path, query_params = self._prepare(params or {})
+        self._project(query_params, projection)
+        policy = self._policy(validation)
+
+        async with AsyncExitStack() as stack:
+            async with self._acquire() as permit, self._route() as route:
+                response = await stack.enter_async_context(
+                    self._client.stream(
+                        self._method,
+                        path if route is None else route.url(path),
+                        params=query_params,
+                        timeout=self._timeout,
+                    ),
+                )
+
+                if permit is not None:
+                    permit.record(response)
+
+                if route is not None:
+                    route.record(response)
+
+            response.raise_for_status()
+
+            status_code = f"{response.status_code}"
+            validator = None
+
+            if self._response_schema(status_code):
+                if self._is_sampled(policy):
+                    validator = self._validators.get(
+                        self._results_pointer(status_code),
+                        projected=self._is_projected(query_params),
+                    )
+                    self.validation_stats.validated += 1
+
+                else:
+                    self.validation_stats.skipped += 1
+
+            decoder = ResultsDecoder(response.aiter_bytes())
+
+            async for item in decoder.items():
+                if validator is not None and (
+                    policy.mode != "sampled"
+                    or random.random() * 100 < policy.sample_items
+                ):
+                    self._validate_item(validator, item)
+
+                yield item
+
+    def _validate_item(self, validator: Validator, item: Any) -> None:
+        started_at = time.perf_counter()
+
+        try:
+            validator.validate(item)
+
+        except ValidationError as err:
+            raise ValueError(f"Operation({self.name}): Invalid response") from err
+
+        finally:
+            self.validation_stats.duration += time.perf_counter() - started_at
+
+    def _results_pointer(self, status_code: str) -> str:
+        pointer, _ = self._dereference(self._response_pointer(status_code))
+        return pointer + json_pointer("properties", "results", "items")
+
+    def _is_array(self, pointer: str) -> bool:
+        _, schema = self._dereference(pointer)
+        return schema.get("type") == "array"
+
+    def _dereference(self, pointer: str) -> tuple[str, dict[str, Any]]:
+        schema = self._validators.resolve(pointer)
+
+        while "$ref" in schema:
+            pointer = schema["$ref"].removeprefix("#")
+            schema = self._validators.resolve(pointer)
+
+        return pointer, schema
+
+    def _project(
+        self,
+        query_params: dict[str, list[Any]],
+        projection: Projection | None,
+    ) -> dict[str, list[Any]]:
+        # Only the reads of model objects are projected (i.e. not
+        # `status_retrieve`, whose response is not a model object).
+        if self._collection is None:
+            if projection is not None and projection.query_params():
+                raise ValueError(
+                    f"Operation({self.name}): Projection of a non-model operation"
+                )
+
+            return {}
+
+        # Parameters given explicitly are merged with the projection, instead
+        # of being overridden by it.
+        for name, values in (projection or self.projection).query_params().items():
+            if name not in query_params:
+                query_params[name] = values
+
+            elif name != "brief":
+                fields = [
+                    field
+                    for value in [*query_params[name], *values]
+                    for field in str(value).split(",")
+                ]
+                query_params[name] = [",".join(dict.fromkeys(fields))]
+
+        return {
+            name: query_params[name]
+            for name in PROJECTION_PARAMS
+            if name in query_params
+        }
+
+    def _is_projected(self, query_params: dict[str, list[Any]]) -> bool:
+        return self._collection is not None and any(
+            name in query_params for name in PROJECTION_PARAMS
+        )
+
+    def _policy(
+        self,
+        validation: ValidationPolicy | ValidationMode | None,
+    ) -> ValidationPolicy:
+        match validation:
+            case None:
+                return self.validation
+
+            case str():
+                return self.validation.model_copy(update={"mode": validation})
+
+            case _:
+                return validation
+
+    def _is_sampled(self, policy: ValidationPolicy) -> bool:
+        self._responses_seen += 1
+
+        match policy.mode:
+            case "off":
+                return False
+
+            case "sampled":
+                sample_interval = max(policy.sample_interval, 1)
+                return (self._responses_seen - 1) % sample_interval == 0
+
+            case _:
+                return True
+
+    def _validate_response(
+        self,
+        result: Result,
+        policy: ValidationPolicy,
+        projected: bool = False,
+    ) -> None:
+        status_code = f"{result.status_code}"
+
+        if not self._response_schema(status_code):
+            return
+
+        if not self._is_sampled(policy):
+            self.validation_stats.skipped += 1
+            return
+
+        response_data = result.data
+
+        if policy.mode == "sampled" and isinstance(response_data, dict):
+            results = response_data.get("results")
+
+            if isinstance(results, list):
+                sample_size = ceil(len(results) * policy.sample_items / 100)
+                response_data = {
+                    **response_data,
+                    "results": random.sample(results, min(sample_size, len(results))),
+                }
+
+        pointer = self._response_pointer(status_code)
+        validator = self._validators.get(pointer, projected=projected)
+        started_at = time.perf_counter()
+
+        # Netbox accepts a list of objects on create endpoints (bulk create),
+        # and then returns a list, which the schema does not describe.
+        items = [response_data]
+
+        if isinstance(response_data, list) and not self._is_array(pointer):
+            items = response_data
+
+        try:
+            for item in items:
+                validator.validate(item)
+
+        except ValidationError as err:
+            raise ValueError(f"Operation({self.name}): Invalid response") from err
 
-        return response
+        finally:
+            self.validation_stats.validated += 1
+            self.validation_stats.duration += time.perf_counter() - started_at
@@ -0,0 +1,162 @@
+"""
+Priorities of the requests sent to Netbox.
+
+Requests made by webhook handlers are sent with the ``high`` priority, and
+requests made by background tasks with the ``low`` priority, so that handlers
+are not delayed by bulk task traffic when the connection pool is saturated.
+"""
+
+from typing import Literal
+
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+
+from anyio import Event
+
+from pydantic import BaseModel
+
+
+type Priority = Literal["high", "normal", "low"]
+
+PRIORITIES: tuple[Priority, ...] = ("high", "normal", "low")
+
+
+_priority: ContextVar[Priority] = ContextVar(
+    "nopf_request_priority",
+    default="normal",
+)
+
+
+def current_priority() -> Priority:
+    """
+    Priority of the requests sent from the current context.
+
+    :return: The priority (``normal`` if it was not set).
+    """
+
+    return _priority.get()
+
+
+@contextmanager
+def request_priority(priority: Priority) -> Iterator[None]:
+    """
+    Set the priority of the requests sent within this context (including by
+    the tasks started within it).
+
+    .. code-block:: python
+
+       with request_priority("low"):
+           await client.operations.dcim_devices_list()
+
+    :param priority: The priority.
+    """
+
+    token = _priority.set(priority)
+
+    try:
+        yield
+
+    finally:
+        _priority.reset(token)
+
+
+class SchedulingStats(BaseModel):
+    """
+    Request scheduling counters.
+    """
+
+    in_flight: int = 0
+    """
+    Number of requests currently sent to Netbox.
+    """
+
+    queued: dict[Priority, int] = {priority: 0 for priority in PRIORITIES}
+    """
+    Number of requests waiting for a slot, by priority.
+    """
+
+    delayed: dict[Priority, int] = {priority: 0 for priority in PRIORITIES}
+    """
+    Number of requests that had to wait for a slot, by priority.
+    """
+
+
+class PriorityScheduler:
+    """
+    Limit the number of concurrent requests, and when it is reached, hand the
+    slots over to the waiting requests of the highest priority first (in FIFO
+    order within a priority).
+    """
+
+    def __init__(self, limit: Callable[[], int]) -> None:
+        """
+        :param limit: Callable returning the current maximum number of concurrent requests.
+        """
+
+        self._limit = limit
+        self._in_flight = 0
+        self._queues: dict[Priority, list[Event]] = {
+            priority: [] for priority in PRIORITIES
+        }
+        self._delayed: dict[Priority, int] = {priority: 0 for priority in PRIORITIES}
+
+    @property
+    def stats(self) -> SchedulingStats:
+        """
+        Current state of the scheduler.
+        """
+
+        return SchedulingStats(
+            in_flight=self._in_flight,
+            queued={priority: len(queue) for priority, queue in self._queues.items()},
+            delayed=dict(self._delayed),
+        )
+
+    @asynccontextmanager
+    async def acquire(self, priority: Priority) -> AsyncIterator[None]:
+        """
+        Wait for a slot, and hold it while sending a request.
+
+        :param priority: Priority of the request.
+        """
+
+        if self._in_flight < self._limit() and not any(self._queues.values()):
+            self._in_flight += 1
+
+        else:
+            # Slots are handed over to waiters by `_wake`.
+            event = Event()
+            queue = self._queues[priority]
+            queue.append(event)
+            self._delayed[priority] += 1
+
+            try:
+                await event.wait()
+
+            except BaseException:
+                if event in queue:
+                    queue.remove(event)
+
+                else:
+                    self._release()
+
+                raise
+
+        try:
+            yield
+
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        self._in_flight -= 1
+
+        while self._in_flight < self._limit():
+            queue = next((queue for queue in self._queues.values() if queue), None)
+
+            if queue is None:
+                break
+
+            self._in_flight += 1
+            queue.pop(0).set()
@@ -0,0 +1,283 @@
+"""
+Write-behind batching of ``*_create`` and ``*_partial_update`` calls into
+Netbox bulk requests.
+"""
+
+from typing import TYPE_CHECKING, Any, Literal
+
+from collections.abc import Awaitable, Callable
+from functools import partial
+
+from anyio import Event, Lock, move_on_after
+
+from httpx import Request
+from pydantic import BaseModel
+
+from .operation import Result
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .operation import Operation
+
+
+type WriteKind = Literal["create", "partial_update"]
+
+
+class WriteCancelledError(RuntimeError):
+    """
+    Raised to the callers of a batch of writes, when the call flushing it was
+    cancelled.
+    """
+
+    def __init__(self, sent: bool) -> None:
+        """
+        :param sent: Whether the bulk request was already sent (the writes may then have been applied).
+        """
+
+        if sent:
+            message = (
+                "Write batch cancelled while it was sent, it may have been applied"
+            )
+
+        else:
+            message = "Write batch cancelled before it was sent"
+
+        super().__init__(message)
+        self.sent = sent
+
+
+class WriterStats(BaseModel):
+    """
+    Write-behind batching counters.
+    """
+
+    writes: int = 0
+    """
+    Number of buffered ``*_create`` and ``*_partial_update`` calls.
+    """
+
+    flushes: int = 0
+    """
+    Number of bulk requests they were flushed into.
+    """
+
+
+class _Batch:
+    def __init__(self) -> None:
+        self.bodies: list[Any] = []
+        self.updates: dict[str, dict[str, Any]] = {}
+        self.full = Event()
+        self.done = Event()
+        self.result: Result | None = None
+        self.items: dict[str, Any] = {}
+        self.error: Exception | None = None
+
+    def __len__(self) -> int:
+        return len(self.bodies) + len(self.updates)
+
+
+class BulkWriter:
+    """
+    Buffer ``*_create`` and ``*_partial_update`` calls per model, and flush
+    them as a single bulk request (``*_create`` with a list of objects, and
+    ``*_bulk_partial_update``) once ``max_size`` calls are buffered, or after
+    ``window`` seconds.
+
+    Flushes of a model are sent one at a time, in order, so that writes to the
+    same object are applied in the order they were issued. Partial updates of
+    the same object buffered together are merged.
+
+    A batch is flushed by the first call buffered in it. If that call is
+    cancelled, the other calls of the batch raise ``WriteCancelledError``.
+
+    The buffered operations are accessed like regular operations, and each
+    caller receives its own ``Result``:
+
+    .. code-block:: python
+
+       result = await client.writer.dcim_interfaces_partial_update(
+           params={"id": 1},
+           body={"description": "uplink"},
+       )
+    """
+
+    def __init__(
+        self,
+        lookup: Callable[[str], "Operation"],
+        max_size: int,
+        window: float,
+    ) -> None:
+        """
+        :param lookup: Callable returning an operation by its ID.
+        :param max_size: Maximum number of writes per bulk request.
+        :param window: Maximum time a write is buffered, in seconds.
+        """
+
+        self.max_size = max_size
+        self.window = window
+        self.stats = WriterStats()
+
+        self._lookup = lookup
+        self._batches: dict[tuple[str, WriteKind], _Batch] = {}
+        self._locks: dict[str, Lock] = {}
+
+    def __getattr__(self, operation_id: str) -> Callable[..., Awaitable[Result]]:
+        """
+        Lookup a buffered operation by its ID.
+
+        :param operation_id: ID of a ``*_create`` or ``*_partial_update`` operation.
+        :return: The buffered operation callable.
+        """
+
+        if operation_id.endswith("_bulk_partial_update"):
+            raise KeyError(operation_id)
+
+        if operation_id.endswith("_partial_update"):
+            model = operation_id.removesuffix("_partial_update")
+            self._lookup(f"{model}_bulk_partial_update")
+            return partial(self._partial_update, model)
+
+        if operation_id.endswith("_create"):
+            model = operation_id.removesuffix("_create")
+            self._lookup(operation_id)
+            return partial(self._create, model)
+
+        raise KeyError(operation_id)
+
+    async def _create(self, model: str, *, body: dict[str, Any]) -> Result:
+        batch, index, leader = self._enqueue(model, "create", body)
+        await self._wait(model, "create", batch, leader)
+
+        assert batch.result is not None
+        if not batch.result.is_success:
+            return batch.result
+
+        return Result.from_data(
+            batch.result.status_code,
+            batch.items[str(index)],
+            batch.result.request,
+        )
+
+    async def _partial_update(
+        self,
+        model: str,
+        *,
+        params: dict[str, Any],
+        body: dict[str, Any],
+    ) -> Result:
+        object_id = params["id"]
+        batch, _, leader = self._enqueue(
+            model,
+            "partial_update",
+            {"id": object_id, **body},
+        )
+        await self._wait(model, "partial_update", batch, leader)
+
+        assert batch.result is not None
+        if not batch.result.is_success:
+            return batch.result
+
+        request = batch.result.request
+        return Result.from_data(
+            batch.result.status_code,
+            batch.items[str(object_id)],
+            Request("PATCH", request.url.join(f"{object_id}/")),
+        )
+
+    def _enqueue(
+        self,
+        model: str,
+        kind: WriteKind,
+        body: dict[str, Any],
+    ) -> tuple[_Batch, int, bool]:
+        self.stats.writes += 1
+        batch = self._batches.get((model, kind))
+        leader = batch is None
+
+        if batch is None:
+            batch = _Batch()
+            self._batches[(model, kind)] = batch
+
+        match kind:
+            case "create":
+                index = len(batch.bodies)
+                batch.bodies.append(body)
+
+            case "partial_update":
+                index = 0
+                object_id = str(body["id"])
+                batch.updates[object_id] = {**batch.updates.get(object_id, {}), **body}
+
+        if len(batch) >= self.max_size:
+            self._close(model, kind, batch)
+            batch.full.set()
+
+        return batch, index, leader
+
+    async def _wait(
+        self,
+        model: str,
+        kind: WriteKind,
+        batch: _Batch,
+        leader: bool,
+    ) -> None:
+        if leader:
+            # The first write of a batch flushes it.
+            await self._flush(model, kind, batch)
+
+        else:
+            await batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+
+    async def _flush(self, model: str, kind: WriteKind, batch: _Batch) -> None:
+        sent = False
+
+        try:
+            with move_on_after(self.window):
+                await batch.full.wait()
+
+            self._close(model, kind, batch)
+
+            async with self._locks.setdefault(model, Lock()):
+                self.stats.flushes += 1
+                sent = True
+
+                match kind:
+                    case "create":
+                        operation = self._lookup(f"{model}_create")
+                        result = await operation(body=batch.bodies)
+
+                        if result.is_success:
+                            batch.items = {
+                                str(index): item
+                                for index, item in enumerate(result.data)
+                            }
+
+                    case "partial_update":
+                        operation = self._lookup(f"{model}_bulk_partial_update")
+                        result = await operation(body=list(batch.updates.values()))
+
+                        if result.is_success:
+                            batch.items = {
+                                str(item["id"]): item for item in result.data
+                            }
+
+                batch.result = result
+
+        except Exception as err:
+            batch.error = err
+
+        except BaseException:
+            # Cancelled: the other calls of the batch must not wait for a
+            # result that will never come.
+            self._close(model, kind, batch)
+            batch.error = WriteCancelledError(sent)
+            raise
+
+        finally:
+            batch.done.set()
+
+    def _close(self, model: str, kind: WriteKind, batch: _Batch) -> None:
+        if self._batches.get((model, kind)) is batch:
+            del self._batches[(model, kind)]
@@ -1,4 +1,6 @@
-from typing import Any
+from typing import TYPE_CHECKING, Any
+
+from math import inf
 
 from anyio.abc import ObjectSendStream, ObjectReceiveStream
 from anyio import create_memory_object_stream
@@ -7,6 +9,9 @@ from pydantic import BaseModel
 
 from nopf.schema import WebhookPayload
 
+if TYPE_CHECKING:  # pragma: no cover
+    from nopf.core.queue import DurableQueue
+
 
 class EventCreate(BaseModel):
     payload: WebhookPayload
@@ -27,23 +32,88 @@ class EventCustom(BaseModel):
 type Event = EventCreate | EventUpdate | EventDelete | EventCustom
 
 type ChannelResponse = Exception | None
-type ChannelMessage = tuple[ObjectSendStream[ChannelResponse], Event]
+type ChannelMessage = tuple[ObjectSendStream[ChannelResponse] | None, Event]
+
+
+class ChannelFullError(Exception):
+    pass
+
+
+class ChannelStats(BaseModel):
+    depth: int = 0
+    bytes: int = 0
+    shed: int = 0
+
+
+class ChannelLimits:
+    def __init__(self, max_events: int = 0, max_bytes: int = 0) -> None:
+        self.max_events = max_events
+        self.max_bytes = max_bytes
+        self.stats = ChannelStats()
+
+        # Size of the admitted events, by identity of the event object, until
+        # they are processed.
+        self._sizes: dict[int, int] = {}
+
+    def admit(self, event: Event, size: int) -> None:
+        stats = self.stats
+
+        # An event larger than the byte limit is still admitted when the
+        # channel is empty, otherwise it would never be.
+        if (self.max_events > 0 and stats.depth >= self.max_events) or (
+            self.max_bytes > 0
+            and stats.depth > 0
+            and stats.bytes + size > self.max_bytes
+        ):
+            stats.shed += 1
+            raise ChannelFullError("Too many events waiting to be processed")
+
+        self.reserve(event, size)
+
+    def reserve(self, event: Event, size: int) -> None:
+        # Count the event without checking the limits, for events which must
+        # not be shed (i.e. recovered from the durable queue).
+        self._sizes[id(event)] = size
+        self.stats.depth += 1
+        self.stats.bytes += size
+
+    def release(self, event: Event) -> None:
+        size = self._sizes.pop(id(event), None)
+
+        if size is not None:
+            self.stats.depth -= 1
+            self.stats.bytes -= size
 
 
 class ChannelSender:
-    def __init__(self, stream: ObjectSendStream[ChannelMessage]):
+    def __init__(
+        self,
+        stream: ObjectSendStream[ChannelMessage],
+        queue: "DurableQueue | None" = None,
+        limits: ChannelLimits | None = None,
+    ):
         self.stream = stream
+        self.queue = queue
+        self.limits = limits or ChannelLimits()
 
     def clone(self):
-        return ChannelSender(self.stream.clone())
+        return ChannelSender(self.stream.clone(), self.queue, self.limits)
 
     async def aclose(self):
         await self.stream.aclose()
 
+    def admit(self, event: Event, size: int) -> None:
+        # Reserve room for the event, until it is processed, or raise
+        # `ChannelFullError` if there is none.
+        self.limits.admit(event, size)
+
+    def release(self, event: Event) -> None:
+        self.limits.release(event)
+
     async def send(self, event: Event) -> None:
         resp_tx, resp_rx = create_memory_object_stream[ChannelResponse]()
 
-        await self.stream.send((resp_tx, event))
+        await self._enqueue(resp_tx, event)
 
         response = await resp_rx.receive()
         if isinstance(response, Exception):
@@ -51,19 +121,83 @@ class ChannelSender:
 
         await resp_rx.aclose()
 
+    async def post(self, event: Event) -> None:
+        # Only wait for the event to be enqueued, errors raised by its handlers
+        # are logged by the controller.
+        await self._enqueue(None, event)
+
+    async def replay(self) -> None:
+        # Events persisted, but not acknowledged before the operator stopped,
+        # are processed again. They must be enqueued before any new event, so
+        # that the events of an object are still processed in order.
+        if self.queue is None:
+            return
+
+        for event in self.queue.pending():
+            self.limits.reserve(event, len(event.payload.model_dump_json()))
+            await self.stream.send((None, event))
+
+    async def _enqueue(
+        self,
+        resp_tx: ObjectSendStream[ChannelResponse] | None,
+        event: Event,
+    ) -> None:
+        enqueued = False
+
+        try:
+            await self._persist(event)
+            await self.stream.send((resp_tx, event))
+            enqueued = True
+
+        finally:
+            # Once enqueued, the room of the event is released when it is
+            # processed, even if the sender stops waiting for it.
+            if not enqueued:
+                self.limits.release(event)
+
+    async def _persist(self, event: Event) -> None:
+        # Only webhook events are persisted, custom events are produced again
+        # by the tasks after a restart.
+        if self.queue is not None and not isinstance(event, EventCustom):
+            await self.queue.put(event)
+
 
 class ChannelReceiver:
-    def __init__(self, stream: ObjectReceiveStream[ChannelMessage]):
+    def __init__(
+        self,
+        stream: ObjectReceiveStream[ChannelMessage],
+        queue: "DurableQueue | None" = None,
+        limits: ChannelLimits | None = None,
+    ):
         self.stream = stream
+        self.queue = queue
+        self.limits = limits or ChannelLimits()
 
     def clone(self):
-        return ChannelReceiver(self.stream.clone())
+        return ChannelReceiver(self.stream.clone(), self.queue, self.limits)
 
     async def aclose(self):
         await self.stream.aclose()
 
+    def ack(self, event: Event) -> None:
+        # The event was processed, it is removed from the durable queue, and
+        # its room in the channel is released.
+        self.limits.release(event)
+
+        if self.queue is not None:
+            self.queue.ack(event)
+
+
+def create_channel(
+    queue: "DurableQueue | None" = None,
+    limits: ChannelLimits | None = None,
+) -> tuple[ChannelSender, ChannelReceiver]:
+    limits = limits or ChannelLimits()
 
-def create_channel() -> tuple[ChannelSender, ChannelReceiver]:
-    tx, rx = create_memory_object_stream[ChannelMessage]()
+    # Events are buffered, so that senders which do not wait for the response
+    # (see `ChannelSender.post`) return as soon as the event is enqueued, even
+    # while the controller processes an event. The webhook events are bounded
+    # by the limits (if any), the other senders wait for their response.
+    tx, rx = create_memory_object_stream[ChannelMessage](inf)
 
-    return ChannelSender(tx), ChannelReceiver(rx)
+    return ChannelSender(tx, queue, limits), ChannelReceiver(rx, queue, limits)
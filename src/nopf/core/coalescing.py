@@ -0,0 +1,119 @@
+from collections.abc import Awaitable, Callable
+
+from anyio.abc import ObjectSendStream, TaskGroup, TaskStatus
+from anyio import (
+    CancelScope,
+    create_task_group,
+    sleep,
+    sleep_forever,
+    TASK_STATUS_IGNORED,
+)
+
+from nopf.core.channel import (
+    ChannelMessage,
+    ChannelResponse,
+    EventUpdate,
+    EventDelete,
+)
+from nopf.core.workers import EventKey, EventKeyFunction, default_event_key
+from nopf.schema import WebhookPayloadSnapshots
+
+
+type FlushFunction = Callable[[EventUpdate, list[ChannelMessage]], Awaitable[None]]
+
+
+def merge_updates(first: EventUpdate, last: EventUpdate) -> EventUpdate:
+    # The merged event describes the change from the state before the first
+    # update, to the state after the last one.
+    return EventUpdate(
+        payload=last.payload.model_copy(
+            update={
+                "snapshots": WebhookPayloadSnapshots(
+                    prechange=first.payload.snapshots.prechange,
+                    postchange=last.payload.snapshots.postchange,
+                ),
+            },
+        ),
+    )
+
+
+class _PendingUpdate:
+    def __init__(self, event: EventUpdate) -> None:
+        self.event = event
+        self.messages: list[ChannelMessage] = []
+        self.scope = CancelScope()
+
+
+class UpdateCoalescer:
+    def __init__(
+        self,
+        window: float,
+        flush: FlushFunction,
+        event_key: EventKeyFunction = default_event_key,
+    ) -> None:
+        self.window = window
+        self.coalesced = 0
+
+        # The updates are grouped by the same key as the events are ordered
+        # by, otherwise a merged update could overtake another event.
+        self._flush = flush
+        self._event_key = event_key
+        self._pending: dict[EventKey, _PendingUpdate] = {}
+        self._tg: TaskGroup | None = None
+        self._scope = CancelScope()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def run(self, task_status: TaskStatus[None] = TASK_STATUS_IGNORED) -> None:
+        async with create_task_group() as tg:
+            self._tg = tg
+            task_status.started()
+
+            with self._scope:
+                await sleep_forever()
+
+    def close(self) -> None:
+        # The coalescer exits once the pending updates are flushed.
+        self._scope.cancel()
+
+    def hold(
+        self,
+        resp_tx: ObjectSendStream[ChannelResponse] | None,
+        event: EventUpdate,
+    ) -> None:
+        assert self._tg is not None
+
+        key = self._event_key(event)
+        pending = self._pending.get(key)
+
+        if pending is None:
+            # The window starts with the first update, so that an object
+            # updated continuously is still processed regularly.
+            pending = self._pending[key] = _PendingUpdate(event)
+            self._tg.start_soon(self._flush_later, key, pending)
+
+        else:
+            pending.event = merge_updates(pending.event, event)
+            self.coalesced += 1
+
+        pending.messages.append((resp_tx, event))
+
+    def cancel(self, event: EventDelete) -> list[ChannelMessage]:
+        # The object is deleted, its pending updates are not processed.
+        pending = self._pending.pop(self._event_key(event), None)
+
+        if pending is None:
+            return []
+
+        pending.scope.cancel()
+        return pending.messages
+
+    async def _flush_later(self, key: EventKey, pending: _PendingUpdate) -> None:
+        with pending.scope:
+            await sleep(self.window)
+
+            # New updates of the object start a new window.
+            del self._pending[key]
+            await self._flush(pending.event, pending.messages)
@@ -0,0 +1,269 @@
+from typing import Any
+
+from collections.abc import Iterable
+import sqlite3
+import json
+
+from logbook import Logger  # type: ignore
+
+from anyio.abc import TaskStatus
+from anyio import (
+    CancelScope,
+    CapacityLimiter,
+    ClosedResourceError,
+    Event as SyncEvent,
+    move_on_after,
+    to_thread,
+    TASK_STATUS_IGNORED,
+)
+
+from nopf.core.channel import (
+    Event,
+    EventCreate,
+    EventUpdate,
+    EventDelete,
+)
+
+
+logger = Logger("nopf.queue")
+
+
+type PersistentEvent = EventCreate | EventUpdate | EventDelete
+
+EVENT_TYPES: dict[str, type[PersistentEvent]] = {
+    "created": EventCreate,
+    "updated": EventUpdate,
+    "deleted": EventDelete,
+}
+
+
+def encode_event(event: PersistentEvent) -> str:
+    return json.dumps(
+        {
+            "type": event.payload.event,
+            "payload": event.payload.model_dump(mode="json"),
+        }
+    )
+
+
+def decode_event(data: str) -> PersistentEvent:
+    record = json.loads(data)
+    event_type = EVENT_TYPES[record["type"]]
+    return event_type.model_validate({"payload": record["payload"]})
+
+
+class _Batch:
+    def __init__(self) -> None:
+        self.inserts: list[tuple[int, str]] = []
+        self.acks: list[int] = []
+        self.dead: list[tuple[int, str, str]] = []
+        self.ready = SyncEvent()
+        self.full = SyncEvent()
+        self.committed = SyncEvent()
+        self.error: Exception | None = None
+
+
+class DurableQueue:
+    """
+    Write-ahead log of the webhook events, stored in a SQLite database in WAL
+    mode, so that the events received but not processed yet survive a
+    restart (at-least-once delivery).
+
+    Events are written by groups: the events enqueued within
+    ``commit_interval`` seconds (or until ``max_batch`` events are enqueued)
+    are committed in a single transaction, so that a single ``fsync`` is
+    needed for all of them.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        commit_interval: float = 0.005,
+        max_batch: int = 256,
+    ) -> None:
+        self.path = path
+        self.commit_interval = commit_interval
+        self.max_batch = max_batch
+        self.commits = 0
+
+        self._conn: sqlite3.Connection | None = None
+        self._closed = False
+        self._limiter = CapacityLimiter(1)
+        self._batch = _Batch()
+        self._next_id = 1
+        self._recovered: list[tuple[int, str]] = []
+
+        # Row ID of the events being processed, by identity of the event
+        # object, until they are acknowledged.
+        self._tags: dict[int, tuple[Event, int]] = {}
+
+    @property
+    def depth(self) -> int:
+        return len(self._tags)
+
+    async def open(self) -> None:
+        self._conn = await self._run_sync(self._open)
+
+    async def close(self) -> None:
+        # No event is enqueued after the last commit, it would never be
+        # committed.
+        self._closed = True
+
+        # Acknowledgements not committed yet are committed before closing,
+        # otherwise the events would be processed again after a restart.
+        with CancelScope(shield=True):
+            await self.commit()
+
+            if self._conn is not None:
+                await self._run_sync(self._conn.close)
+                self._conn = None
+
+    async def run(self, task_status: TaskStatus[None] = TASK_STATUS_IGNORED) -> None:
+        await self.open()
+
+        try:
+            task_status.started()
+
+            while True:
+                batch = self._batch
+                await batch.ready.wait()
+
+                with move_on_after(self.commit_interval):
+                    await batch.full.wait()
+
+                await self.commit()
+
+        finally:
+            await self.close()
+
+    async def put(self, event: PersistentEvent) -> None:
+        if self._closed:
+            raise ClosedResourceError("Event queue is closed")
+
+        data = encode_event(event)
+        event_id = self._next_id
+        self._next_id += 1
+
+        batch = self._batch
+        batch.inserts.append((event_id, data))
+        batch.ready.set()
+
+        if len(batch.inserts) >= self.max_batch:
+            batch.full.set()
+
+        await batch.committed.wait()
+
+        if batch.error is not None:
+            raise batch.error
+
+        self._tags[id(event)] = (event, event_id)
+
+    def ack(self, event: Event) -> None:
+        tag = self._tags.pop(id(event), None)
+
+        if tag is None:
+            return
+
+        _, event_id = tag
+        self._batch.acks.append(event_id)
+        self._batch.ready.set()
+
+    def pending(self) -> list[PersistentEvent]:
+        # Only the events found when the queue was opened are returned, the
+        # ones enqueued since then are already being processed.
+        rows, self._recovered = self._recovered, []
+        events = []
+
+        for event_id, data in rows:
+            try:
+                event = decode_event(data)
+
+            except (ValueError, KeyError, TypeError) as err:
+                # Moved out of the way (i.e. written by an incompatible
+                # version), so that it does not fail every restart.
+                logger.error(
+                    "Moving undecodable event to the dead-letter table",
+                    extra={
+                        "event.id": event_id,
+                        "exc.type": type(err).__name__,
+                        "exc.message": str(err),
+                    },
+                )
+                self._batch.dead.append((event_id, data, str(err)))
+                self._batch.ready.set()
+                continue
+
+            self._tags[id(event)] = (event, event_id)
+            events.append(event)
+
+        return events
+
+    async def commit(self) -> None:
+        batch, self._batch = self._batch, _Batch()
+
+        if not batch.inserts and not batch.acks and not batch.dead:
+            batch.committed.set()
+            return
+
+        try:
+            await self._run_sync(self._write, batch.inserts, batch.acks, batch.dead)
+            self.commits += 1
+
+        except Exception as err:
+            batch.error = err
+
+        finally:
+            batch.committed.set()
+
+    async def _run_sync(self, func: Any, *args: Any) -> Any:
+        return await to_thread.run_sync(func, *args, limiter=self._limiter)
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=FULL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS events "
+            "(id INTEGER PRIMARY KEY, event TEXT NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS dead_events "
+            "(id INTEGER PRIMARY KEY, event TEXT NOT NULL, error TEXT NOT NULL)"
+        )
+        conn.commit()
+
+        self._recovered = conn.execute(
+            "SELECT id, event FROM events ORDER BY id",
+        ).fetchall()
+
+        if self._recovered:
+            self._next_id = self._recovered[-1][0] + 1
+
+        return conn
+
+    def _write(
+        self,
+        inserts: list[tuple[int, str]],
+        acks: Iterable[int],
+        dead: list[tuple[int, str, str]],
+    ) -> None:
+        assert self._conn is not None
+
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO dead_events (id, event, error) "
+                "VALUES (?, ?, ?)",
+                dead,
+            )
+            self._conn.executemany(
+                "DELETE FROM events WHERE id = ?",
+                [(event_id,) for event_id, _, _ in dead],
+            )
+            self._conn.executemany(
+                "INSERT INTO events (id, event) VALUES (?, ?)",
+                inserts,
+            )
+            self._conn.executemany(
+                "DELETE FROM events WHERE id = ?",
+                [(event_id,) for event_id in acks],
+            )
@@ -0,0 +1,95 @@
+from collections.abc import Awaitable, Callable, Hashable
+from collections import deque
+from math import inf
+
+from anyio.abc import TaskStatus
+from anyio import (
+    create_memory_object_stream,
+    create_task_group,
+    Semaphore,
+    TASK_STATUS_IGNORED,
+)
+from anyio.streams.memory import MemoryObjectReceiveStream
+
+from nopf.core.channel import (
+    Event,
+    EventCreate,
+    EventUpdate,
+    EventDelete,
+)
+
+
+type EventKey = Hashable
+type EventKeyFunction = Callable[[Event], EventKey]
+type Job = Callable[[], Awaitable[None]]
+
+
+def default_event_key(event: Event) -> EventKey:
+    match event:
+        case EventCreate() | EventUpdate() | EventDelete():
+            return (event.payload.model, event.payload.data.get("id"))
+
+        case _:
+            # Custom events are processed in order, among themselves.
+            return None
+
+
+class OrderedWorkerPool:
+    def __init__(self, size: int, queue_depth: int) -> None:
+        # Otherwise, no job would ever be accepted, or processed.
+        if size < 1 or queue_depth < 1:
+            raise ValueError(
+                f"Invalid worker pool: size={size}, queue_depth={queue_depth}"
+            )
+
+        self.size = size
+        self.queue_depth = queue_depth
+
+        # Jobs of the keys being processed by a worker, or waiting for one.
+        self._pending: dict[EventKey, deque[Job]] = {}
+        self._queued = Semaphore(queue_depth)
+        self._ready_tx, self._ready_rx = create_memory_object_stream[EventKey](inf)
+
+    @property
+    def queued(self) -> int:
+        return sum(len(jobs) for jobs in self._pending.values())
+
+    async def run(self, task_status: TaskStatus[None] = TASK_STATUS_IGNORED) -> None:
+        async with create_task_group() as tg:
+            async with self._ready_rx:
+                for _ in range(self.size):
+                    tg.start_soon(self._worker, self._ready_rx.clone())
+
+            task_status.started()
+
+    def close(self) -> None:
+        # The workers exit once the submitted jobs are done.
+        self._ready_tx.close()
+
+    async def submit(self, key: EventKey, job: Job) -> None:
+        # Wait for room in the queue, so that the producer is slowed down
+        # when the workers cannot keep up.
+        await self._queued.acquire()
+
+        jobs = self._pending.get(key)
+
+        if jobs is not None:
+            # A worker already owns the key, it runs the job after the
+            # previous ones.
+            jobs.append(job)
+
+        else:
+            self._pending[key] = deque([job])
+            self._ready_tx.send_nowait(key)
+
+    async def _worker(self, ready_rx: MemoryObjectReceiveStream[EventKey]) -> None:
+        async with ready_rx:
+            async for key in ready_rx:
+                jobs = self._pending[key]
+
+                while jobs:
+                    job = jobs.popleft()
+                    self._queued.release()
+                    await job()
+
+                del self._pending[key]
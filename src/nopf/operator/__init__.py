@@ -5,16 +5,24 @@ import sys
 from logbook import Logger  # type: ignore
 
 from anyio.abc import TaskStatus
-from anyio import create_task_group, TASK_STATUS_IGNORED, run as run_event_loop
+from anyio import (
+    create_task_group,
+    to_thread,
+    TASK_STATUS_IGNORED,
+    run as run_event_loop,
+)
 
 from nopf.settings import Settings
 from nopf.logging import LogHandler
 from nopf.api import server_task
 from nopf.client import NetboxClient, _client
+from nopf.client.priority import request_priority
 
 from nopf.core.errors import flatten_error_tree
 from nopf.core.tasks import Tasks, TaskHandler
-from nopf.core.channel import ChannelSender
+from nopf.core.channel import ChannelLimits, ChannelSender
+from nopf.core.workers import EventKeyFunction, default_event_key
+from nopf.core.queue import DurableQueue
 from nopf.core.handlers import (
     Handlers,
     ModelHandler,
@@ -29,6 +37,24 @@ from .setup import create_webhooks
 type Decorator[T] = Callable[[T], T]
 
 
+# Events acknowledged before being processed are only held in memory (or in
+# the durable queue), they are bounded even if no limit is configured.
+ASYNC_ACK_MAX_EVENTS = 1000
+
+
+def channel_limits(settings: Settings) -> ChannelLimits:
+    max_events = settings.channel_max_events
+
+    if (
+        settings.server_async_ack
+        and max_events <= 0
+        and settings.channel_max_bytes <= 0
+    ):
+        max_events = ASYNC_ACK_MAX_EVENTS
+
+    return ChannelLimits(max_events=max_events, max_bytes=settings.channel_max_bytes)
+
+
 class Operator:
     def __init__(self, settings: Settings):
         self.settings = settings
@@ -38,6 +64,7 @@ class Operator:
 
         self.tasks = Tasks()
         self.handlers = Handlers()
+        self.event_key: EventKeyFunction = default_event_key
 
         self.exit_code = 0
 
@@ -60,17 +87,54 @@ class Operator:
 
     async def _run(self) -> None:
         self.logger.info("Initialize netbox client")
-        _client.set(NetboxClient(self.settings))
+        client = await NetboxClient.load(self.settings)
+        _client.set(client)
 
         self.logger.info("Create webhooks")
         await create_webhooks(self.settings, self.handlers)
 
+        if self.settings.netbox_prewarm_connections > 0:
+            self.logger.info("Pre-warm netbox connections")
+            await client.prewarm(self.settings.netbox_prewarm_connections)
+
         async with create_task_group() as tg:
+            if self.settings.netbox_warmup_operations:
+                self.logger.info("Warm up netbox client")
+                tg.start_soon(
+                    to_thread.run_sync,
+                    client.operations.warmup,
+                    self.settings.netbox_warmup_operations,
+                )
+
+            queue = None
+
+            if self.settings.event_queue_path:
+                self.logger.info("Open event queue")
+                queue = DurableQueue(
+                    self.settings.event_queue_path,
+                    commit_interval=self.settings.event_queue_commit_interval,
+                    max_batch=self.settings.event_queue_max_batch,
+                )
+                await tg.start(queue.run)
+
+            # Requests made by webhook handlers are latency-sensitive, they
+            # are sent before the ones made by background tasks.
             self.logger.info("Start controller")
-            tx = await tg.start(controller_task, self.handlers)
+            with request_priority("high"):
+                tx = await tg.start(
+                    controller_task,
+                    self.handlers,
+                    self.settings.controller_workers,
+                    self.settings.controller_queue_depth,
+                    self.event_key,
+                    queue,
+                    channel_limits(self.settings),
+                    self.settings.controller_coalesce_window,
+                )
 
             self.logger.info("Start tasks")
-            await tg.start(self._run_tasks, tx)
+            with request_priority("low"):
+                await tg.start(self._run_tasks, tx)
 
             self.logger.info("Start HTTP server")
             await self._run_server(tx)
@@ -159,3 +223,7 @@ class Operator:
     def on_custom(self, func: CustomHandler) -> CustomHandler:
         self.handlers.add_custom_handler(func)
         return func
+
+    def ordering_key(self, func: EventKeyFunction) -> EventKeyFunction:
+        self.event_key = func
+        return func
@@ -1,45 +1,226 @@
-from anyio.abc import TaskStatus
-from anyio import TASK_STATUS_IGNORED
+from functools import partial
+
+from logbook import Logger  # type: ignore
+
+from anyio.abc import TaskStatus, ObjectSendStream
+from anyio import create_task_group, Lock, TASK_STATUS_IGNORED
 
 from nopf.core.channel import (
+    ChannelLimits,
+    ChannelMessage,
+    ChannelReceiver,
+    ChannelResponse,
     ChannelSender,
     create_channel,
+    Event,
     EventCreate,
     EventUpdate,
     EventDelete,
     EventCustom,
 )
+from nopf.core.coalescing import UpdateCoalescer
 from nopf.core.handlers import Handlers
+from nopf.core.queue import DurableQueue
+from nopf.core.workers import (
+    EventKeyFunction,
+    OrderedWorkerPool,
+    default_event_key,
+)
+from nopf.client import _client
+from nopf.schema import WebhookPayload
+
+
+logger = Logger("nopf.controller")
 
 
 async def task(
     handlers: Handlers,
+    workers: int = 1,
+    queue_depth: int = 100,
+    event_key: EventKeyFunction = default_event_key,
+    queue: DurableQueue | None = None,
+    limits: ChannelLimits | None = None,
+    coalesce_window: float = 0.0,
     task_status: TaskStatus[ChannelSender] = TASK_STATUS_IGNORED,
 ) -> None:
-    tx, rx = create_channel()
-    task_status.started(tx)
+    tx, rx = create_channel(queue, limits)
+
+    async with create_task_group() as tg:
+        pool = None
+        coalescer = None
+
+        # Without a worker pool, events are processed one at a time, even
+        # the coalesced updates, which are processed by another task.
+        lock = Lock()
+
+        async def dispatch(evt: Event, messages: list[ChannelMessage]) -> None:
+            if pool is None:
+                async with lock:
+                    await process(handlers, rx, evt, messages)
+
+                return
+
+            try:
+                key = event_key(evt)
+
+            except Exception as err:
+                await done(rx, messages, err)
+
+            else:
+                job = partial(process, handlers, rx, evt, messages)
+                await pool.submit(key, job)
+
+        if workers > 1:
+            # Events of different objects are processed concurrently, events
+            # of the same object (or key) are processed in order.
+            pool = OrderedWorkerPool(workers, queue_depth)
+            await tg.start(pool.run)
 
-    async for resp_tx, evt in rx.stream:
         try:
-            match evt:
-                case EventCreate():
-                    await handlers.invoke_create_handlers(evt.payload)
+            # The coalesced updates are flushed before the pool is closed.
+            async with create_task_group() as coalescing_tg:
+                if coalesce_window > 0:
+                    # Successive updates of an object are processed once.
+                    coalescer = UpdateCoalescer(coalesce_window, dispatch, event_key)
+                    await coalescing_tg.start(coalescer.run)
+
+                # The recovered events are enqueued before the new ones are
+                # accepted.
+                await tx.replay()
+                task_status.started(tx)
+
+                try:
+                    async for resp_tx, evt in rx.stream:
+                        match evt:
+                            case EventCreate() | EventUpdate() | EventDelete():
+                                # Handlers of other objects must not read a
+                                # stale version of the object while its event
+                                # is held or waits for a worker.
+                                invalidate_cache(evt.payload)
+
+                        if coalescer is not None:
+                            try:
+                                held = coalesce(coalescer, resp_tx, evt)
+
+                            except Exception as err:
+                                await done(rx, [(resp_tx, evt)], err)
+                                continue
+
+                            if held is None:
+                                continue
+
+                            await done(rx, held, None)
+
+                        await dispatch(evt, [(resp_tx, evt)])
+
+                finally:
+                    if coalescer is not None:
+                        coalescer.close()
+
+        finally:
+            if pool is not None:
+                pool.close()
+
+
+def coalesce(
+    coalescer: UpdateCoalescer,
+    resp_tx: ObjectSendStream[ChannelResponse] | None,
+    evt: Event,
+) -> list[ChannelMessage] | None:
+    # Returns None if the event is held, otherwise the held messages it
+    # answers (the cancelled updates of a deleted object).
+    match evt:
+        case EventUpdate():
+            coalescer.hold(resp_tx, evt)
+            return None
+
+        case EventDelete():
+            return coalescer.cancel(evt)
+
+        case _:
+            return []
+
+
+async def process(
+    handlers: Handlers,
+    rx: ChannelReceiver,
+    evt: Event,
+    messages: list[ChannelMessage],
+) -> None:
+    response: ChannelResponse = None
+
+    try:
+        # The object is invalidated again: a request sent before its event
+        # was received may have cached its previous version since then.
+        match evt:
+            case EventCreate():
+                invalidate_cache(evt.payload)
+                await handlers.invoke_create_handlers(evt.payload)
+
+            case EventUpdate():
+                invalidate_cache(evt.payload)
+                await handlers.invoke_update_handlers(evt.payload)
+
+            case EventDelete():
+                invalidate_cache(evt.payload)
+                await handlers.invoke_delete_handlers(evt.payload)
+
+            case EventCustom():
+                await handlers.invoke_custom_handlers(evt.data)
+
+            case _:
+                typename = type(evt).__name__
+                raise ValueError(f"Invalid event type: {typename}")
+
+    except Exception as err:
+        response = err
+
+    await done(rx, messages, response)
+
+
+async def done(
+    rx: ChannelReceiver,
+    messages: list[ChannelMessage],
+    response: ChannelResponse,
+) -> None:
+    # The events are acknowledged even if their handlers failed: they are not
+    # processed again after a restart (Netbox retries the webhooks, unless
+    # acknowledged asynchronously).
+    for resp_tx, evt in messages:
+        rx.ack(evt)
+        await reply(resp_tx, evt, response)
+
+
+async def reply(
+    resp_tx: ObjectSendStream[ChannelResponse] | None,
+    evt: Event,
+    response: ChannelResponse,
+) -> None:
+    if resp_tx is not None:
+        await resp_tx.send(response)
 
-                case EventUpdate():
-                    await handlers.invoke_update_handlers(evt.payload)
+    elif response is not None:
+        # Nobody waits for the event to be processed (see
+        # `ChannelSender.post`): the event is dropped, the object it refers
+        # to is logged so that it can be reconciled.
+        extra = {
+            "event.type": type(evt).__name__,
+            "exc.type": type(response).__name__,
+            "exc.message": str(response),
+        }
 
-                case EventDelete():
-                    await handlers.invoke_delete_handlers(evt.payload)
+        match evt:
+            case EventCreate() | EventUpdate() | EventDelete():
+                extra["event.model"] = evt.payload.model
+                extra["event.id"] = evt.payload.data.get("id")
+                extra["event.request_id"] = evt.payload.request_id
 
-                case EventCustom():
-                    await handlers.invoke_custom_handlers(evt.data)
+        logger.error("Unhandled exception in event handler", extra=extra)
 
-                case _:
-                    typename = type(evt).__name__
-                    raise ValueError(f"Invalid event type: {typename}")
 
-        except Exception as err:
-            await resp_tx.send(err)
+def invalidate_cache(payload: WebhookPayload) -> None:
+    # Handlers must not read a stale version of the object from the cache.
+    client = _client.get()
 
-        else:
-            await resp_tx.send(None)
+    if client is not None:
+        client.invalidate(payload)
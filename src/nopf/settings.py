@@ -3,14 +3,14 @@ Settings can be injected via environment variables, or directly via code as
 constructor parameters.
 """
 
-from typing import Any
+from typing import Any, Literal
 
 from secrets import token_hex
 from urllib.parse import urljoin
 
 from socket import gethostname
 
-from decouple import config  # type: ignore
+from decouple import config, Csv  # type: ignore
 from pydantic import BaseModel, Field
 
 
@@ -20,6 +20,16 @@ def _get_default_callback_url(data: dict[str, Any]) -> str:
     return f"http://{hostname}:{port}"
 
 
+def _parse_timeouts(value: str) -> dict[str, float]:
+    timeouts = {}
+
+    for item in Csv()(value):
+        operation_id, _, timeout = item.partition("=")
+        timeouts[operation_id.strip()] = float(timeout)
+
+    return timeouts
+
+
 class Settings(BaseModel):
     """
     Operator settings.
@@ -102,6 +112,70 @@ class Settings(BaseModel):
     * Default: ``{netbox_api}/api/schema``
     """
 
+    netbox_schema_cache_dir: str = Field(
+        default_factory=lambda: config(
+            "NETBOX_SCHEMA_CACHE_DIR",
+            default="",
+        ),
+    )
+    """
+    Directory where the parsed and validated Netbox API schema is cached. The
+    cache is keyed by the content hash of the source schema: as long as it
+    does not change, parsing and validating the schema is skipped on startup.
+
+    When the schema is fetched from Netbox, it is cached by Netbox version
+    instead: as long as it does not change, the schema is not downloaded
+    again.
+
+    If empty, the schema is not cached.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_SCHEMA_CACHE_DIR``
+    * Default: ``""``
+    """
+
+    netbox_schema_cache_max_entries: int = Field(
+        default_factory=lambda: config(
+            "NETBOX_SCHEMA_CACHE_MAX_ENTRIES",
+            cast=int,
+            default=4,
+        ),
+    )
+    """
+    Maximum number of schemas kept in ``netbox_schema_cache_dir``. Once
+    reached, the least recently used ones are removed.
+
+    If ``0``, the cached schemas are never removed.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_SCHEMA_CACHE_MAX_ENTRIES``
+    * Default: ``4``
+    """
+
+    netbox_schema_operations: list[str] = Field(
+        default_factory=lambda: config(
+            "NETBOX_SCHEMA_OPERATIONS",
+            cast=Csv(),
+            default="",
+        ),
+    )
+    """
+    IDs of the Netbox API operations used by the operator. If set, the schema
+    is pruned to those operations (and the ones used by the framework itself),
+    which makes it faster to load, and to cache. Other operations are then not
+    available.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_SCHEMA_OPERATIONS`` (comma-separated)
+    * Default: ``[]``
+    """
+
     netbox_ssl_verify: bool = Field(
         default_factory=lambda: config(
             "NETBOX_SSL_VERIFY",
@@ -119,96 +193,1028 @@ class Settings(BaseModel):
     * Default: ``True``
     """
 
-    server_bind_host: str = Field(
+    netbox_response_validation: Literal["strict", "sampled", "off"] = Field(
         default_factory=lambda: config(
-            "NOPF_SERVER_BIND_HOST",
-            default="0.0.0.0",
+            "NETBOX_RESPONSE_VALIDATION",
+            default="strict",
         ),
     )
     """
-    Hostname or IP address to bind the HTTP server to.
+    How responses received from the Netbox API are validated against the
+    OpenAPI schema:
+
+    * ``strict``: every response is validated
+    * ``sampled``: only a sample of the responses is validated (see
+      ``netbox_response_validation_sample_interval`` and
+      ``netbox_response_validation_sample_items``)
+    * ``off``: responses are not validated
+
+    This can be overridden per operation and per call.
 
     **Resolution order:**
 
     * Constructor parameter
-    * Environment variable ``NOPF_SERVER_BIND_HOST``
-    * Default: ``0.0.0.0``
+    * Environment variable ``NETBOX_RESPONSE_VALIDATION``
+    * Default: ``strict``
     """
 
-    server_bind_port: int = Field(
+    netbox_response_validation_sample_interval: int = Field(
         default_factory=lambda: config(
-            "NOPF_SERVER_BIND_PORT",
+            "NETBOX_RESPONSE_VALIDATION_SAMPLE_INTERVAL",
             cast=int,
-            default=5000,
+            default=10,
         ),
     )
     """
-    Port to bind the HTTP server to.
+    In ``sampled`` mode, validate 1 response every N responses of an operation.
 
     **Resolution order:**
 
     * Constructor parameter
-    * Environment variable ``NOPF_SERVER_BIND_PORT``
-    * Default: ``5000``
+    * Environment variable ``NETBOX_RESPONSE_VALIDATION_SAMPLE_INTERVAL``
+    * Default: ``10``
     """
 
-    server_callback_name: str = Field(
+    netbox_response_validation_sample_items: float = Field(
         default_factory=lambda: config(
-            "NOPF_SERVER_CALLBACK_NAME",
-        )
+            "NETBOX_RESPONSE_VALIDATION_SAMPLE_ITEMS",
+            cast=float,
+            default=10.0,
+        ),
     )
     """
-    Name of the callback in Netbox. The Netbox Operator Framework will use this
-    value to name the webhooks in Netbox.
+    In ``sampled`` mode, percentage of the ``results`` items of a paginated
+    list response that are validated.
 
-    .. warning::
+    **Resolution order:**
 
-       Make sure the name does not clash with another operator. If any callback
-       with the same name exist, they will be overwritten.
+    * Constructor parameter
+    * Environment variable ``NETBOX_RESPONSE_VALIDATION_SAMPLE_ITEMS``
+    * Default: ``10.0``
+    """
+
+    netbox_warmup_operations: list[str] = Field(
+        default_factory=lambda: config(
+            "NETBOX_WARMUP_OPERATIONS",
+            cast=Csv(),
+            default="",
+        ),
+    )
+    """
+    IDs of the Netbox API operations to build in the background at startup.
+    Other operations are built on their first use.
+
+    **Examples:**
+
+    * ``dcim_sites_list,dcim_sites_retrieve``
 
     **Resolution order:**
 
     * Constructor parameter
-    * Environment variable ``NOPF_SERVER_CALLBACK_NAME``
+    * Environment variable ``NETBOX_WARMUP_OPERATIONS`` (comma-separated)
+    * Default: ``[]``
     """
 
-    server_callback_url: str = Field(
-        default_factory=lambda data: config(
-            "NOPF_SERVER_CALLBACK_URL",
-            default=_get_default_callback_url(data),
+    netbox_cache_size: int = Field(
+        default_factory=lambda: config(
+            "NETBOX_CACHE_SIZE",
+            cast=int,
+            default=0,
         ),
     )
     """
-    URL where Netbox will send the webhook requests. If not set, the Netbox
-    Operator Framework will use the hostname of the machine and port of the
-    server.
+    Maximum number of responses of ``*_retrieve`` and ``*_list`` operations
+    kept in the read cache of the Netbox client. Entries are evicted when a
+    webhook for the corresponding object is received.
 
-    This is the URL as seen by Netbox, so make sure it is reachable by it. If
-    there are any Reverse Proxy in between, this must be the URL exposed by said
-    Reverse Proxy.
+    If ``0``, responses are not cached.
 
     **Resolution order:**
 
     * Constructor parameter
-    * Environment variable ``NOPF_SERVER_CALLBACK_URL``
-    * Default: ``http://{gethostname()}:{server_bind_port}``
+    * Environment variable ``NETBOX_CACHE_SIZE``
+    * Default: ``0``
     """
 
-    server_callback_ssl_verify: bool = Field(
+    netbox_cache_ttl: float = Field(
         default_factory=lambda: config(
-            "NOPF_SERVER_CALLBACK_SSL_VERIFY",
+            "NETBOX_CACHE_TTL",
+            cast=float,
+            default=60.0,
+        ),
+    )
+    """
+    Lifetime of the entries of the read cache, in seconds. Changes made to
+    objects the operator does not receive webhooks for are visible after at
+    most this delay.
+
+    If ``0``, entries do not expire.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_CACHE_TTL``
+    * Default: ``60.0``
+    """
+
+    netbox_graphql_cache_size: int = Field(
+        default_factory=lambda: config(
+            "NETBOX_GRAPHQL_CACHE_SIZE",
+            cast=int,
+            default=0,
+        ),
+    )
+    """
+    Maximum number of GraphQL query results kept in the cache of the Netbox
+    client. Entries expire after ``netbox_cache_ttl``, and are all evicted
+    when a webhook is received.
+
+    If ``0``, results are not cached.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_GRAPHQL_CACHE_SIZE``
+    * Default: ``0``
+    """
+
+    netbox_coalesce_reads: bool = Field(
+        default_factory=lambda: config(
+            "NETBOX_COALESCE_READS",
             cast=bool,
-            default=True,
+            default=False,
         ),
     )
     """
-    Tell Netbox to verify SSL certificates when connecting to the callback URL.
+    If enabled, identical concurrent ``GET`` requests (same operation and
+    parameters) share a single round-trip to Netbox, and a single result.
 
     **Resolution order:**
 
     * Constructor parameter
-    * Environment variable ``NOPF_SERVER_CALLBACK_SSL_VERIFY``
-    * Default: ``True``
+    * Environment variable ``NETBOX_COALESCE_READS``
+    * Default: ``False``
+    """
+
+    netbox_batch_retrieves: bool = Field(
+        default_factory=lambda: config(
+            "NETBOX_BATCH_RETRIEVES",
+            cast=bool,
+            default=False,
+        ),
+    )
+    """
+    If enabled, ``*_retrieve`` calls (with only the ``id`` parameter) issued
+    within the same batching window are sent as a single ``*_list`` call
+    filtered by ``id``.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_BATCH_RETRIEVES``
+    * Default: ``False``
+    """
+
+    netbox_batch_window: float = Field(
+        default_factory=lambda: config(
+            "NETBOX_BATCH_WINDOW",
+            cast=float,
+            default=0.0,
+        ),
+    )
+    """
+    Time to wait for other ``*_retrieve`` calls before sending a batch, in
+    seconds. If ``0``, only the calls issued within the same scheduling tick
+    are batched.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_BATCH_WINDOW``
+    * Default: ``0.0``
+    """
+
+    netbox_batch_max_size: int = Field(
+        default_factory=lambda: config(
+            "NETBOX_BATCH_MAX_SIZE",
+            cast=int,
+            default=100,
+        ),
+    )
+    """
+    Maximum number of objects per batch. It must not exceed the
+    ``MAX_PAGE_SIZE`` of the Netbox instance.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_BATCH_MAX_SIZE``
+    * Default: ``100``
+    """
+
+    netbox_write_batch_size: int = Field(
+        default_factory=lambda: config(
+            "NETBOX_WRITE_BATCH_SIZE",
+            cast=int,
+            default=0,
+        ),
+    )
+    """
+    Maximum number of ``*_create`` or ``*_partial_update`` calls made through
+    ``NetboxClient.writer`` that are folded into a single bulk request.
+
+    If ``0``, the writer is disabled.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_WRITE_BATCH_SIZE``
+    * Default: ``0``
+    """
+
+    netbox_write_batch_window: float = Field(
+        default_factory=lambda: config(
+            "NETBOX_WRITE_BATCH_WINDOW",
+            cast=float,
+            default=0.05,
+        ),
+    )
+    """
+    Maximum time a write made through ``NetboxClient.writer`` is buffered
+    before being flushed, in seconds.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_WRITE_BATCH_WINDOW``
+    * Default: ``0.05``
+    """
+
+    netbox_max_connections: int = Field(
+        default_factory=lambda: config(
+            "NETBOX_MAX_CONNECTIONS",
+            cast=int,
+            default=100,
+        ),
+    )
+    """
+    Maximum number of concurrent connections to the Netbox API.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_MAX_CONNECTIONS``
+    * Default: ``100``
+    """
+
+    netbox_max_keepalive_connections: int = Field(
+        default_factory=lambda: config(
+            "NETBOX_MAX_KEEPALIVE_CONNECTIONS",
+            cast=int,
+            default=20,
+        ),
+    )
+    """
+    Maximum number of idle connections to the Netbox API kept open for reuse.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_MAX_KEEPALIVE_CONNECTIONS``
+    * Default: ``20``
+    """
+
+    netbox_keepalive_expiry: float = Field(
+        default_factory=lambda: config(
+            "NETBOX_KEEPALIVE_EXPIRY",
+            cast=float,
+            default=5.0,
+        ),
+    )
+    """
+    Time after which an idle connection to the Netbox API is closed, in
+    seconds.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_KEEPALIVE_EXPIRY``
+    * Default: ``5.0``
+    """
+
+    netbox_timeout: float = Field(
+        default_factory=lambda: config(
+            "NETBOX_TIMEOUT",
+            cast=float,
+            default=5.0,
+        ),
+    )
+    """
+    Timeout of the requests sent to the Netbox API (to connect, send the
+    request, and read each chunk of the response), in seconds.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_TIMEOUT``
+    * Default: ``5.0``
+    """
+
+    netbox_operation_timeouts: dict[str, float] = Field(
+        default_factory=lambda: config(
+            "NETBOX_OPERATION_TIMEOUTS",
+            cast=_parse_timeouts,
+            default="",
+        ),
+    )
+    """
+    Timeout of the requests of specific Netbox API operations, in seconds,
+    overriding ``netbox_timeout``. The ``graphql`` key sets the timeout of the
+    GraphQL queries.
+
+    **Examples:**
+
+    * ``dcim_devices_list=30,dcim_sites_list=10``
+    * ``graphql=15``
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_OPERATION_TIMEOUTS`` (comma-separated ``operation=seconds`` pairs)
+    * Default: ``{}``
+    """
+
+    netbox_http2: bool = Field(
+        default_factory=lambda: config(
+            "NETBOX_HTTP2",
+            cast=bool,
+            default=False,
+        ),
+    )
+    """
+    Use HTTP/2 when the Netbox server supports it, so that concurrent requests
+    share a single connection.
+
+    .. note::
+
+       This requires the ``http2`` extra (``pip install nopf[http2]``).
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_HTTP2``
+    * Default: ``False``
+    """
+
+    netbox_prewarm_connections: int = Field(
+        default_factory=lambda: config(
+            "NETBOX_PREWARM_CONNECTIONS",
+            cast=int,
+            default=0,
+        ),
+    )
+    """
+    Number of connections to the Netbox API opened at startup, before the
+    operator starts accepting webhooks. At most
+    ``netbox_max_keepalive_connections`` of them are kept open.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_PREWARM_CONNECTIONS``
+    * Default: ``0``
+    """
+
+    netbox_adaptive_concurrency: bool = Field(
+        default_factory=lambda: config(
+            "NETBOX_ADAPTIVE_CONCURRENCY",
+            cast=bool,
+            default=False,
+        ),
+    )
+    """
+    Limit the number of concurrent requests sent to the Netbox API, adapting
+    the limit to the observed latency and error responses, honoring
+    ``Retry-After`` headers, and failing fast when Netbox is down (see
+    ``NetboxClient.limiter``).
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_ADAPTIVE_CONCURRENCY``
+    * Default: ``False``
+    """
+
+    netbox_concurrency_limit: int = Field(
+        default_factory=lambda: config(
+            "NETBOX_CONCURRENCY_LIMIT",
+            cast=int,
+            default=10,
+        ),
+    )
+    """
+    Initial maximum number of concurrent requests, when
+    ``netbox_adaptive_concurrency`` is enabled.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_CONCURRENCY_LIMIT``
+    * Default: ``10``
+    """
+
+    netbox_concurrency_max_limit: int = Field(
+        default_factory=lambda: config(
+            "NETBOX_CONCURRENCY_MAX_LIMIT",
+            cast=int,
+            default=100,
+        ),
+    )
+    """
+    Upper bound of the maximum number of concurrent requests, when
+    ``netbox_adaptive_concurrency`` is enabled.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_CONCURRENCY_MAX_LIMIT``
+    * Default: ``100``
+    """
+
+    netbox_concurrency_latency_threshold: float = Field(
+        default_factory=lambda: config(
+            "NETBOX_CONCURRENCY_LATENCY_THRESHOLD",
+            cast=float,
+            default=2.0,
+        ),
+    )
+    """
+    Latency above which a response from the Netbox API is considered a sign of
+    overload, in seconds, when ``netbox_adaptive_concurrency`` is enabled. It
+    is measured up to the response headers, regardless of the body size.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_CONCURRENCY_LATENCY_THRESHOLD``
+    * Default: ``2.0``
+    """
+
+    netbox_circuit_failure_threshold: int = Field(
+        default_factory=lambda: config(
+            "NETBOX_CIRCUIT_FAILURE_THRESHOLD",
+            cast=int,
+            default=5,
+        ),
+    )
+    """
+    Number of consecutive failed requests (``5xx`` responses, or transport
+    errors) after which requests fail fast, when
+    ``netbox_adaptive_concurrency`` is enabled.
+
+    If ``0``, the circuit breaker is disabled.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_CIRCUIT_FAILURE_THRESHOLD``
+    * Default: ``5``
+    """
+
+    netbox_circuit_recovery_time: float = Field(
+        default_factory=lambda: config(
+            "NETBOX_CIRCUIT_RECOVERY_TIME",
+            cast=float,
+            default=30.0,
+        ),
+    )
+    """
+    Time during which requests fail fast once the circuit breaker opened,
+    before a probe request is sent, in seconds.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_CIRCUIT_RECOVERY_TIME``
+    * Default: ``30.0``
+    """
+
+    netbox_hedge_reads: bool = Field(
+        default_factory=lambda: config(
+            "NETBOX_HEDGE_READS",
+            cast=bool,
+            default=False,
+        ),
+    )
+    """
+    Hedge the ``GET`` requests sent to the Netbox API: when no response was
+    received within ``netbox_hedge_percentile`` of the recent latencies of the
+    operation, a duplicate request is sent, and the first response received is
+    used.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_HEDGE_READS``
+    * Default: ``False``
+    """
+
+    netbox_hedge_percentile: float = Field(
+        default_factory=lambda: config(
+            "NETBOX_HEDGE_PERCENTILE",
+            cast=float,
+            default=95.0,
+        ),
+    )
+    """
+    Percentile of the recent latencies of an operation after which its
+    requests are hedged, when ``netbox_hedge_reads`` is enabled.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_HEDGE_PERCENTILE``
+    * Default: ``95.0``
+    """
+
+    netbox_hedge_budget: float = Field(
+        default_factory=lambda: config(
+            "NETBOX_HEDGE_BUDGET",
+            cast=float,
+            default=5.0,
+        ),
+    )
+    """
+    Maximum percentage of the ``GET`` requests that are hedged, when
+    ``netbox_hedge_reads`` is enabled.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_HEDGE_BUDGET``
+    * Default: ``5.0``
+    """
+
+    netbox_request_priorities: bool = Field(
+        default_factory=lambda: config(
+            "NETBOX_REQUEST_PRIORITIES",
+            cast=bool,
+            default=False,
+        ),
+    )
+    """
+    Schedule the requests sent to the Netbox API by priority: when the
+    connection pool (or the adaptive concurrency limit) is saturated, requests
+    made by webhook handlers are sent before the ones made by background
+    tasks.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_REQUEST_PRIORITIES``
+    * Default: ``False``
+    """
+
+    netbox_api_endpoints: list[str] = Field(
+        default_factory=lambda: config(
+            "NETBOX_API_ENDPOINTS",
+            cast=Csv(),
+            default="",
+        ),
+    )
+    """
+    URLs of the Netbox app replicas the requests are balanced across (each
+    request is sent to the healthy one with the least outstanding requests).
+    If empty, all requests are sent to ``netbox_api``.
+
+    The schema (and the Netbox version it is cached by) is still fetched from
+    ``netbox_api``, before the client and its balancing exist. The webhooks
+    are registered via ``netbox_api`` too. The connections opened by
+    ``NetboxClient.prewarm`` are opened to every endpoint.
+
+    **Examples:**
+
+    * ``http://netbox-1:8080,http://netbox-2:8080``
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_API_ENDPOINTS`` (comma-separated)
+    * Default: ``[]``
+    """
+
+    netbox_api_read_endpoints: list[str] = Field(
+        default_factory=lambda: config(
+            "NETBOX_API_READ_ENDPOINTS",
+            cast=Csv(),
+            default="",
+        ),
+    )
+    """
+    URLs of read-only Netbox replicas. If set, ``GET`` requests are balanced
+    across them, and the other requests across ``netbox_api_endpoints`` (or
+    sent to ``netbox_api``).
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_API_READ_ENDPOINTS`` (comma-separated)
+    * Default: ``[]``
+    """
+
+    netbox_endpoint_failure_threshold: int = Field(
+        default_factory=lambda: config(
+            "NETBOX_ENDPOINT_FAILURE_THRESHOLD",
+            cast=int,
+            default=3,
+        ),
+    )
+    """
+    Number of consecutive failed requests (``5xx`` responses, or transport
+    errors) after which a Netbox endpoint is ejected, when several endpoints
+    are configured.
+
+    If ``0``, endpoints are never ejected.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_ENDPOINT_FAILURE_THRESHOLD``
+    * Default: ``3``
+    """
+
+    netbox_endpoint_ejection_time: float = Field(
+        default_factory=lambda: config(
+            "NETBOX_ENDPOINT_EJECTION_TIME",
+            cast=float,
+            default=30.0,
+        ),
+    )
+    """
+    Time during which an ejected Netbox endpoint receives no request, in
+    seconds.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_ENDPOINT_EJECTION_TIME``
+    * Default: ``30.0``
+    """
+
+    netbox_exclude_fields: list[str] = Field(
+        default_factory=lambda: config(
+            "NETBOX_EXCLUDE_FIELDS",
+            cast=Csv(),
+            default="",
+        ),
+    )
+    """
+    Fields excluded from the objects returned by the ``*_list`` and
+    ``*_retrieve`` operations of the models (``exclude`` query parameter),
+    unless another projection is given to the operation.
+
+    **Examples:**
+
+    * ``config_context``: Do not render the config context of the devices and
+      virtual machines.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_EXCLUDE_FIELDS`` (comma-separated)
+    * Default: ``[]``
+    """
+
+    netbox_omit_fields: list[str] = Field(
+        default_factory=lambda: config(
+            "NETBOX_OMIT_FIELDS",
+            cast=Csv(),
+            default="",
+        ),
+    )
+    """
+    Fields omitted from the objects returned by the ``*_list`` and
+    ``*_retrieve`` operations of the models (``omit`` query parameter, Netbox
+    4.3+), unless another projection is given to the operation.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NETBOX_OMIT_FIELDS`` (comma-separated)
+    * Default: ``[]``
+    """
+
+    server_bind_host: str = Field(
+        default_factory=lambda: config(
+            "NOPF_SERVER_BIND_HOST",
+            default="0.0.0.0",
+        ),
+    )
+    """
+    Hostname or IP address to bind the HTTP server to.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NOPF_SERVER_BIND_HOST``
+    * Default: ``0.0.0.0``
+    """
+
+    server_bind_port: int = Field(
+        default_factory=lambda: config(
+            "NOPF_SERVER_BIND_PORT",
+            cast=int,
+            default=5000,
+        ),
+    )
+    """
+    Port to bind the HTTP server to.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NOPF_SERVER_BIND_PORT``
+    * Default: ``5000``
+    """
+
+    server_callback_name: str = Field(
+        default_factory=lambda: config(
+            "NOPF_SERVER_CALLBACK_NAME",
+        )
+    )
+    """
+    Name of the callback in Netbox. The Netbox Operator Framework will use this
+    value to name the webhooks in Netbox.
+
+    .. warning::
+
+       Make sure the name does not clash with another operator. If any callback
+       with the same name exist, they will be overwritten.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NOPF_SERVER_CALLBACK_NAME``
+    """
+
+    server_callback_url: str = Field(
+        default_factory=lambda data: config(
+            "NOPF_SERVER_CALLBACK_URL",
+            default=_get_default_callback_url(data),
+        ),
+    )
+    """
+    URL where Netbox will send the webhook requests. If not set, the Netbox
+    Operator Framework will use the hostname of the machine and port of the
+    server.
+
+    This is the URL as seen by Netbox, so make sure it is reachable by it. If
+    there are any Reverse Proxy in between, this must be the URL exposed by said
+    Reverse Proxy.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NOPF_SERVER_CALLBACK_URL``
+    * Default: ``http://{gethostname()}:{server_bind_port}``
+    """
+
+    server_callback_ssl_verify: bool = Field(
+        default_factory=lambda: config(
+            "NOPF_SERVER_CALLBACK_SSL_VERIFY",
+            cast=bool,
+            default=True,
+        ),
+    )
+    """
+    Tell Netbox to verify SSL certificates when connecting to the callback URL.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NOPF_SERVER_CALLBACK_SSL_VERIFY``
+    * Default: ``True``
+    """
+
+    server_async_ack: bool = Field(
+        default_factory=lambda: config(
+            "NOPF_SERVER_ASYNC_ACK",
+            cast=bool,
+            default=False,
+        ),
+    )
+    """
+    Acknowledge the webhooks with a ``202 Accepted`` response as soon as the
+    event is enqueued, instead of waiting for the handlers to complete.
+
+    Netbox then no longer retries the webhooks whose handlers failed: the
+    errors are logged by the operator (with the model, ID and request ID of
+    the object), and the event is dropped (it is also removed from the
+    durable queue, see ``event_queue_path``). Handlers must recover from their
+    own failures, i.e. with a periodic reconciliation task.
+
+    If neither ``channel_max_events`` nor ``channel_max_bytes`` is set, at most
+    ``1000`` events wait to be processed, further webhooks are rejected with a
+    ``429 Too Many Requests`` response.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NOPF_SERVER_ASYNC_ACK``
+    * Default: ``False``
+    """
+
+    server_retry_after: int = Field(
+        default_factory=lambda: config(
+            "NOPF_SERVER_RETRY_AFTER",
+            cast=int,
+            default=5,
+        ),
+    )
+    """
+    Value of the ``Retry-After`` header of the webhook responses, when the
+    event was rejected because too many events are waiting to be processed
+    (``429 Too Many Requests``), in seconds.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NOPF_SERVER_RETRY_AFTER``
+    * Default: ``5``
+    """
+
+    channel_max_events: int = Field(
+        default_factory=lambda: config(
+            "NOPF_CHANNEL_MAX_EVENTS",
+            cast=int,
+            default=0,
+        ),
+    )
+    """
+    Maximum number of webhook events waiting to be processed. Once reached,
+    the webhooks are rejected with a ``429 Too Many Requests`` response.
+
+    If ``0``, the number of events is not limited (unless
+    ``server_async_ack`` is enabled, see there).
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NOPF_CHANNEL_MAX_EVENTS``
+    * Default: ``0``
+    """
+
+    channel_max_bytes: int = Field(
+        default_factory=lambda: config(
+            "NOPF_CHANNEL_MAX_BYTES",
+            cast=int,
+            default=0,
+        ),
+    )
+    """
+    Maximum total size of the webhook events waiting to be processed, in
+    bytes (the size of an event is the size of its raw request body). Once
+    reached, the webhooks are rejected with a ``429 Too Many Requests``
+    response.
+
+    If ``0``, the size of the events is not limited.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NOPF_CHANNEL_MAX_BYTES``
+    * Default: ``0``
+    """
+
+    controller_workers: int = Field(
+        default_factory=lambda: config(
+            "NOPF_CONTROLLER_WORKERS",
+            cast=int,
+            default=1,
+        ),
+        ge=1,
+        validate_default=True,
+    )
+    """
+    Number of webhook events processed concurrently by the controller. Events
+    of the same object are always processed in order (see
+    ``Operator.ordering_key``).
+
+    If ``1``, events are processed one at a time, in the order they are
+    received. Must be at least ``1``.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NOPF_CONTROLLER_WORKERS``
+    * Default: ``1``
+    """
+
+    controller_queue_depth: int = Field(
+        default_factory=lambda: config(
+            "NOPF_CONTROLLER_QUEUE_DEPTH",
+            cast=int,
+            default=100,
+        ),
+        ge=1,
+        validate_default=True,
+    )
+    """
+    Maximum number of events waiting for a worker of the controller (when
+    ``controller_workers`` is greater than ``1``). Once reached, no more
+    events are accepted until a worker is available. Must be at least ``1``.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NOPF_CONTROLLER_QUEUE_DEPTH``
+    * Default: ``100``
+    """
+
+    controller_coalesce_window: float = Field(
+        default_factory=lambda: config(
+            "NOPF_CONTROLLER_COALESCE_WINDOW",
+            cast=float,
+            default=0.0,
+        ),
+    )
+    """
+    Time during which the ``updated`` events of an object are held, in
+    seconds, starting with the first one. The events received within this
+    window are merged into a single one (with the ``prechange`` snapshot of the
+    first event, and the ``postchange`` snapshot of the last one), so that the
+    update handlers are called once. A ``deleted`` event cancels the pending
+    updates of the object.
+
+    If ``0``, events are not coalesced.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NOPF_CONTROLLER_COALESCE_WINDOW``
+    * Default: ``0.0``
+    """
+
+    event_queue_path: str = Field(
+        default_factory=lambda: config(
+            "NOPF_EVENT_QUEUE_PATH",
+            default="",
+        ),
+    )
+    """
+    Path of the SQLite database in which the webhook events are persisted
+    until they are processed. Events received but not processed yet when the
+    operator stops are processed again after a restart (at-least-once
+    delivery).
+
+    If empty, events are only kept in memory.
+
+    **Examples:**
+
+    * ``/var/lib/nopf/events.db``
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NOPF_EVENT_QUEUE_PATH``
+    * Default: ``""``
+    """
+
+    event_queue_commit_interval: float = Field(
+        default_factory=lambda: config(
+            "NOPF_EVENT_QUEUE_COMMIT_INTERVAL",
+            cast=float,
+            default=0.005,
+        ),
+    )
+    """
+    Time during which the events received are grouped into a single
+    transaction of the event queue (one ``fsync`` for all of them), in
+    seconds.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NOPF_EVENT_QUEUE_COMMIT_INTERVAL``
+    * Default: ``0.005``
+    """
+
+    event_queue_max_batch: int = Field(
+        default_factory=lambda: config(
+            "NOPF_EVENT_QUEUE_MAX_BATCH",
+            cast=int,
+            default=256,
+        ),
+    )
+    """
+    Number of events after which the pending transaction of the event queue
+    is committed, without waiting for ``event_queue_commit_interval``.
+
+    **Resolution order:**
+
+    * Constructor parameter
+    * Environment variable ``NOPF_EVENT_QUEUE_MAX_BATCH``
+    * Default: ``256``
     """
 
     log_level: str = Field(
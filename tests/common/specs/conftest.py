@@ -1,6 +1,176 @@
+from typing import Any
+
 import pytest
 
+from pathlib import Path
+import json
+
+from nopf.settings import Settings
+
 
 @pytest.fixture(scope="session")
 def anyio_backend():
     return "asyncio"
+
+
+@pytest.fixture(scope="session")
+def openapi_schema() -> dict[str, Any]:
+    def ref(name: str) -> dict[str, Any]:
+        return {"$ref": f"#/components/schemas/{name}"}
+
+    def json_content(schema: dict[str, Any]) -> dict[str, Any]:
+        return {"content": {"application/json": {"schema": schema}}}
+
+    def query_param(name: str, schema: dict[str, Any]) -> dict[str, Any]:
+        return {"in": "query", "name": name, "schema": schema}
+
+    id_param = {
+        "in": "path",
+        "name": "id",
+        "schema": {"type": "integer"},
+        "required": True,
+    }
+
+    return {
+        "openapi": "3.0.3",
+        "info": {
+            "title": "NetBox REST API",
+            "version": "4.2.6 (4.2)",
+            "license": {"name": "Apache v2 License"},
+        },
+        "paths": {
+            "/api/status/": {
+                "get": {
+                    "operationId": "status_retrieve",
+                    "responses": {
+                        "200": {
+                            "description": "",
+                            **json_content({"type": "object"}),
+                        },
+                    },
+                },
+            },
+            "/api/dcim/sites/": {
+                "get": {
+                    "operationId": "dcim_sites_list",
+                    "description": "Get a list of site objects.",
+                    "parameters": [
+                        query_param(
+                            "id",
+                            {"type": "array", "items": {"type": "integer"}},
+                        ),
+                        query_param(
+                            "name",
+                            {"type": "array", "items": {"type": "string"}},
+                        ),
+                        query_param("q", {"type": "string"}),
+                        query_param("limit", {"type": "integer"}),
+                        query_param("offset", {"type": "integer"}),
+                    ],
+                    "responses": {
+                        "200": {
+                            "description": "",
+                            **json_content(ref("PaginatedSiteList")),
+                        },
+                    },
+                },
+                "post": {
+                    "operationId": "dcim_sites_create",
+                    "requestBody": {
+                        "required": True,
+                        **json_content(ref("SiteRequest")),
+                    },
+                    "responses": {
+                        "201": {"description": "", **json_content(ref("Site"))},
+                    },
+                },
+                "patch": {
+                    "operationId": "dcim_sites_bulk_partial_update",
+                    "requestBody": {
+                        "required": True,
+                        **json_content(
+                            {"type": "array", "items": ref("SiteRequest")},
+                        ),
+                    },
+                    "responses": {
+                        "200": {
+                            "description": "",
+                            **json_content({"type": "array", "items": ref("Site")}),
+                        },
+                    },
+                },
+            },
+            "/api/dcim/sites/{id}/": {
+                "get": {
+                    "operationId": "dcim_sites_retrieve",
+                    "description": "Get a site object.",
+                    "parameters": [id_param],
+                    "responses": {
+                        "200": {"description": "", **json_content(ref("Site"))},
+                    },
+                },
+                "patch": {
+                    "operationId": "dcim_sites_partial_update",
+                    "parameters": [id_param],
+                    "requestBody": json_content(ref("SiteRequest")),
+                    "responses": {
+                        "200": {"description": "", **json_content(ref("Site"))},
+                    },
+                },
+                "delete": {
+                    "operationId": "dcim_sites_destroy",
+                    "parameters": [id_param],
+                    "responses": {"204": {"description": ""}},
+                },
+            },
+        },
+        "components": {
+            "schemas": {
+                "Site": {
+                    "type": "object",
+                    "properties": {
+                        "id": {"type": "integer"},
+                        "name": {"type": "string"},
+                        "slug": {"type": "string"},
+                        "description": {"type": "string", "nullable": True},
+                    },
+                    "required": ["id", "name", "slug"],
+                },
+                "SiteRequest": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string"},
+                        "slug": {"type": "string"},
+                    },
+                },
+                "PaginatedSiteList": {
+                    "type": "object",
+                    "properties": {
+                        "count": {"type": "integer"},
+                        "next": {"type": "string", "nullable": True},
+                        "previous": {"type": "string", "nullable": True},
+                        "results": {"type": "array", "items": ref("Site")},
+                    },
+                    "required": ["count", "results"],
+                },
+            },
+        },
+    }
+
+
+@pytest.fixture(scope="function")
+def settings(tmp_path: Path, openapi_schema: dict[str, Any]) -> Settings:
+    schema_path = tmp_path / "openapi.json"
+
+    with open(schema_path, "w") as file:
+        json.dump(openapi_schema, file)
+
+    return Settings(
+        secret_key="s3cr3!",
+        netbox_api="http://netbox.local",
+        netbox_token="t0k3n",
+        netbox_schema=str(schema_path),
+        server_bind_host="127.0.0.1",
+        server_bind_port=0,
+        server_callback_name="test",
+    )
@@ -13,15 +13,18 @@ from httpx import AsyncClient
 
 from nopf.core.channel import (
     create_channel,
+    ChannelLimits,
     ChannelReceiver,
     EventCreate,
     EventUpdate,
     EventDelete,
 )
 
+from nopf.core.handlers import Handlers
 from nopf.settings import Settings
 from nopf.schema import WebhookPayload
 from nopf.api import server_task
+from nopf.operator.controller import task as controller_task
 
 
 pytestmark = pytest.mark.anyio
@@ -39,9 +42,9 @@ def sign_request(content: str) -> str:
     return hashobj.hexdigest()
 
 
-@pytest.fixture(scope="function")
-async def http_server():
-    settings = Settings(
+@pytest.fixture
+def server_settings() -> Settings:
+    return Settings(
         secret_key="s3cr3!",
         netbox_api="http://netbox.local/",
         netbox_token="t0k3n",
@@ -50,8 +53,18 @@ async def http_server():
         server_callback_name="test",
     )
 
+
+@pytest.fixture
+def channel_limits() -> ChannelLimits:
+    return ChannelLimits()
+
+
+@pytest.fixture(scope="function")
+async def http_server(server_settings: Settings, channel_limits: ChannelLimits):
+    settings = server_settings
+
     shutdown = anyio.Event()
-    sender, receiver = create_channel()
+    sender, receiver = create_channel(limits=channel_limits)
 
     async with anyio.create_task_group() as tg:
         binds = await tg.start(server_task, settings, sender, shutdown.wait)
@@ -247,3 +260,207 @@ async def test_deleted_event(
 
     payload.model = "test.foo"
     on_event.assert_called_once_with(EventDelete(payload=payload))
+
+
+async def test_unknown_event(
+    http_server: HttpServer,
+    http_client: AsyncClient,
+):
+    payload = WebhookPayload(
+        event="job_started",
+        timestamp="2021-01-01T00:00:00Z",
+        model="foo",
+        username="unit",
+        request_id="123",
+        data={},
+        snapshots={
+            "prechange": None,
+            "postchange": None,
+        },
+    )
+    content = payload.model_dump_json()
+    signature = sign_request(content.encode())
+
+    resp = await http_client.post(
+        "/callback/test.foo",
+        content=content,
+        headers={"X-Hook-Signature": signature},
+    )
+
+    assert resp.status_code == 200
+
+
+async def test_async_ack(
+    server_settings: Settings,
+    http_server: HttpServer,
+    http_client: AsyncClient,
+):
+    server_settings.server_async_ack = True
+    on_event = MagicMock()
+    processed = anyio.Event()
+
+    async def consumer(rx: ChannelReceiver):
+        async for resp_tx, event in rx.stream:
+            # Nobody waits for a response.
+            assert resp_tx is None
+
+            await processed.wait()
+            on_event(event)
+
+    http_server.taskgroup.start_soon(consumer, http_server.mbox)
+
+    payload = WebhookPayload(
+        event="updated",
+        timestamp="2021-01-01T00:00:00Z",
+        model="foo",
+        username="unit",
+        request_id="123",
+        data={},
+        snapshots={
+            "prechange": None,
+            "postchange": None,
+        },
+    )
+    content = payload.model_dump_json()
+    signature = sign_request(content.encode())
+
+    resp = await http_client.post(
+        "/callback/test.foo",
+        content=content,
+        headers={"X-Hook-Signature": signature},
+    )
+
+    # The response is sent before the event is processed.
+    assert resp.status_code == 202
+    on_event.assert_not_called()
+
+    processed.set()
+    await anyio.wait_all_tasks_blocked()
+
+    payload.model = "test.foo"
+    on_event.assert_called_once_with(EventUpdate(payload=payload))
+
+
+async def test_async_ack_busy_controller(server_settings: Settings):
+    server_settings.server_async_ack = True
+    handlers = Handlers()
+    started = anyio.Event()
+    release = anyio.Event()
+    processed = []
+
+    async def on_update(payload: WebhookPayload) -> None:
+        started.set()
+        await release.wait()
+        processed.append(payload.request_id)
+
+    handlers.add_update_handler("test.foo", on_update)
+    content, headers = updated_event_request()
+    shutdown = anyio.Event()
+
+    async with anyio.create_task_group() as tg:
+        sender = await tg.start(controller_task, handlers)
+        binds = await tg.start(server_task, server_settings, sender, shutdown.wait)
+
+        async with AsyncClient(base_url=binds[0]) as client:
+            resp = await client.post(
+                "/callback/test.foo", content=content, headers=headers
+            )
+            assert resp.status_code == 202
+
+            # The next webhooks are acknowledged while the single worker is
+            # still busy with the first one.
+            await started.wait()
+
+            with anyio.fail_after(1):
+                for _ in range(2):
+                    resp = await client.post(
+                        "/callback/test.foo", content=content, headers=headers
+                    )
+                    assert resp.status_code == 202
+
+            assert processed == []
+            release.set()
+
+        shutdown.set()
+        await sender.aclose()
+
+    assert processed == ["123"] * 3
+
+
+def updated_event_request() -> tuple[str, dict[str, str]]:
+    payload = WebhookPayload(
+        event="updated",
+        timestamp="2021-01-01T00:00:00Z",
+        model="foo",
+        username="unit",
+        request_id="123",
+        data={},
+        snapshots={
+            "prechange": None,
+            "postchange": None,
+        },
+    )
+    content = payload.model_dump_json()
+    signature = sign_request(content.encode())
+    return content, {"X-Hook-Signature": signature}
+
+
+@pytest.mark.parametrize("channel_limits", [ChannelLimits(max_events=1)])
+async def test_channel_full(
+    server_settings: Settings,
+    http_server: HttpServer,
+    http_client: AsyncClient,
+):
+    server_settings.server_async_ack = True
+    server_settings.server_retry_after = 10
+    content, headers = updated_event_request()
+
+    resp = await http_client.post(
+        "/callback/test.foo", content=content, headers=headers
+    )
+    assert resp.status_code == 202
+
+    # The first event is not processed yet.
+    resp = await http_client.post(
+        "/callback/test.foo", content=content, headers=headers
+    )
+    assert resp.status_code == 429
+    assert resp.headers["Retry-After"] == "10"
+
+    resp = await http_client.get("/stats/channel")
+    resp.raise_for_status()
+    assert resp.json() == {"depth": 1, "bytes": len(content), "shed": 1}
+
+    # Once processed, there is room for the next event.
+    async for _, event in http_server.mbox.stream:
+        http_server.mbox.ack(event)
+        break
+
+    resp = await http_client.post(
+        "/callback/test.foo", content=content, headers=headers
+    )
+    assert resp.status_code == 202
+
+
+async def test_handler_error(
+    http_server: HttpServer,
+    http_client: AsyncClient,
+):
+    async def consumer(rx: ChannelReceiver):
+        async for resp_tx, event in rx.stream:
+            rx.ack(event)
+            await resp_tx.send(ValueError("error"))
+
+    http_server.taskgroup.start_soon(consumer, http_server.mbox)
+    content, headers = updated_event_request()
+
+    resp = await http_client.post(
+        "/callback/test.foo", content=content, headers=headers
+    )
+    assert resp.status_code == 500
+
+    # The room of the event is released once processed, even if its handlers
+    # failed.
+    resp = await http_client.get("/stats/channel")
+    resp.raise_for_status()
+    assert resp.json()["depth"] == 0
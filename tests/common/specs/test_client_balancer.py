@@ -0,0 +1,243 @@
+import pytest
+
+import anyio
+
+from httpx import ConnectError, HTTPStatusError, MockTransport, Request, Response
+
+from nopf.client import NetboxClient
+from nopf.client.balancer import EndpointBalancer
+from nopf.settings import Settings
+
+
+pytestmark = pytest.mark.anyio
+
+
+SITE = {"id": 1, "name": "site", "slug": "site"}
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+async def test_read_write_split(settings: Settings):
+    settings.netbox_api_endpoints = ["http://netbox-1", "http://netbox-2/"]
+    settings.netbox_api_read_endpoints = ["http://replica"]
+    hosts = []
+
+    async def handler(request: Request) -> Response:
+        hosts.append((request.method, request.url.host, request.url.path))
+        return Response(200, json=SITE)
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+
+    await client.operations.dcim_sites_retrieve(params={"id": 1})
+    await client.operations.dcim_sites_partial_update(params={"id": 1}, body={})
+    await client.operations.dcim_sites_partial_update(params={"id": 1}, body={})
+
+    assert hosts[0] == ("GET", "replica", "/api/dcim/sites/1/")
+    assert sorted(hosts[1:]) == [
+        ("PATCH", "netbox-1", "/api/dcim/sites/1/"),
+        ("PATCH", "netbox-2", "/api/dcim/sites/1/"),
+    ]
+
+    stats = client.endpoint_stats
+    assert [endpoint.url for endpoint in stats] == [
+        "http://netbox-1",
+        "http://netbox-2",
+        "http://replica",
+    ]
+    assert [endpoint.requests for endpoint in stats] == [1, 1, 1]
+    assert stats[2].read_only
+
+
+async def test_read_endpoints_only(settings: Settings):
+    settings.netbox_api_read_endpoints = ["http://replica"]
+    hosts = []
+
+    async def handler(request: Request) -> Response:
+        hosts.append(request.url.host)
+        return Response(200, json=SITE)
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+
+    await client.operations.dcim_sites_retrieve(params={"id": 1})
+    await client.operations.dcim_sites_partial_update(params={"id": 1}, body={})
+
+    assert hosts == ["replica", "netbox.local"]
+
+
+async def test_balancing_disabled(settings: Settings):
+    client = NetboxClient(settings)
+    assert client.endpoint_stats == []
+
+
+async def test_least_outstanding(settings: Settings):
+    settings.netbox_api_endpoints = ["http://netbox-1", "http://netbox-2"]
+    hosts = []
+
+    async def handler(request: Request) -> Response:
+        hosts.append(request.url.host)
+
+        # The first replica is slow.
+        if request.url.host == "netbox-1":
+            await anyio.sleep(0.1)
+
+        return Response(200, json=SITE)
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+
+    async with anyio.create_task_group() as tg:
+        for _ in range(4):
+            tg.start_soon(
+                lambda: client.operations.dcim_sites_retrieve(params={"id": 1}),
+            )
+            await anyio.sleep(0.01)
+
+    assert hosts.count("netbox-1") == 1
+    assert hosts.count("netbox-2") == 3
+    assert all(endpoint.outstanding == 0 for endpoint in client.endpoint_stats)
+
+
+async def test_prewarm_endpoints(settings: Settings):
+    settings.netbox_api_endpoints = ["http://netbox-1", "http://netbox-2"]
+    hosts = []
+
+    async def handler(request: Request) -> Response:
+        hosts.append(request.url.host)
+        return Response(200, json={})
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+    await client.prewarm(2)
+
+    assert sorted(hosts) == ["netbox-1", "netbox-1", "netbox-2", "netbox-2"]
+
+
+async def test_stream_routing(settings: Settings):
+    settings.netbox_api_read_endpoints = ["http://replica"]
+    hosts = []
+
+    async def handler(request: Request) -> Response:
+        hosts.append(request.url.host)
+        return Response(200, json={"count": 1, "results": [SITE]})
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+    results = []
+
+    async for item in client.operations.dcim_sites_list.stream():
+        # The request is no longer outstanding once the headers are received.
+        assert [stats.outstanding for stats in client.endpoint_stats] == [0, 0]
+        results.append(item)
+
+    assert results == [SITE]
+    assert hosts == ["replica"]
+
+
+async def test_graphql_routing(settings: Settings):
+    settings.netbox_api_read_endpoints = ["http://replica"]
+    urls = []
+
+    async def handler(request: Request) -> Response:
+        urls.append(str(request.url))
+
+        if request.url.host == "replica":
+            return Response(503)
+
+        return Response(200, json={"data": {"site": SITE}})
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+
+    with pytest.raises(HTTPStatusError):
+        await client.graphql("{ site(id: 1) { name } }")
+
+    assert urls == ["http://replica/graphql/"]
+    assert [stats.failures for stats in client.endpoint_stats] == [0, 1]
+
+
+async def test_ejection():
+    clock = Clock()
+    balancer = EndpointBalancer(
+        primary=["http://netbox-1", "http://netbox-2"],
+        read_only=[],
+        failure_threshold=2,
+        ejection_time=30.0,
+        clock=clock,
+    )
+
+    async def send(status_code: int) -> str:
+        async with balancer.route(read=False) as route:
+            # Only the first endpoint fails.
+            if route.endpoint.url == "http://netbox-1":
+                route.record(Response(status_code))
+
+            else:
+                route.record(Response(200))
+
+            return route.endpoint.url
+
+    # A success resets the consecutive failures.
+    for status_code in [500, 200, 500]:
+        while await send(status_code) != "http://netbox-1":
+            pass
+
+    assert not balancer.stats[0].ejected
+
+    while await send(503) != "http://netbox-1":
+        pass
+
+    stats = balancer.stats
+    assert stats[0].ejected
+    assert stats[0].failures == 3
+
+    for _ in range(4):
+        assert await send(200) == "http://netbox-2"
+
+    # The endpoint receives requests again once the ejection time elapsed.
+    clock.now = 30.0
+    assert not balancer.stats[0].ejected
+    assert {await send(200) for _ in range(4)} == {
+        "http://netbox-1",
+        "http://netbox-2",
+    }
+
+
+async def test_transport_errors():
+    balancer = EndpointBalancer(
+        primary=["http://netbox"],
+        read_only=["http://replica"],
+        failure_threshold=1,
+        ejection_time=30.0,
+    )
+
+    with pytest.raises(ConnectError):
+        async with balancer.route(read=True) as route:
+            assert route.url("/api/status/") == "http://replica/api/status/"
+            raise ConnectError("connection refused")
+
+    # All read-only endpoints are ejected, reads fall back to the primary.
+    async with balancer.route(read=True) as route:
+        assert route.endpoint.url == "http://netbox"
+
+        with pytest.raises(ConnectError):
+            async with balancer.route(read=False):
+                raise ConnectError("connection refused")
+
+    # All endpoints are ejected: requests are still sent.
+    async with balancer.route(read=False) as route:
+        assert route.endpoint.url == "http://netbox"
+
+    # Requests without a recorded response are not taken into account.
+    assert balancer.stats[0].failures == 1
+
+
+def test_primary_required():
+    with pytest.raises(ValueError):
+        EndpointBalancer(
+            primary=[],
+            read_only=["http://replica"],
+            failure_threshold=3,
+            ejection_time=30.0,
+        )
@@ -0,0 +1,216 @@
+from typing import Any
+
+import pytest
+
+from pathlib import Path
+from copy import deepcopy
+import json
+
+import anyio
+
+from httpx import MockTransport, Request, Response
+
+from nopf.client import NetboxClient
+from nopf.client.operation import Projection, ValidationPolicy
+from nopf.settings import Settings
+
+
+pytestmark = pytest.mark.anyio
+
+
+def site(obj_id: int) -> dict[str, Any]:
+    return {"id": obj_id, "name": f"site-{obj_id}", "slug": f"site-{obj_id}"}
+
+
+@pytest.fixture
+def requests() -> list[Request]:
+    return []
+
+
+@pytest.fixture
+def client(settings: Settings, requests: list[Request]) -> NetboxClient:
+    settings.netbox_batch_retrieves = True
+    settings.netbox_batch_max_size = 3
+
+    def handler(request: Request) -> Response:
+        requests.append(request)
+
+        object_ids = [
+            int(obj_id)
+            for obj_id in request.url.params.get_list("id")
+            if int(obj_id) < 100
+        ]
+        return Response(
+            200,
+            json={"count": len(object_ids), "results": [site(i) for i in object_ids]},
+        )
+
+    return NetboxClient(settings, transport=MockTransport(handler))
+
+
+async def test_batch_retrieves(client: NetboxClient, requests: list[Request]):
+    results: dict[int, Any] = {}
+
+    async def retrieve(obj_id: int) -> None:
+        results[obj_id] = await client.operations.dcim_sites_retrieve(
+            params={"id": obj_id},
+        )
+
+    async with anyio.create_task_group() as tg:
+        for obj_id in [1, 2, 2, 3, 4, 100]:
+            tg.start_soon(retrieve, obj_id)
+
+    # At most 3 objects per batch.
+    assert [request.url.params.get_list("id") for request in requests] == [
+        ["1", "2", "3"],
+        ["4", "100"],
+    ]
+    assert requests[0].url.path == "/api/dcim/sites/"
+
+    for obj_id in [1, 2, 3, 4]:
+        assert results[obj_id].status_code == 200
+        assert results[obj_id].json() == site(obj_id)
+
+    assert results[100].status_code == 404
+    assert str(results[100].request.url) == "http://netbox.local/api/dcim/sites/100/"
+
+    assert client.batching_stats.loads == 6
+    assert client.batching_stats.batches == 2
+
+
+async def test_batch_window(settings: Settings, client: NetboxClient, requests):
+    client._batcher.window = 0.01
+
+    async def retrieve(obj_id: int, delay: float) -> None:
+        await anyio.sleep(delay)
+        await client.operations.dcim_sites_retrieve(params={"id": obj_id})
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(retrieve, 1, 0)
+        tg.start_soon(retrieve, 2, 0.005)
+
+    assert len(requests) == 1
+
+
+async def test_batch_policy_and_projection(
+    client: NetboxClient,
+    requests: list[Request],
+):
+    retrieve = client.operations.dcim_sites_retrieve
+    retrieve.validation = ValidationPolicy(mode="off")
+    retrieve.projection = Projection(brief=True)
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(lambda: retrieve(params={"id": 1}))
+        tg.start_soon(lambda: retrieve(params={"id": 2}))
+        tg.start_soon(
+            lambda: retrieve(
+                params={"id": 3},
+                validation="strict",
+                projection=Projection(fields=["id", "name"]),
+            ),
+        )
+
+    # Calls with a different policy or projection are batched separately.
+    assert sorted(
+        (request.url.params.get_list("id"), request.url.params.get("brief"))
+        for request in requests
+    ) == [(["1", "2"], "true"), (["3"], None)]
+    assert requests[-1].url.params.get("fields") == "id,name"
+
+    # The list responses were validated with the policy of the retrieve calls.
+    list_stats = client.operations.dcim_sites_list.validation_stats
+    assert list_stats.validated == 1
+    assert list_stats.skipped == 1
+
+
+async def test_not_batched(client: NetboxClient, requests: list[Request]):
+    # Only calls with the `id` parameter alone are batched.
+    await client.operations.dcim_sites_partial_update(
+        params={"id": 1},
+        body={},
+        validation="off",
+    )
+    assert requests[-1].url.path == "/api/dcim/sites/1/"
+
+    assert client.operations.status_retrieve._batch is None
+    assert client.batching_stats.loads == 0
+
+
+async def test_batch_errors(settings: Settings):
+    settings.netbox_batch_retrieves = True
+    status_code = 503
+
+    def handler(request: Request) -> Response:
+        if status_code == 0:
+            raise RuntimeError("connection reset")
+
+        return Response(status_code, json={"detail": "Unavailable"})
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+
+    result = await client.operations.dcim_sites_retrieve(params={"id": 1})
+    assert result.status_code == 503
+
+    status_code = 0
+
+    with pytest.raises(RuntimeError):
+        await client.operations.dcim_sites_retrieve(params={"id": 1})
+
+
+async def test_batch_cancelled(client: NetboxClient, requests: list[Request]):
+    client._batcher.window = 1
+    results = []
+
+    async def follow() -> None:
+        await anyio.sleep(0.005)
+        client._batcher.window = 0
+        results.append(
+            await client.operations.dcim_sites_retrieve(params={"id": 2}),
+        )
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(follow)
+
+        with anyio.move_on_after(0.01):
+            await client.operations.dcim_sites_retrieve(params={"id": 1})
+
+    # The follower sends its own batch once the first one is cancelled.
+    assert [request.url.params.get_list("id") for request in requests] == [["2"]]
+    assert results[0].json() == site(2)
+
+
+def test_batchable_operations(
+    settings: Settings,
+    tmp_path: Path,
+    openapi_schema: dict[str, Any],
+):
+    settings.netbox_batch_retrieves = True
+
+    client = NetboxClient(settings)
+    assert client._list_operation("/api/dcim/sites/{id}/", "patch", "x") is None
+    assert client._list_operation("/api/dcim/sites/{id}/", "get", "x") is None
+    assert (
+        client._list_operation(
+            "/api/dcim/regions/{id}/", "get", "dcim_regions_retrieve"
+        )
+        is None
+    )
+
+    # The list operation must be able to filter by ID.
+    schema = deepcopy(openapi_schema)
+    list_spec = schema["paths"]["/api/dcim/sites/"]["get"]
+    list_spec["parameters"] = list_spec["parameters"][1:]
+    settings.netbox_schema = str(tmp_path / "openapi-noid.json")
+
+    with open(settings.netbox_schema, "w") as file:
+        json.dump(schema, file)
+
+    client = NetboxClient(settings)
+    assert client.operations.dcim_sites_retrieve._batch is None
+
+
+def test_batching_disabled(settings: Settings):
+    client = NetboxClient(settings)
+    assert client.operations.dcim_sites_retrieve._batch is None
+    assert client.batching_stats.batches == 0
@@ -0,0 +1,324 @@
+from typing import Any
+
+import pytest
+
+import anyio
+
+from httpx import MockTransport, Request, Response
+
+from nopf.client import NetboxClient
+from nopf.client.cache import (
+    ResponseCache,
+    collection_of,
+    model_collections,
+    request_key,
+    written_collection,
+)
+from nopf.schema import WebhookPayload
+from nopf.settings import Settings
+
+
+pytestmark = pytest.mark.anyio
+
+
+def webhook(data: dict[str, Any], model: str = "dcim.site") -> WebhookPayload:
+    return WebhookPayload(
+        event="updated",
+        timestamp="2025-01-01T00:00:00Z",
+        model=model,
+        username="admin",
+        request_id="00000000-0000-0000-0000-000000000000",
+        data=data,
+        snapshots={"prechange": None, "postchange": data},
+    )
+
+
+def test_request_key():
+    assert request_key("dcim_sites_list", {"id": [2, 1], "q": "a"}) == request_key(
+        "dcim_sites_list",
+        {"q": "a", "id": [1, 2]},
+    )
+    assert request_key("dcim_sites_list", {}) != request_key(
+        "dcim_sites_list", {"q": ""}
+    )
+
+
+def test_collection_of():
+    assert collection_of("dcim_sites_list", "get", "/api/dcim/sites/") == (
+        "/api/dcim/sites/"
+    )
+    assert collection_of("dcim_sites_retrieve", "get", "/api/dcim/sites/{id}/") == (
+        "/api/dcim/sites/"
+    )
+    assert collection_of("dcim_sites_create", "post", "/api/dcim/sites/") is None
+    assert collection_of("status_retrieve", "get", "/api/status/") is None
+    assert (
+        collection_of("dcim_sites_bulk_partial_update", "get", "/api/dcim/sites/")
+        is None
+    )
+    assert (
+        collection_of(
+            "ipam_prefixes_available_ips_list",
+            "get",
+            "/api/ipam/prefixes/{id}/available-ips/",
+        )
+        is None
+    )
+
+
+def test_written_collection():
+    assert written_collection("patch", "/api/dcim/sites/{id}/") == "/api/dcim/sites/"
+    assert written_collection("post", "/api/dcim/sites/") == "/api/dcim/sites/"
+    assert written_collection("get", "/api/dcim/sites/") is None
+    assert written_collection("post", "/api/ipam/prefixes/{id}/available-ips/") is None
+
+
+def test_model_collections(openapi_schema: dict[str, Any]):
+    assert model_collections(openapi_schema) == {"dcim.site": "/api/dcim/sites/"}
+
+    def response(schema: dict[str, Any]) -> dict[str, Any]:
+        return {"200": {"content": {"application/json": {"schema": schema}}}}
+
+    schema = {
+        "paths": {
+            "/api/plugins/foo/bars/": {
+                "get": {
+                    "operationId": "plugins_foo_bars_list",
+                    "responses": response(
+                        {"$ref": "#/components/schemas/PaginatedBarList"},
+                    ),
+                },
+            },
+            "/api/plugins/foo/bazs/{id}/": {
+                "get": {
+                    "operationId": "plugins_foo_bazs_retrieve",
+                    "responses": response({"type": "object"}),
+                },
+                "delete": {"operationId": "plugins_foo_bazs_destroy"},
+            },
+            "/api/plugins/foo/bazs/": {
+                "delete": {"operationId": "plugins_foo_bazs_bulk_destroy"},
+            },
+        },
+    }
+    assert model_collections(schema) == {"foo.bar": "/api/plugins/foo/bars/"}
+
+
+def test_response_cache():
+    now = 0.0
+    cache = ResponseCache(max_size=2, ttl=10, clock=lambda: now)
+
+    cache.put(("a", ""), "/api/dcim/sites/", 1, "site-1")
+    cache.put(("b", ""), "/api/dcim/sites/", 2, "site-2")
+    assert cache.get(("a", "")) == "site-1"
+
+    # "b" is the least recently used.
+    cache.put(("c", ""), "/api/dcim/sites/", None, "sites")
+    assert cache.get(("b", "")) is None
+    assert len(cache) == 2
+
+    now = 10.0
+    assert cache.get(("a", "")) is None
+    assert len(cache) == 1
+
+    assert cache.stats.model_dump() == {
+        "hits": 1,
+        "misses": 2,
+        "evictions": 2,
+        "invalidations": 0,
+        "stale": 0,
+    }
+
+
+def test_response_cache_invalidate():
+    cache = ResponseCache(max_size=10, ttl=0)
+
+    cache.put(("site-1", ""), "/api/dcim/sites/", 1, "site-1")
+    cache.put(("site-2", ""), "/api/dcim/sites/", 2, "site-2")
+    cache.put(("sites", ""), "/api/dcim/sites/", None, "sites")
+    cache.put(("region-1", ""), "/api/dcim/regions/", 1, "region-1")
+
+    cache.invalidate_url("http://netbox.local/api/dcim/sites/1/")
+    assert cache.get(("site-1", "")) is None
+    assert cache.get(("sites", "")) is None
+    assert cache.get(("site-2", "")) == "site-2"
+    assert cache.get(("region-1", "")) == "region-1"
+
+    cache.invalidate_url("http://netbox.local/unknown")
+    assert len(cache) == 0
+    assert cache.stats.invalidations == 4
+
+
+def test_response_cache_generation():
+    cache = ResponseCache(max_size=10, ttl=0)
+
+    generation = cache.generation("/api/dcim/sites/")
+    cache.invalidate("/api/dcim/sites/", 1)
+
+    # The result was read before the invalidation.
+    cache.put(("site-1", ""), "/api/dcim/sites/", 1, "site-1", generation)
+    assert cache.get(("site-1", "")) is None
+    assert cache.stats.stale == 1
+
+    # Other collections are not affected.
+    generation = cache.generation("/api/dcim/regions/")
+    cache.invalidate("/api/dcim/sites/", 1)
+    cache.put(("region-1", ""), "/api/dcim/regions/", 1, "region-1", generation)
+    assert cache.get(("region-1", "")) == "region-1"
+
+    generation = cache.generation("/api/dcim/regions/")
+    cache.clear()
+    cache.put(("region-1", ""), "/api/dcim/regions/", 1, "region-1", generation)
+    assert cache.get(("region-1", "")) is None
+    assert cache.stats.stale == 2
+
+
+def test_response_cache_invalidate_collection():
+    cache = ResponseCache(max_size=10, ttl=0)
+
+    cache.put(("site-1", ""), "/api/dcim/sites/", 1, "site-1")
+    cache.put(("sites", ""), "/api/dcim/sites/", None, "sites")
+    cache.put(("region-1", ""), "/api/dcim/regions/", 1, "region-1")
+    cache.put(("region-2", ""), "/api/dcim/regions/", 2, "region-2")
+
+    cache.invalidate_collection("/api/dcim/sites/")
+    assert len(cache) == 2
+
+    # Without its collection, the object is found by its ID only.
+    cache.invalidate_id(1)
+    assert cache.get(("region-1", "")) is None
+    assert cache.get(("region-2", "")) == "region-2"
+    assert cache.stats.invalidations == 3
+
+
+async def test_client_cache_race(settings: Settings):
+    settings.netbox_cache_size = 10
+    responded = anyio.Event()
+    release = anyio.Event()
+
+    async def handler(request: Request) -> Response:
+        responded.set()
+        await release.wait()
+        return Response(200, json={"id": 1, "name": "old", "slug": "site"})
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+    assert client.cache is not None
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(lambda: client.operations.dcim_sites_retrieve(params={"id": 1}))
+        await responded.wait()
+
+        # The object changes while it is read.
+        client.invalidate(webhook({"id": 1}))
+        release.set()
+
+    assert len(client.cache) == 0
+    assert client.cache.stats.stale == 1
+
+
+async def test_client_cache_own_writes(settings: Settings):
+    settings.netbox_cache_size = 10
+    name = "old"
+
+    def handler(request: Request) -> Response:
+        nonlocal name
+
+        match request.method, request.url.path:
+            case "GET", "/api/dcim/sites/1/":
+                return Response(200, json={"id": 1, "name": name, "slug": "site"})
+
+            case "GET", "/api/dcim/sites/":
+                return Response(
+                    200,
+                    json={
+                        "count": 1,
+                        "results": [{"id": 1, "name": name, "slug": "site"}],
+                    },
+                )
+
+            case "PATCH", _:
+                name = "new"
+                return Response(200, json={"id": 1, "name": name, "slug": "site"})
+
+            case _:
+                return Response(201, json={"id": 2, "name": "other", "slug": "other"})
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+    sites = client.operations
+
+    await sites.dcim_sites_retrieve(params={"id": 1})
+    await sites.dcim_sites_list()
+
+    await sites.dcim_sites_partial_update(params={"id": 1}, body={"name": "new"})
+    result = await sites.dcim_sites_retrieve(params={"id": 1})
+    assert result.data["name"] == "new"
+
+    result = await sites.dcim_sites_list()
+    assert result.data["results"][0]["name"] == "new"
+
+    # Creates evict the whole collection.
+    await sites.dcim_sites_retrieve(params={"id": 1})
+    await sites.dcim_sites_create(body={"name": "other", "slug": "other"})
+    assert client.cache is not None
+    assert len(client.cache) == 0
+
+
+def test_client_cache_unknown_model(settings: Settings):
+    settings.netbox_cache_size = 10
+    client = NetboxClient(settings)
+    assert client.cache is not None
+
+    client.cache.put(("site-1", ""), "/api/dcim/sites/", 1, "site-1")
+    client.cache.put(("site-2", ""), "/api/dcim/sites/", 2, "site-2")
+
+    client.invalidate(webhook({"id": 1}, model="dcim.unknown"))
+    assert client.cache.get(("site-1", "")) is None
+    assert client.cache.get(("site-2", "")) == "site-2"
+
+
+async def test_client_cache(settings: Settings):
+    requests: list[str] = []
+
+    def handler(request: Request) -> Response:
+        requests.append(f"{request.method} {request.url.path}")
+
+        match request.method:
+            case "GET":
+                return Response(200, json={"id": 1, "name": "site", "slug": "site"})
+
+            case _:
+                return Response(404, json={"detail": "Not found."})
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+    assert client.cache is None
+
+    settings.netbox_cache_size = 10
+    client = NetboxClient(settings, transport=MockTransport(handler))
+    assert client.cache is not None
+
+    first = await client.operations.dcim_sites_retrieve(params={"id": 1})
+    second = await client.operations.dcim_sites_retrieve(params={"id": 1})
+    assert second is first
+    assert len(requests) == 1
+
+    # Writes and error responses are not cached.
+    await client.operations.dcim_sites_partial_update(params={"id": 1}, body={})
+    await client.operations.dcim_sites_partial_update(params={"id": 1}, body={})
+    assert len(requests) == 3
+
+    client.invalidate(
+        webhook({"id": 1, "url": "http://netbox.local/api/dcim/sites/1/"})
+    )
+    await client.operations.dcim_sites_retrieve(params={"id": 1})
+    assert len(requests) == 4
+
+    client.invalidate(webhook({"id": 1}))
+    assert len(client.cache) == 0
+
+    assert client.cache.stats.hits == 1
+    assert client.cache.stats.misses == 2
+
+
+def test_client_cache_disabled(settings: Settings):
+    client = NetboxClient(settings)
+    client.invalidate(webhook({"id": 1}))
@@ -0,0 +1,151 @@
+import pytest
+
+import anyio
+import anyio.lowlevel
+
+from httpx import MockTransport, Request, Response
+
+from nopf.client import NetboxClient
+from nopf.client.coalescing import RequestCoalescer
+from nopf.client.operation import ValidationPolicy
+from nopf.settings import Settings
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_coalesce_reads(settings: Settings):
+    settings.netbox_coalesce_reads = True
+    requests = 0
+
+    async def handler(request: Request) -> Response:
+        nonlocal requests
+        requests += 1
+
+        await anyio.sleep(0.01)
+        return Response(200, json={"id": 1, "name": "site", "slug": "site"})
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+    results = []
+
+    async def retrieve() -> None:
+        result = await client.operations.dcim_sites_retrieve(params={"id": 1})
+        results.append(result)
+
+    async with anyio.create_task_group() as tg:
+        for _ in range(10):
+            tg.start_soon(retrieve)
+
+    assert requests == 1
+    assert all(result is results[0] for result in results)
+    assert client.coalescing_stats.executed == 1
+    assert client.coalescing_stats.coalesced == 9
+
+    # Writes are never coalesced.
+    async with anyio.create_task_group() as tg:
+        for _ in range(2):
+            tg.start_soon(
+                lambda: client.operations.dcim_sites_partial_update(
+                    params={"id": 1},
+                    body={},
+                ),
+            )
+
+    assert requests == 3
+
+
+async def test_coalescing_key(settings: Settings):
+    settings.netbox_coalesce_reads = True
+    settings.netbox_request_priorities = True
+    requests = 0
+
+    async def handler(request: Request) -> Response:
+        nonlocal requests
+        requests += 1
+
+        await anyio.sleep(0.01)
+        return Response(200, json={"id": 1, "name": "site", "slug": "site"})
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+    operation = client.operations.dcim_sites_retrieve
+
+    # Requests of different priorities or validation policies are not
+    # coalesced.
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(lambda: operation(params={"id": 1}, priority="low"))
+        tg.start_soon(lambda: operation(params={"id": 1}, priority="high"))
+        tg.start_soon(lambda: operation(params={"id": 1}, priority="high"))
+        tg.start_soon(
+            lambda: operation(
+                params={"id": 1},
+                priority="high",
+                validation=ValidationPolicy(mode="sampled", sample_interval=2),
+            ),
+        )
+        tg.start_soon(
+            lambda: operation(
+                params={"id": 1},
+                priority="high",
+                validation=ValidationPolicy(mode="sampled", sample_interval=3),
+            ),
+        )
+
+    assert requests == 4
+    assert client.coalescing_stats.coalesced == 1
+
+
+async def test_coalescing_disabled(settings: Settings):
+    client = NetboxClient(settings)
+    assert client.coalescing_stats.executed == 0
+
+
+async def test_coalesced_error():
+    coalescer = RequestCoalescer()
+    errors = []
+
+    async def fail() -> None:
+        await anyio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def run() -> None:
+        try:
+            await coalescer.run("key", fail)
+
+        except RuntimeError as err:
+            errors.append(err)
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(run)
+        tg.start_soon(run)
+
+    assert len(errors) == 2
+    assert coalescer.stats.executed == 1
+    assert coalescer.stats.coalesced == 1
+
+
+async def test_coalesced_cancellation():
+    coalescer = RequestCoalescer()
+    results = []
+
+    async def slow() -> str:
+        await anyio.sleep(1)
+        return "slow"  # pragma: no cover
+
+    async def fast() -> str:
+        return "fast"
+
+    async def follow() -> None:
+        results.append(await coalescer.run("key", fast))
+
+    async with anyio.create_task_group() as tg:
+        with anyio.move_on_after(0.01):
+            async with anyio.create_task_group() as leader_tg:
+                leader_tg.start_soon(coalescer.run, "key", slow)
+                await anyio.lowlevel.checkpoint()
+                tg.start_soon(follow)
+                await anyio.sleep(1)
+
+    # The follower sends the request itself once the leader is cancelled.
+    assert results == ["fast"]
+    assert coalescer.stats.executed == 2
+    assert coalescer.stats.coalesced == 0
@@ -0,0 +1,223 @@
+import pytest
+
+import json
+
+import anyio
+
+from httpx import HTTPStatusError, MockTransport, Request, Response
+
+from nopf.client import NetboxClient
+from nopf.client.graphql import GraphQLError, query_key
+from nopf.client.limiter import CircuitOpenError
+from nopf.schema import WebhookPayload
+from nopf.settings import Settings
+
+
+pytestmark = pytest.mark.anyio
+
+
+QUERY = "query ($id: ID!) { device(id: $id) { name site { slug } } }"
+
+DEVICE = {"device": {"name": "device-1", "site": {"slug": "site-1"}}}
+
+
+def webhook() -> WebhookPayload:
+    data = {"id": 1, "url": "http://netbox.local/api/dcim/sites/1/"}
+    return WebhookPayload(
+        event="updated",
+        timestamp="2025-01-01T00:00:00Z",
+        model="dcim.site",
+        username="admin",
+        request_id="00000000-0000-0000-0000-000000000000",
+        data=data,
+        snapshots={"prechange": None, "postchange": data},
+    )
+
+
+async def test_query(settings: Settings):
+    settings.netbox_operation_timeouts = {"graphql": 15.0}
+    requests = []
+
+    def handler(request: Request) -> Response:
+        requests.append(request)
+        return Response(200, json={"data": DEVICE})
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+
+    assert await client.graphql(QUERY, {"id": 1}) == DEVICE
+    assert client.graphql_cache is None
+
+    request = requests[0]
+    assert request.method == "POST"
+    assert request.url == "http://netbox.local/graphql/"
+    assert request.headers["Authorization"] == f"Token {settings.netbox_token}"
+    assert request.extensions["timeout"]["read"] == 15.0
+    assert json.loads(request.content) == {"query": QUERY, "variables": {"id": 1}}
+
+
+async def test_query_cache(settings: Settings):
+    settings.netbox_graphql_cache_size = 10
+    requests = 0
+
+    def handler(request: Request) -> Response:
+        nonlocal requests
+        requests += 1
+        return Response(200, json={"data": DEVICE})
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+
+    await client.graphql(QUERY, {"id": 1})
+    await client.graphql(QUERY, {"id": 1})
+    await client.graphql(QUERY, {"id": 2})
+    assert requests == 2
+
+    await client.graphql(QUERY, {"id": 1}, cache=False)
+    assert requests == 3
+
+    # Any webhook clears the cache.
+    client.invalidate(webhook())
+    await client.graphql(QUERY, {"id": 1})
+    assert requests == 4
+
+    assert client.graphql_cache is not None
+    assert client.graphql_cache.stats.hits == 1
+
+
+async def test_query_cache_writes(settings: Settings):
+    settings.netbox_graphql_cache_size = 10
+    settings.netbox_write_batch_size = 10
+    settings.netbox_write_batch_window = 0.0
+    queries = 0
+
+    def handler(request: Request) -> Response:
+        nonlocal queries
+
+        if request.url.path == "/graphql/":
+            queries += 1
+            return Response(200, json={"data": DEVICE})
+
+        if request.method == "POST":
+            return Response(201, json=[{"id": 1, "name": "site", "slug": "site"}])
+
+        return Response(200, json={"id": 1, "name": "site", "slug": "site"})
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+
+    await client.graphql(QUERY, {"id": 1})
+    await client.graphql(QUERY, {"id": 1})
+    assert queries == 1
+
+    # The client reads its own writes, including the batched ones.
+    await client.operations.dcim_sites_partial_update(params={"id": 1}, body={})
+    await client.graphql(QUERY, {"id": 1})
+    assert queries == 2
+
+    assert client.writer is not None
+    await client.writer.dcim_sites_create(body={"name": "site", "slug": "site"})
+    await client.graphql(QUERY, {"id": 1})
+    assert queries == 3
+
+
+async def test_query_cache_generation(settings: Settings):
+    settings.netbox_graphql_cache_size = 10
+    queries = 0
+
+    async def handler(request: Request) -> Response:
+        nonlocal queries
+        queries += 1
+
+        # The objects change while the query is in flight.
+        if queries == 1:
+            client.invalidate(webhook())
+
+        return Response(200, json={"data": DEVICE})
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+
+    await client.graphql(QUERY, {"id": 1})
+    await client.graphql(QUERY, {"id": 1})
+    assert queries == 2
+
+    assert client.graphql_cache is not None
+    assert client.graphql_cache.stats.stale == 1
+
+
+async def test_query_limits(settings: Settings):
+    settings.netbox_adaptive_concurrency = True
+    settings.netbox_concurrency_limit = 1
+    settings.netbox_concurrency_max_limit = 1
+    settings.netbox_circuit_failure_threshold = 2
+    in_flight = 0
+    max_in_flight = 0
+
+    async def handler(request: Request) -> Response:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+
+        await anyio.sleep(0.01)
+        in_flight -= 1
+        return Response(502, text="Bad Gateway")
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+
+    async def query() -> None:
+        with pytest.raises(HTTPStatusError):
+            await client.graphql(QUERY, {"id": 1})
+
+    # Queries share the concurrency limit and the circuit breaker of the
+    # REST operations.
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(query)
+        tg.start_soon(query)
+
+    assert max_in_flight == 1
+
+    with pytest.raises(CircuitOpenError):
+        await client.operations.dcim_sites_retrieve(params={"id": 1})
+
+
+async def test_query_errors(settings: Settings):
+    def handler(request: Request) -> Response:
+        query = json.loads(request.content)["query"]
+
+        match query:
+            case "invalid":
+                return Response(
+                    400,
+                    json={"data": None, "errors": [{"message": "Syntax Error"}]},
+                )
+
+            case "partial":
+                return Response(200, json={"data": None, "errors": ["denied"]})
+
+            case "not json":
+                return Response(200, text="<html></html>")
+
+            case "no data":
+                return Response(200, json={})
+
+            case _:
+                return Response(502, text="Bad Gateway")
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+
+    with pytest.raises(GraphQLError, match="Syntax Error") as exc_info:
+        await client.graphql("invalid")
+
+    assert exc_info.value.errors == [{"message": "Syntax Error"}]
+
+    with pytest.raises(GraphQLError, match="denied"):
+        await client.graphql("partial")
+
+    for query in ["not json", "no data"]:
+        with pytest.raises(GraphQLError, match="Malformed response body"):
+            await client.graphql(query)
+
+    with pytest.raises(HTTPStatusError):
+        await client.graphql("query { sites { id } }")
+
+
+def test_query_key():
+    assert query_key(QUERY, {"a": 1, "b": 2}) == query_key(QUERY, {"b": 2, "a": 1})
+    assert query_key(QUERY, {}) != query_key(QUERY.replace("name", "id"), {})
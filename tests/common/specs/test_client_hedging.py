@@ -0,0 +1,193 @@
+from typing import Any
+
+import pytest
+
+import anyio
+
+from httpx import MockTransport, Request, Response
+
+from nopf.client import NetboxClient
+from nopf.client.hedging import LatencyWindow, RequestHedger
+from nopf.settings import Settings
+
+
+pytestmark = pytest.mark.anyio
+
+
+def warm_window(hedger: RequestHedger, latency: float = 0.01) -> LatencyWindow:
+    latencies = hedger.latency_window()
+
+    for _ in range(hedger.min_samples):
+        latencies.record(latency)
+
+    return latencies
+
+
+async def test_hedge_slow_requests(settings: Settings):
+    settings.netbox_hedge_reads = True
+    settings.netbox_hedge_budget = 100.0
+    requests = 0
+
+    async def handler(request: Request) -> Response:
+        nonlocal requests
+        requests += 1
+
+        # The first request after the warm-up hits a slow worker.
+        if requests == 21:
+            await anyio.sleep(10)
+
+        return Response(200, json={"id": 1, "name": "site", "slug": "site"})
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+
+    for _ in range(20):
+        await client.operations.dcim_sites_retrieve(params={"id": 1})
+
+    assert client.hedging_stats.hedged == 0
+
+    with anyio.fail_after(5):
+        result = await client.operations.dcim_sites_retrieve(params={"id": 1})
+
+    assert result.data["id"] == 1
+    assert requests == 22
+
+    stats = client.hedging_stats
+    assert stats.requests == 21
+    assert stats.hedged == 1
+    assert stats.wins == 1
+
+    # Only the response used is validated.
+    assert client.validation_stats.validated == 21
+
+    # Writes are never hedged.
+    await client.operations.dcim_sites_partial_update(params={"id": 1}, body={})
+    assert client.hedging_stats.requests == 21
+
+
+async def test_hedging_disabled(settings: Settings):
+    client = NetboxClient(settings)
+    assert client.hedging_stats.requests == 0
+
+
+async def test_hedge_budget():
+    hedger = RequestHedger(percentile=50.0, budget=0.0)
+    latencies = warm_window(hedger)
+    calls = 0
+
+    async def send() -> Any:
+        nonlocal calls
+        calls += 1
+        await anyio.sleep(0.05)
+        return "result"
+
+    assert await hedger.run(latencies, send) == "result"
+    assert calls == 1
+    assert hedger.stats.hedged == 0
+
+
+async def test_original_request_wins():
+    hedger = RequestHedger(percentile=50.0, budget=100.0)
+    latencies = warm_window(hedger)
+    calls = 0
+
+    async def send() -> Any:
+        nonlocal calls
+        calls += 1
+        call = calls
+
+        await anyio.sleep(0.05 if call == 1 else 10)
+        return call
+
+    with anyio.fail_after(5):
+        assert await hedger.run(latencies, send) == 1
+
+    assert hedger.stats.hedged == 1
+    assert hedger.stats.wins == 0
+
+
+async def test_hedge_latencies():
+    hedger = RequestHedger(percentile=50.0, budget=100.0, window=40)
+    latencies = warm_window(hedger)
+    calls = 0
+
+    async def send() -> Any:
+        nonlocal calls
+        calls += 1
+        call = calls
+
+        await anyio.sleep(10 if call == 1 else 0.001)
+        return call
+
+    with anyio.fail_after(5):
+        assert await hedger.run(latencies, send) == 2
+
+    # The original request was cancelled, the time it waited is recorded
+    # instead of the latency of the duplicate.
+    assert len(latencies) == hedger.min_samples + 1
+    assert latencies.percentile(100.0) >= 0.01
+
+
+async def test_hedge_errors():
+    hedger = RequestHedger(percentile=50.0, budget=100.0)
+    latencies = warm_window(hedger)
+    calls = 0
+
+    # The request failed before being hedged.
+    async def fail_fast() -> Any:
+        nonlocal calls
+        calls += 1
+        raise ValueError(f"error {calls}")
+
+    with pytest.raises(ValueError, match="error 1"):
+        await hedger.run(latencies, fail_fast)
+
+    assert calls == 1
+
+    # Both requests failed, the first error is raised.
+    calls = 0
+
+    async def fail_slow() -> Any:
+        nonlocal calls
+        calls += 1
+        call = calls
+
+        await anyio.sleep(0.05 if call == 1 else 0.1)
+        raise ValueError(f"error {call}")
+
+    with pytest.raises(ValueError, match="error 1"):
+        await hedger.run(latencies, fail_slow)
+
+    assert calls == 2
+
+    # The original request failed, the hedged one succeeded.
+    calls = 0
+
+    async def recover() -> Any:
+        nonlocal calls
+        calls += 1
+        call = calls
+
+        await anyio.sleep(0.05)
+
+        if call == 1:
+            raise ValueError("error")
+
+        return call
+
+    assert await hedger.run(latencies, recover) == 2
+
+
+def test_latency_window():
+    latencies = LatencyWindow(size=4)
+
+    with pytest.raises(ValueError):
+        latencies.percentile(50.0)
+
+    for latency in [5.0, 1.0, 4.0, 2.0, 3.0]:
+        latencies.record(latency)
+
+    assert len(latencies) == 4
+    assert latencies.percentile(0.0) == 1.0
+    assert latencies.percentile(50.0) == 2.0
+    assert latencies.percentile(75.0) == 3.0
+    assert latencies.percentile(100.0) == 4.0
@@ -0,0 +1,339 @@
+from typing import Any
+
+import pytest
+
+from collections.abc import AsyncIterator
+from datetime import datetime, UTC
+import asyncio
+import json
+import time
+
+import anyio
+
+from httpx import AsyncByteStream, ConnectError, MockTransport, Request, Response
+
+from nopf.client import NetboxClient
+from nopf.client.limiter import AdaptiveLimiter, CircuitOpenError, retry_after_delay
+from nopf.settings import Settings
+
+
+pytestmark = pytest.mark.anyio
+
+
+SITE = {"id": 1, "name": "site", "slug": "site"}
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_limiter(clock: FakeClock, **kwargs) -> AdaptiveLimiter:
+    options = {
+        "initial_limit": 4,
+        "max_limit": 8,
+        "latency_threshold": 1.0,
+        "failure_threshold": 2,
+        "recovery_time": 10.0,
+        "clock": clock,
+        **kwargs,
+    }
+    return AdaptiveLimiter(**options)
+
+
+async def send(limiter: AdaptiveLimiter, status_code: int, **headers: str) -> None:
+    async with limiter.acquire() as permit:
+        permit.record(Response(status_code, headers=headers))
+
+
+async def consume(items: AsyncIterator[Any]) -> None:
+    async for _ in items:
+        pass
+
+
+async def test_limit_concurrency(settings: Settings):
+    settings.netbox_adaptive_concurrency = True
+    settings.netbox_concurrency_limit = 2
+    settings.netbox_concurrency_max_limit = 2
+    in_flight = 0
+    max_in_flight = 0
+
+    async def handler(request: Request) -> Response:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+
+        await anyio.sleep(0.01)
+        in_flight -= 1
+
+        if request.url.path == "/api/dcim/sites/":
+            return Response(200, json={"count": 0, "results": []})
+
+        return Response(200, json={"id": 1, "name": "site", "slug": "site"})
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+    assert client.limiter is not None
+
+    async with anyio.create_task_group() as tg:
+        for site_id in range(10):
+            tg.start_soon(
+                lambda site_id=site_id: client.operations.dcim_sites_retrieve(
+                    params={"id": site_id},
+                ),
+            )
+
+        tg.start_soon(consume, client.operations.dcim_sites_list.stream())
+
+    assert max_in_flight == 2
+
+    state = client.limiter.state
+    assert state.limit == 2
+    assert state.in_flight == 0
+    assert state.queued == 0
+    assert state.circuit == "closed"
+
+
+async def test_stream_nested_calls(settings: Settings):
+    settings.netbox_adaptive_concurrency = True
+    settings.netbox_concurrency_limit = 1
+    settings.netbox_concurrency_max_limit = 1
+
+    async def handler(request: Request) -> Response:
+        if request.url.path == "/api/dcim/sites/":
+            return Response(200, json={"count": 2, "results": [SITE, SITE]})
+
+        return Response(200, json=SITE)
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+    results = []
+
+    # The permit of the stream is released once the headers are received, so
+    # that the loop body can make client calls.
+    with anyio.fail_after(5):
+        async for item in client.operations.dcim_sites_list.stream():
+            result = await client.operations.dcim_sites_retrieve(
+                params={"id": item["id"]},
+            )
+            results.append(result.data)
+
+    assert results == [SITE, SITE]
+
+
+async def test_latency_to_headers(settings: Settings):
+    settings.netbox_adaptive_concurrency = True
+    settings.netbox_concurrency_limit = 4
+    settings.netbox_concurrency_latency_threshold = 0.05
+
+    class SlowBody(AsyncByteStream):
+        async def __aiter__(self) -> AsyncIterator[bytes]:
+            await anyio.sleep(0.1)
+            yield json.dumps(SITE).encode()
+
+    def handler(request: Request) -> Response:
+        return Response(200, stream=SlowBody())
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+    result = await client.operations.dcim_sites_retrieve(params={"id": 1})
+    assert result.data == SITE
+
+    # A slow body download is not a sign of overload.
+    assert client.limiter is not None
+    assert client.limiter.state.limit == 4
+
+
+async def test_limiter_disabled(settings: Settings):
+    client = NetboxClient(settings)
+    assert client.limiter is None
+
+
+async def test_aimd():
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+
+    # The limit grows by one every `limit` successful requests.
+    for _ in range(5):
+        await send(limiter, 200)
+
+    assert limiter.state.limit == 5
+
+    await send(limiter, 503)
+    assert limiter.state.limit == 2
+    assert limiter.state.decreases == 1
+
+    # Slow responses are a sign of overload too.
+    async with limiter.acquire() as permit:
+        clock.now += 2.0
+        permit.record(Response(200))
+
+    assert limiter.state.limit == 1
+    assert limiter.state.decreases == 2
+
+    # The limit never goes below the minimum, nor above the maximum.
+    await send(limiter, 429)
+    assert limiter.state.limit == 1
+
+    for _ in range(100):
+        await send(limiter, 200)
+
+    assert limiter.state.limit == 8
+
+
+async def test_decrease_once_per_window():
+    clock = FakeClock()
+    limiter = make_limiter(clock, failure_threshold=0)
+
+    async with limiter.acquire() as permit1:
+        async with limiter.acquire() as permit2:
+            clock.now += 0.1
+            permit2.record(Response(503))
+
+        permit1.record(Response(503))
+
+    # The first request was sent before the limit was decreased.
+    assert limiter.state.limit == 2
+    assert limiter.state.decreases == 1
+
+
+async def test_unrecorded_response():
+    limiter = make_limiter(FakeClock())
+
+    with pytest.raises(ValueError):
+        async with limiter.acquire():
+            raise ValueError("before the response")
+
+    state = limiter.state
+    assert state.limit == 4
+    assert state.in_flight == 0
+
+
+async def test_retry_after():
+    limiter = make_limiter(FakeClock())
+    limiter._clock = time.monotonic
+
+    await send(limiter, 429, **{"Retry-After": "0.05"})
+    assert limiter.state.retry_after > 0
+
+    started_at = time.monotonic()
+    await send(limiter, 200)
+    assert time.monotonic() - started_at >= 0.04
+    assert limiter.state.retry_after == 0
+
+    # Requests waiting for the delay to elapse can be cancelled.
+    await send(limiter, 503, **{"Retry-After": "10"})
+
+    with anyio.move_on_after(0.01):
+        await send(limiter, 200)
+
+    assert limiter.state.in_flight == 0
+
+
+def test_retry_after_delay():
+    now = datetime(2025, 1, 1, tzinfo=UTC)
+
+    def delay(value: str | None) -> float | None:
+        headers = {} if value is None else {"Retry-After": value}
+        return retry_after_delay(Response(429, headers=headers), now)
+
+    assert delay(None) is None
+    assert delay("12") == 12.0
+    assert delay("-1") == 0.0
+    assert delay("Wed, 01 Jan 2025 00:00:30 GMT") == 30.0
+    assert delay("Tue, 31 Dec 2024 00:00:00 GMT") == 0.0
+    assert delay("soon") is None
+    assert retry_after_delay(Response(429, headers={"Retry-After": "0"})) == 0.0
+
+
+async def test_circuit_breaker():
+    clock = FakeClock()
+    limiter = make_limiter(clock)
+
+    await send(limiter, 500)
+    assert limiter.state.circuit == "closed"
+
+    await send(limiter, 500)
+    assert limiter.state.circuit == "open"
+
+    with pytest.raises(CircuitOpenError):
+        await send(limiter, 200)
+
+    assert limiter.state.rejected == 1
+    assert limiter.state.in_flight == 0
+
+    clock.now += 10.0
+    assert limiter.state.circuit == "half_open"
+
+    # A single probe is sent, and it failed: the circuit opens again.
+    async with limiter.acquire() as permit:
+        with pytest.raises(CircuitOpenError):
+            await send(limiter, 200)
+
+        permit.record(Response(502))
+
+    assert limiter.state.circuit == "open"
+    assert limiter.state.rejected == 2
+
+    clock.now += 10.0
+
+    # A cancelled probe lets the next request probe.
+    with anyio.CancelScope() as scope:
+        async with limiter.acquire():
+            scope.cancel()
+            await anyio.sleep(1)
+
+    assert limiter.state.circuit == "half_open"
+
+    await send(limiter, 200)
+    assert limiter.state.circuit == "closed"
+
+
+async def test_transport_errors(settings: Settings):
+    settings.netbox_adaptive_concurrency = True
+    settings.netbox_circuit_failure_threshold = 1
+
+    def handler(request: Request) -> Response:
+        raise ConnectError("Connection refused")
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+
+    with pytest.raises(ConnectError):
+        await client.operations.dcim_sites_retrieve(params={"id": 1})
+
+    with pytest.raises(CircuitOpenError):
+        await client.operations.dcim_sites_retrieve(params={"id": 1})
+
+    assert client.limiter is not None
+    assert client.limiter.state.circuit == "open"
+
+
+async def test_cancelled_waiters():
+    clock = FakeClock()
+    limiter = make_limiter(clock, initial_limit=1)
+
+    async with limiter.acquire() as permit:
+        # Cancelled while queued.
+        with anyio.move_on_after(0.01):
+            await send(limiter, 200)
+
+        assert limiter.state.queued == 0
+
+        cancelled_waiter = asyncio.create_task(send(limiter, 200))
+        waiter = asyncio.create_task(send(limiter, 200))
+        await anyio.wait_all_tasks_blocked()
+        assert limiter.state.queued == 2
+
+        # A slow response, so that the limit stays at 1.
+        clock.now += 2.0
+        permit.record(Response(200))
+
+    # Cancelled once woken up: the slot is handed over to the next waiter.
+    cancelled_waiter.cancel()
+    await waiter
+
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled_waiter
+
+    assert limiter.state.in_flight == 0
+    assert limiter.state.queued == 0
@@ -0,0 +1,669 @@
+from typing import Any
+
+import pytest
+
+from collections.abc import AsyncIterator, Callable
+from contextlib import suppress
+from copy import deepcopy
+import json
+import re
+
+import anyio
+from httpx import AsyncClient, HTTPStatusError, MockTransport, Request, Response
+
+from nopf.client import operation as operation_module
+from nopf.client._validator import SchemaValidators
+from nopf.client.operation import Operation, Projection, Result, ValidationPolicy
+
+
+pytestmark = pytest.mark.anyio
+
+
+def make_operation(
+    schema: dict[str, Any],
+    operation_id: str,
+    handler: Callable[[Request], Any],
+    validators: SchemaValidators | None = None,
+) -> Operation:
+    if validators is None:
+        validators = SchemaValidators(schema)
+
+    client = AsyncClient(
+        base_url="http://netbox.local",
+        transport=MockTransport(handler),
+    )
+
+    for path, path_spec in schema["paths"].items():
+        for method, operation_spec in path_spec.items():
+            if operation_spec["operationId"] == operation_id:
+                return Operation(client, method, path, operation_spec, validators)
+
+    raise KeyError(operation_id)
+
+
+def site(obj_id: int) -> dict[str, Any]:
+    return {"id": obj_id, "name": f"site-{obj_id}", "slug": f"site-{obj_id}"}
+
+
+async def test_validators_are_compiled_once(openapi_schema: dict[str, Any]):
+    validators = SchemaValidators(openapi_schema)
+    pointer = "/paths/~1api~1dcim~1sites~1{id}~1/get/parameters/0/schema"
+
+    validator = validators.get(pointer)
+    assert validators.get(pointer) is validator
+    assert validators.resolve(pointer) == {"type": "integer"}
+
+    operation = make_operation(
+        openapi_schema,
+        "dcim_sites_retrieve",
+        lambda request: Response(200, json=site(1)),
+        validators,
+    )
+
+    resp = await operation(params={"id": 1})
+    assert resp.json() == site(1)
+    assert validators.get(pointer) is validator
+
+
+async def test_component_references(openapi_schema: dict[str, Any]):
+    validators = SchemaValidators(openapi_schema)
+    validator = validators.get(
+        "/paths/~1api~1dcim~1sites~1/get/responses/200/content/application~1json/schema"
+    )
+
+    validator.validate(
+        {
+            "count": 1,
+            "next": None,
+            "results": [{**site(1), "description": None}],
+        }
+    )
+
+    assert not validator.is_valid({"count": 1, "results": [{"id": 1}]})
+
+
+async def test_invalid_parameter(openapi_schema: dict[str, Any]):
+    operation = make_operation(
+        openapi_schema,
+        "dcim_sites_retrieve",
+        lambda request: Response(200, json=site(1)),
+    )
+
+    with pytest.raises(
+        ValueError,
+        match=re.escape("Operation(dcim_sites_retrieve): Invalid parameter: id"),
+    ):
+        await operation(params={"id": "str"})
+
+
+async def test_invalid_response(openapi_schema: dict[str, Any]):
+    operation = make_operation(
+        openapi_schema,
+        "dcim_sites_retrieve",
+        lambda request: Response(200, json={"id": "str"}),
+    )
+
+    with pytest.raises(
+        ValueError,
+        match=re.escape("Operation(dcim_sites_retrieve): Invalid response"),
+    ):
+        await operation(params={"id": 1})
+
+
+async def test_missing_parameter(openapi_schema: dict[str, Any]):
+    operation = make_operation(
+        openapi_schema,
+        "dcim_sites_retrieve",
+        lambda request: Response(200, json=site(1)),
+    )
+
+    with pytest.raises(
+        ValueError,
+        match=re.escape("Operation(dcim_sites_retrieve): Missing parameter: id"),
+    ):
+        await operation()
+
+
+async def test_parameters(openapi_schema: dict[str, Any]):
+    requests: list[Request] = []
+
+    def handler(request: Request) -> Response:
+        requests.append(request)
+        return Response(200, json=site(42))
+
+    operation = make_operation(openapi_schema, "dcim_sites_retrieve", handler)
+    await operation(params={"id": 42, "unknown": "ignored"})
+
+    assert requests[0].url.path == "/api/dcim/sites/42/"
+    assert requests[0].url.query == b""
+
+    def list_handler(request: Request) -> Response:
+        requests.append(request)
+        return Response(200, json={"count": 0, "results": []})
+
+    operation = make_operation(openapi_schema, "dcim_sites_list", list_handler)
+    await operation(params={"id": [1, 2], "q": "foo", "limit": 10})
+
+    assert requests[1].url.path == "/api/dcim/sites/"
+    assert requests[1].url.params.get_list("id") == ["1", "2"]
+    assert requests[1].url.params.get_list("q") == ["foo"]
+    assert requests[1].url.params.get_list("limit") == ["10"]
+
+
+async def test_validation_modes(openapi_schema: dict[str, Any]):
+    operation = make_operation(
+        openapi_schema,
+        "dcim_sites_retrieve",
+        lambda request: Response(200, json={"id": "str"}),
+    )
+
+    operation.validation = ValidationPolicy(mode="off")
+    await operation(params={"id": 1})
+
+    assert operation.validation_stats.validated == 0
+    assert operation.validation_stats.skipped == 1
+
+    with pytest.raises(ValueError, match=re.escape("Invalid response")):
+        await operation(params={"id": 1}, validation="strict")
+
+    assert operation.validation_stats.validated == 1
+    assert operation.validation_stats.skipped == 1
+    assert operation.validation_stats.duration > 0
+
+    operation = make_operation(
+        openapi_schema,
+        "dcim_sites_retrieve",
+        lambda request: Response(200, json={"id": "str"}),
+    )
+    policy = ValidationPolicy(mode="sampled", sample_interval=3)
+
+    with pytest.raises(ValueError, match=re.escape("Invalid response")):
+        await operation(params={"id": 1}, validation=policy)
+
+    for _ in range(2):
+        await operation(params={"id": 1}, validation=policy)
+
+    with pytest.raises(ValueError, match=re.escape("Invalid response")):
+        await operation(params={"id": 1}, validation=policy)
+
+    assert operation.validation_stats.validated == 2
+    assert operation.validation_stats.skipped == 2
+
+
+async def test_sampled_list_items(openapi_schema: dict[str, Any]):
+    results = [site(i) for i in range(100)]
+    results[0] = {"id": "str"}
+
+    operation = make_operation(
+        openapi_schema,
+        "dcim_sites_list",
+        lambda request: Response(200, json={"count": 100, "results": results}),
+    )
+
+    operation.validation = ValidationPolicy(
+        mode="sampled",
+        sample_interval=1,
+        sample_items=1.0,
+    )
+
+    for _ in range(10):
+        with suppress(ValueError):
+            await operation()
+
+    assert operation.validation_stats.validated == 10
+
+    operation.validation.sample_items = 100.0
+
+    with pytest.raises(ValueError, match=re.escape("Invalid response")):
+        await operation()
+
+
+async def test_response_without_schema(openapi_schema: dict[str, Any]):
+    operation = make_operation(
+        openapi_schema,
+        "dcim_sites_destroy",
+        lambda request: Response(204),
+    )
+
+    resp = await operation(params={"id": 1})
+    assert resp.status_code == 204
+    assert operation.validation_stats.validated == 0
+    assert operation.validation_stats.skipped == 0
+
+
+async def test_iterate(openapi_schema: dict[str, Any]):
+    sites = [site(obj_id) for obj_id in range(1, 26)]
+    in_flight = 0
+    max_in_flight = 0
+    offsets: list[int] = []
+
+    async def handler(request: Request) -> Response:
+        nonlocal in_flight, max_in_flight
+
+        limit = int(request.url.params["limit"])
+        offset = int(request.url.params["offset"])
+        offsets.append(offset)
+
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        # Later pages answer first, results must still be yielded in order.
+        await anyio.sleep(0.01 * (30 - offset) / 30)
+        in_flight -= 1
+
+        return Response(
+            200,
+            json={
+                "count": len(sites),
+                "results": sites[offset : offset + limit],
+            },
+        )
+
+    operation = make_operation(openapi_schema, "dcim_sites_list", handler)
+
+    results = [
+        item
+        async for item in operation.iterate(
+            params={"q": "site"},
+            page_size=3,
+            concurrency=4,
+        )
+    ]
+
+    assert results == sites
+    assert sorted(offsets) == list(range(0, 25, 3))
+    assert max_in_flight == 4
+
+    offsets.clear()
+    results = [item async for item in operation.iterate(params={"offset": 20})]
+    assert results == sites[20:]
+    assert offsets == [20]
+
+
+async def test_iterate_early_exit(openapi_schema: dict[str, Any]):
+    sites = [site(obj_id) for obj_id in range(1, 10)]
+    fetched: list[int] = []
+
+    def handler(request: Request) -> Response:
+        offset = int(request.url.params["offset"])
+        fetched.append(offset)
+        return Response(
+            200, json={"count": len(sites), "results": sites[offset : offset + 1]}
+        )
+
+    operation = make_operation(openapi_schema, "dcim_sites_list", handler)
+    results = []
+
+    # No task is left running between the pages, the loop can be left
+    # without closing the iterator.
+    async for item in operation.iterate(page_size=1, concurrency=2):
+        results.append(item)
+
+        if len(results) == 2:
+            break
+
+    assert results == sites[:2]
+    assert fetched == [0, 1, 2]
+
+
+async def test_paginate(openapi_schema: dict[str, Any]):
+    sites = [site(obj_id) for obj_id in range(1, 10)]
+    fetched: list[int] = []
+
+    async def handler(request: Request) -> Response:
+        limit = int(request.url.params["limit"])
+        offset = int(request.url.params["offset"])
+        fetched.append(offset)
+        return Response(
+            200,
+            json={"count": len(sites), "results": sites[offset : offset + limit]},
+        )
+
+    operation = make_operation(openapi_schema, "dcim_sites_list", handler)
+    results = []
+
+    async with operation.paginate(page_size=1, concurrency=2) as items:
+        async for item in items:
+            results.append(item)
+
+            if len(results) == 2:
+                # Pages are fetched while the consumer works: `concurrency`
+                # pages are buffered, and the next one is ready to be sent.
+                await anyio.wait_all_tasks_blocked()
+                assert fetched == [0, 1, 2, 3, 4]
+
+            if len(results) == 3:
+                break
+
+    assert results == sites[:3]
+
+    # The remaining pages are not fetched once the context manager exits.
+    await anyio.wait_all_tasks_blocked()
+    assert len(fetched) < len(sites)
+
+    async with operation.paginate(page_size=4) as items:
+        assert [item async for item in items] == sites
+
+    # Errors of the consumer are not wrapped in an exception group.
+    with pytest.raises(RuntimeError, match="consumer failed"):
+        async with operation.paginate(page_size=1) as items:
+            async for _ in items:
+                raise RuntimeError("consumer failed")
+
+
+async def test_iterate_page_error(openapi_schema: dict[str, Any]):
+    async def handler(request: Request) -> Response:
+        offset = int(request.url.params["offset"])
+
+        if offset == 2:
+            return Response(500)
+
+        return Response(200, json={"count": 4, "results": [site(offset + 1)]})
+
+    operation = make_operation(openapi_schema, "dcim_sites_list", handler)
+    results = []
+
+    # The results of the previous pages are yielded first.
+    with pytest.raises(HTTPStatusError):
+        async for item in operation.iterate(page_size=1):
+            results.append(item)
+
+    assert results == [site(1), site(2)]
+    results.clear()
+
+    with pytest.raises(HTTPStatusError):
+        async with operation.paginate(page_size=1) as items:
+            async for item in items:
+                results.append(item)
+
+    assert results == [site(1), site(2)]
+
+
+async def test_iterate_errors(openapi_schema: dict[str, Any]):
+    operation = make_operation(
+        openapi_schema,
+        "dcim_sites_retrieve",
+        lambda request: Response(200, json=site(1)),
+    )
+
+    with pytest.raises(
+        ValueError,
+        match=re.escape("Operation(dcim_sites_retrieve): Not a paginated operation"),
+    ):
+        async for _ in operation.iterate():
+            pass  # pragma: no cover
+
+    with pytest.raises(ValueError, match="Not a paginated operation"):
+        async with operation.paginate():
+            pass  # pragma: no cover
+
+    operation = make_operation(
+        openapi_schema,
+        "dcim_sites_list",
+        lambda request: Response(500),
+    )
+
+    with pytest.raises(HTTPStatusError):
+        async for _ in operation.iterate():
+            pass  # pragma: no cover
+
+
+async def test_stream(openapi_schema: dict[str, Any]):
+    sites = [site(obj_id) for obj_id in range(1, 101)]
+    body = json.dumps({"count": len(sites), "results": sites}).encode()
+
+    async def chunks() -> AsyncIterator[bytes]:
+        for offset in range(0, len(body), 100):
+            yield body[offset : offset + 100]
+
+    operation = make_operation(
+        openapi_schema,
+        "dcim_sites_list",
+        lambda request: Response(200, content=chunks()),
+    )
+
+    results = [item async for item in operation.stream(params={"q": "site"})]
+    assert results == sites
+    assert operation.validation_stats.validated == 1
+
+    results = [item async for item in operation.stream(validation="off")]
+    assert results == sites
+    assert operation.validation_stats.skipped == 1
+
+    operation.validation = ValidationPolicy(
+        mode="sampled",
+        sample_interval=1,
+        sample_items=0.0,
+    )
+    results = [item async for item in operation.stream()]
+    assert results == sites
+    assert operation.validation_stats.validated == 2
+
+    operation = make_operation(
+        openapi_schema,
+        "dcim_sites_list",
+        lambda request: Response(
+            200,
+            json={"count": 1, "results": [{"id": "invalid"}]},
+        ),
+    )
+
+    with pytest.raises(
+        ValueError,
+        match=re.escape("Operation(dcim_sites_list): Invalid response"),
+    ):
+        async for _ in operation.stream():
+            pass  # pragma: no cover
+
+    operation = make_operation(
+        openapi_schema,
+        "dcim_sites_list",
+        lambda request: Response(404, json={"detail": "Not found."}),
+    )
+
+    with pytest.raises(HTTPStatusError):
+        async for _ in operation.stream():
+            pass  # pragma: no cover
+
+
+async def test_result_is_decoded_once(
+    openapi_schema: dict[str, Any],
+    monkeypatch: pytest.MonkeyPatch,
+):
+    decoded = 0
+    json_loads = operation_module.json_loads
+
+    def counting_loads(content: bytes) -> Any:
+        nonlocal decoded
+        decoded += 1
+        return json_loads(content)
+
+    monkeypatch.setattr(operation_module, "json_loads", counting_loads)
+
+    operation = make_operation(
+        openapi_schema,
+        "dcim_sites_retrieve",
+        lambda request: Response(200, json=site(1)),
+    )
+
+    result = await operation(params={"id": 1})
+    assert result.status_code == 200
+    assert result.raise_for_status() is result.response
+    assert result.data == site(1)
+    assert result.json() is result.data
+    assert decoded == 1
+
+    # Results built from decoded data are neither encoded nor decoded again,
+    # unless their body is read.
+    result = Result.from_data(200, site(2), result.request)
+    assert result.data == site(2)
+    assert decoded == 1
+    assert result.response.content == b""
+
+    assert result.raise_for_status() is result.response
+    assert json.loads(result.content) == site(2)
+    assert json.loads(result.text) == site(2)
+    assert result.headers["Content-Type"] == "application/json"
+    assert result.data == site(2)
+    assert decoded == 1
+
+
+async def test_bulk_create_response(openapi_schema: dict[str, Any]):
+    items = [site(1), site(2)]
+    operation = make_operation(
+        openapi_schema,
+        "dcim_sites_create",
+        lambda request: Response(201, json=items),
+    )
+
+    result = await operation(body=[{"name": "site-1"}, {"name": "site-2"}])
+    assert result.data == items
+
+    items.append({"id": "invalid"})
+
+    with pytest.raises(
+        ValueError,
+        match=re.escape("Operation(dcim_sites_create): Invalid response"),
+    ):
+        await operation(body=[{"name": "site-1"}])
+
+
+async def test_projection(openapi_schema: dict[str, Any]):
+    queries = []
+
+    def handler(request: Request) -> Response:
+        queries.append(dict(request.url.params))
+        return Response(200, json={"id": 1, "name": "site-1"})
+
+    operation = make_operation(openapi_schema, "dcim_sites_retrieve", handler)
+
+    # Projected objects may miss required fields.
+    resp = await operation(
+        params={"id": 1},
+        projection=Projection(fields=["id", "name"]),
+    )
+    assert resp.data == {"id": 1, "name": "site-1"}
+
+    operation.projection = Projection(brief=True, exclude=["config_context"])
+    await operation(params={"id": 1})
+
+    with pytest.raises(ValueError, match="Invalid response"):
+        await operation(params={"id": 1}, projection=Projection())
+
+    assert queries == [
+        {"fields": "id,name"},
+        {"brief": "true", "exclude": "config_context"},
+        {},
+    ]
+
+    # Fields that are present are still validated.
+    operation = make_operation(
+        openapi_schema,
+        "dcim_sites_retrieve",
+        lambda request: Response(200, json={"id": "1"}),
+    )
+
+    with pytest.raises(ValueError, match="Invalid response"):
+        await operation(params={"id": 1}, projection=Projection(omit=["slug"]))
+
+    # Projection parameters must not be silently dropped.
+    with pytest.raises(ValueError, match="Undeclared parameter: brief"):
+        await operation(params={"id": 1, "brief": True})
+
+    # Write operations are not projected.
+    operation = make_operation(openapi_schema, "dcim_sites_partial_update", handler)
+    operation.projection = Projection(brief=True)
+
+    with pytest.raises(ValueError, match="Invalid response"):
+        await operation(params={"id": 1}, body={})
+
+    assert queries[-1] == {}
+
+    with pytest.raises(ValueError, match="Projection of a non-model operation"):
+        await operation(params={"id": 1}, body={}, projection=Projection(brief=True))
+
+
+async def test_projection_merge(openapi_schema: dict[str, Any]):
+    queries = []
+
+    def handler(request: Request) -> Response:
+        queries.append(dict(request.url.params))
+        return Response(200, json={"count": 0, "results": []})
+
+    # Netbox may declare a projection parameter on an operation.
+    schema = deepcopy(openapi_schema)
+    schema["paths"]["/api/dcim/sites/"]["get"]["parameters"].append(
+        {"in": "query", "name": "exclude", "schema": {"type": "string"}},
+    )
+
+    operation = make_operation(schema, "dcim_sites_list", handler)
+    operation.projection = Projection(exclude=["config_context"])
+
+    await operation(params={"exclude": "comments"})
+    await operation(params={"exclude": "config_context"})
+
+    assert queries == [
+        {"exclude": "comments,config_context"},
+        {"exclude": "config_context"},
+    ]
+
+
+async def test_projection_nested_objects(openapi_schema: dict[str, Any]):
+    schema = deepcopy(openapi_schema)
+    schemas = schema["components"]["schemas"]
+    schemas["BriefTenant"] = {
+        "type": "object",
+        "properties": {"id": {"type": "integer"}, "name": {"type": "string"}},
+        "required": ["id", "name"],
+    }
+    schemas["Site"]["properties"]["tenant"] = {
+        "$ref": "#/components/schemas/BriefTenant",
+    }
+    tenant: dict[str, Any] = {"id": 1, "name": "tenant"}
+
+    def handler(request: Request) -> Response:
+        item = {"id": 1, "tenant": tenant}
+
+        if request.url.path == "/api/dcim/sites/":
+            return Response(200, json={"count": 1, "results": [item]})
+
+        return Response(200, json=item)
+
+    validators = SchemaValidators(schema)
+    projection = Projection(fields=["id", "tenant"])
+    retrieve = make_operation(schema, "dcim_sites_retrieve", handler, validators)
+    list_ = make_operation(schema, "dcim_sites_list", handler, validators)
+
+    await retrieve(params={"id": 1}, projection=projection)
+    await list_(projection=projection)
+
+    # Only the projected objects may miss required fields, not the objects
+    # nested in them.
+    tenant = {"id": 1}
+
+    with pytest.raises(ValueError, match="Invalid response"):
+        await retrieve(params={"id": 1}, projection=projection)
+
+    with pytest.raises(ValueError, match="Invalid response"):
+        await list_(projection=projection)
+
+
+async def test_stream_projection(openapi_schema: dict[str, Any]):
+    queries = []
+
+    def handler(request: Request) -> Response:
+        queries.append(dict(request.url.params))
+        return Response(200, json={"count": 1, "results": [{"id": 1}]})
+
+    operation = make_operation(openapi_schema, "dcim_sites_list", handler)
+    projection = Projection(fields=["id"])
+
+    results = [item async for item in operation.stream(projection=projection)]
+    assert results == [{"id": 1}]
+
+    results = [item async for item in operation.iterate(projection=projection)]
+    assert results == [{"id": 1}]
+
+    assert queries == [
+        {"fields": "id"},
+        {"fields": "id", "limit": "100", "offset": "0"},
+    ]
@@ -0,0 +1,169 @@
+import pytest
+
+import asyncio
+
+import anyio
+
+from httpx import MockTransport, Request, Response
+
+from nopf.client import NetboxClient
+from nopf.client.priority import (
+    PriorityScheduler,
+    current_priority,
+    request_priority,
+)
+from nopf.settings import Settings
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_request_priority():
+    assert current_priority() == "normal"
+
+    with request_priority("low"):
+        assert current_priority() == "low"
+
+        with request_priority("high"):
+            assert current_priority() == "high"
+
+        assert current_priority() == "low"
+
+    assert current_priority() == "normal"
+
+
+async def test_handlers_jump_ahead(settings: Settings):
+    settings.netbox_request_priorities = True
+    settings.netbox_max_connections = 1
+    served = []
+
+    async def handler(request: Request) -> Response:
+        served.append(request.url.path)
+        await anyio.sleep(0.01)
+
+        if request.url.path == "/api/dcim/sites/":
+            return Response(200, json={"count": 0, "results": []})
+
+        return Response(200, json={"id": 1, "name": "site", "slug": "site"})
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+
+    async def resync() -> None:
+        with request_priority("low"):
+            for _ in range(3):
+                await client.operations.dcim_sites_list()
+
+    async with anyio.create_task_group() as tg:
+        for _ in range(3):
+            tg.start_soon(resync)
+
+        await anyio.wait_all_tasks_blocked()
+
+        stats = client.scheduling_stats
+        assert stats.in_flight == 1
+        assert stats.queued["low"] == 2
+
+        await client.operations.dcim_sites_retrieve(
+            params={"id": 1},
+            priority="high",
+        )
+
+        # Only the request already sent was served before.
+        assert served == ["/api/dcim/sites/", "/api/dcim/sites/1/"]
+
+    stats = client.scheduling_stats
+    assert stats.in_flight == 0
+    assert stats.queued == {"high": 0, "normal": 0, "low": 0}
+    assert stats.delayed["high"] == 1
+    assert stats.delayed["low"] == 8
+
+
+async def test_scheduling_disabled(settings: Settings):
+    client = NetboxClient(settings)
+    assert client.scheduling_stats.in_flight == 0
+
+
+async def test_follow_adaptive_limit(settings: Settings):
+    settings.netbox_request_priorities = True
+    settings.netbox_adaptive_concurrency = True
+    settings.netbox_concurrency_limit = 2
+    settings.netbox_concurrency_max_limit = 2
+    in_flight = 0
+    max_in_flight = 0
+
+    async def handler(request: Request) -> Response:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+
+        await anyio.sleep(0.01)
+        in_flight -= 1
+        return Response(200, json={"id": 1, "name": "site", "slug": "site"})
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+
+    async with anyio.create_task_group() as tg:
+        for _ in range(6):
+            tg.start_soon(
+                lambda: client.operations.dcim_sites_retrieve(params={"id": 1}),
+            )
+
+        await anyio.wait_all_tasks_blocked()
+
+        # Requests wait in the scheduler, not in the limiter.
+        assert client.scheduling_stats.queued["normal"] == 4
+        assert client.limiter is not None
+        assert client.limiter.state.queued == 0
+
+    assert max_in_flight == 2
+
+
+async def test_priority_order():
+    scheduler = PriorityScheduler(lambda: 1)
+    order = []
+
+    async def send(priority, name):
+        async with scheduler.acquire(priority):
+            order.append(name)
+
+    async with anyio.create_task_group() as tg, scheduler.acquire("normal"):
+        for priority, name in [
+            ("low", "low-1"),
+            ("normal", "normal-1"),
+            ("low", "low-2"),
+            ("high", "high-1"),
+            ("normal", "normal-2"),
+        ]:
+            tg.start_soon(send, priority, name)
+            await anyio.wait_all_tasks_blocked()
+
+    assert order == ["high-1", "normal-1", "normal-2", "low-1", "low-2"]
+
+
+async def test_cancelled_waiters():
+    scheduler = PriorityScheduler(lambda: 1)
+
+    async def send() -> None:
+        async with scheduler.acquire("normal"):
+            pass
+
+    async with scheduler.acquire("normal"):
+        # Cancelled while queued.
+        with anyio.move_on_after(0.01):
+            await send()
+
+        assert scheduler.stats.queued["normal"] == 0
+
+        cancelled_waiter = asyncio.create_task(send())
+        waiter = asyncio.create_task(send())
+        await anyio.wait_all_tasks_blocked()
+        assert scheduler.stats.queued["normal"] == 2
+
+    # Cancelled once woken up: the slot is handed over to the next waiter.
+    cancelled_waiter.cancel()
+    await waiter
+
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled_waiter
+
+    assert scheduler.stats.in_flight == 0
@@ -0,0 +1,229 @@
+from typing import Any
+
+import pytest
+
+from pathlib import Path
+import yaml
+
+from httpx import MockTransport, Request, Response
+
+from nopf.client import NetboxClient
+from nopf.client import _schema
+from nopf.client._schema import load_schema, load_schema_async, prune_schema
+from nopf.settings import Settings
+
+
+pytestmark = pytest.mark.anyio
+
+
+def test_schema_cache(
+    settings: Settings,
+    tmp_path: Path,
+    openapi_schema: dict[str, Any],
+    monkeypatch: pytest.MonkeyPatch,
+):
+    settings.netbox_schema_cache_dir = str(tmp_path / "cache")
+
+    assert load_schema(settings) == openapi_schema
+    assert len(list((tmp_path / "cache").glob("*.pickle"))) == 1
+
+    def validate(*args, **kwargs):
+        raise AssertionError("cached schema should not be validated")
+
+    monkeypatch.setattr(_schema, "validate", validate)
+
+    client = NetboxClient(settings)
+    assert client.title == "NetBox REST API"
+
+    # A different source schema is a cache miss.
+    settings.netbox_schema_operations = ["dcim_sites_list"]
+
+    with pytest.raises(AssertionError):
+        load_schema(settings)
+
+
+def test_schema_cache_unreadable(settings: Settings, tmp_path: Path):
+    settings.netbox_schema_cache_dir = str(tmp_path / "cache")
+    load_schema(settings)
+
+    for entry in (tmp_path / "cache").glob("*.pickle"):
+        entry.write_bytes(b"garbage")
+
+    assert load_schema(settings)["info"]["title"] == "NetBox REST API"
+
+
+def test_schema_cache_store_failure(
+    settings: Settings,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    settings.netbox_schema_cache_dir = str(tmp_path / "cache")
+
+    def dump(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(_schema.pickle, "dump", dump)
+
+    # The failure is logged, the schema is still loaded.
+    assert load_schema(settings)["info"]["title"] == "NetBox REST API"
+    assert list((tmp_path / "cache").iterdir()) == []
+
+
+def test_schema_cache_concurrent_eviction(
+    settings: Settings,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    settings.netbox_schema_cache_dir = str(tmp_path / "cache")
+    settings.netbox_schema_cache_max_entries = 1
+    load_schema(settings)
+
+    cache = _schema.schema_cache(settings)
+    [entry] = (tmp_path / "cache").glob("*.pickle")
+
+    # Another process evicts the entry while it is being used or pruned.
+    glob = Path.glob
+
+    def evicting_glob(self: Path, pattern: str):
+        paths = list(glob(self, pattern))
+        entry.unlink(missing_ok=True)
+        return paths
+
+    monkeypatch.setattr(Path, "glob", evicting_glob)
+    cache.prune()
+
+    cache._touch(entry)
+    assert cache.load(entry.stem) is None
+
+
+def test_schema_cache_eviction(settings: Settings, tmp_path: Path):
+    settings.netbox_schema_cache_dir = str(tmp_path / "cache")
+    settings.netbox_schema_cache_max_entries = 2
+    content = Path(settings.netbox_schema).read_bytes()
+
+    def load(operation_ids: list[str]) -> str:
+        settings.netbox_schema_operations = operation_ids
+        load_schema(settings)
+        return _schema.fingerprint(content, _schema.schema_operations(settings))
+
+    first = load(["dcim_sites_list"])
+    load(["dcim_sites_retrieve"])
+
+    # The first entry is used again, the second one is evicted.
+    load(["dcim_sites_list"])
+    third = load(["status_retrieve"])
+
+    entries = (tmp_path / "cache").glob("*.pickle")
+    assert {entry.stem for entry in entries} == {first, third}
+
+
+def test_prune_schema(openapi_schema: dict[str, Any]):
+    schema = prune_schema(openapi_schema, ["dcim_sites_list", "status_retrieve"])
+
+    assert list(schema["paths"]) == ["/api/status/", "/api/dcim/sites/"]
+    assert list(schema["paths"]["/api/dcim/sites/"]) == ["get"]
+    assert sorted(schema["components"]["schemas"]) == ["PaginatedSiteList", "Site"]
+
+
+def test_schema_operations(settings: Settings):
+    settings.netbox_schema_operations = ["dcim_sites_retrieve"]
+    client = NetboxClient(settings)
+
+    assert client.operations.dcim_sites_retrieve.name == "dcim_sites_retrieve"
+
+    with pytest.raises(KeyError, match="dcim_sites_list"):
+        _ = client.operations.dcim_sites_list
+
+
+def test_yaml_schema(
+    settings: Settings,
+    tmp_path: Path,
+    openapi_schema: dict[str, Any],
+):
+    schema_path = tmp_path / "openapi.yaml"
+    schema_path.write_text(yaml.safe_dump(openapi_schema))
+    settings.netbox_schema = f"file://{schema_path}"
+
+    assert load_schema(settings) == openapi_schema
+
+
+def test_unsupported_schema(settings: Settings, tmp_path: Path):
+    settings.netbox_schema = str(tmp_path / "openapi.txt")
+
+    with pytest.raises(ValueError, match="Unsupported schema file format: .txt"):
+        load_schema(settings)
+
+    settings.netbox_schema = "ftp://netbox.local/openapi.json"
+
+    with pytest.raises(ValueError, match="Unsupported schema URL scheme: ftp"):
+        load_schema(settings)
+
+
+async def test_load_schema_async(
+    settings: Settings,
+    tmp_path: Path,
+    openapi_schema: dict[str, Any],
+):
+    settings.netbox_schema = "http://netbox.local/api/schema"
+    settings.netbox_schema_cache_dir = str(tmp_path / "cache")
+
+    netbox_version = "4.2.6"
+    downloads = 0
+
+    def handler(request: Request) -> Response:
+        nonlocal downloads
+
+        match request.url.path:
+            case "/api/status/":
+                assert request.headers["Authorization"] == "Token t0k3n"
+                return Response(200, json={"netbox-version": netbox_version})
+
+            case "/api/schema":
+                downloads += 1
+                return Response(200, json=openapi_schema)
+
+            case _:
+                raise AssertionError(f"unexpected request: {request.url}")
+
+    transport = MockTransport(handler)
+
+    client = await NetboxClient.load(settings, transport=transport)
+    assert client.title == "NetBox REST API"
+    assert downloads == 1
+
+    # The schema is only stored under the version key.
+    assert len(list((tmp_path / "cache").glob("*.pickle"))) == 1
+
+    assert await load_schema_async(settings, transport) == openapi_schema
+    assert downloads == 1
+
+    netbox_version = "4.2.7"
+    assert await load_schema_async(settings, transport) == openapi_schema
+    assert downloads == 2
+
+
+async def test_load_schema_async_status_error(
+    settings: Settings,
+    tmp_path: Path,
+    openapi_schema: dict[str, Any],
+):
+    settings.netbox_schema = "http://netbox.local/api/schema"
+    settings.netbox_schema_cache_dir = str(tmp_path / "cache")
+
+    def handler(request: Request) -> Response:
+        match request.url.path:
+            case "/api/status/":
+                return Response(503)
+
+            case _:
+                return Response(200, json=openapi_schema)
+
+    schema = await load_schema_async(settings, MockTransport(handler))
+    assert schema == openapi_schema
+
+
+async def test_load_schema_async_file(
+    settings: Settings,
+    openapi_schema: dict[str, Any],
+):
+    assert await load_schema_async(settings) == openapi_schema
@@ -0,0 +1,81 @@
+from typing import Any
+
+import pytest
+
+from collections.abc import AsyncIterator
+import json
+
+from nopf.client._stream import ResultsDecoder
+
+
+pytestmark = pytest.mark.anyio
+
+
+async def chunked(content: bytes, size: int) -> AsyncIterator[bytes]:
+    for offset in range(0, len(content), size):
+        yield content[offset : offset + size]
+
+
+async def decode(content: bytes, size: int) -> tuple[list[Any], dict[str, Any]]:
+    decoder = ResultsDecoder(chunked(content, size))
+    items = [item async for item in decoder.items()]
+    return items, decoder.envelope
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 4096])
+async def test_results_decoder(size: int):
+    payload = {
+        "count": 12345,
+        "next": None,
+        "results": [
+            {"id": 1, "name": "Zürich", "tags": [], "weight": 1.5e3},
+            {"id": 2, "name": "東京", "description": None},
+            123456,
+            "site",
+        ],
+        "previous": "http://netbox.local/api/dcim/sites/",
+    }
+
+    items, envelope = await decode(json.dumps(payload).encode(), size)
+    assert items == payload["results"]
+    assert envelope == {
+        "count": 12345,
+        "next": None,
+        "previous": "http://netbox.local/api/dcim/sites/",
+    }
+
+    items, envelope = await decode(
+        json.dumps(payload, indent=2, ensure_ascii=False).encode(),
+        size,
+    )
+    assert items == payload["results"]
+    assert envelope["count"] == 12345
+
+
+async def test_results_decoder_empty():
+    assert await decode(b" {} ", 1) == ([], {})
+    assert await decode(b'{"count": 0, "results": [ ]}', 1) == ([], {"count": 0})
+
+
+async def test_results_decoder_large():
+    payload = {"count": 20000, "results": [{"id": i} for i in range(20000)]}
+
+    items, envelope = await decode(json.dumps(payload).encode(), 8192)
+    assert items == payload["results"]
+    assert envelope == {"count": 20000}
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        b"",
+        b"[]",
+        b'{"results": [1, 2',
+        b'{"results": [1 2]}',
+        b'{"results" [1]}',
+        b'{"results": [{"id": 1]}',
+    ],
+)
+async def test_results_decoder_invalid(content: bytes):
+    with pytest.raises(ValueError):
+        await decode(content, 3)
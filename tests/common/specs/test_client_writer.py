@@ -0,0 +1,194 @@
+from typing import Any
+
+import pytest
+
+import json
+
+import anyio
+
+from httpx import MockTransport, Request, Response
+
+from nopf.client import NetboxClient
+from nopf.client.writer import WriteCancelledError
+from nopf.settings import Settings
+
+
+pytestmark = pytest.mark.anyio
+
+
+def site(obj_id: int, **fields: Any) -> dict[str, Any]:
+    return {"id": obj_id, "name": f"site-{obj_id}", "slug": f"site-{obj_id}", **fields}
+
+
+@pytest.fixture
+def requests() -> list[tuple[str, Any]]:
+    return []
+
+
+@pytest.fixture
+def client(settings: Settings, requests: list[tuple[str, Any]]) -> NetboxClient:
+    settings.netbox_write_batch_size = 3
+    settings.netbox_write_batch_window = 0.01
+
+    async def handler(request: Request) -> Response:
+        body = json.loads(request.content)
+        requests.append((request.method, body))
+
+        # Let later flushes try to overtake this one.
+        await anyio.sleep(0.01)
+
+        match request.method:
+            case "POST":
+                return Response(
+                    201,
+                    json=[site(100 + index, **obj) for index, obj in enumerate(body)],
+                )
+
+            case _:
+                return Response(200, json=[{**site(obj["id"]), **obj} for obj in body])
+
+    return NetboxClient(settings, transport=MockTransport(handler))
+
+
+async def test_bulk_create(client: NetboxClient, requests: list[tuple[str, Any]]):
+    assert client.writer is not None
+    results: dict[str, Any] = {}
+
+    async def create(name: str) -> None:
+        results[name] = await client.writer.dcim_sites_create(body={"name": name})
+
+    async with anyio.create_task_group() as tg:
+        for name in ["a", "b", "c", "d", "e"]:
+            tg.start_soon(create, name)
+
+    assert [(method, len(body)) for method, body in requests] == [
+        ("POST", 3),
+        ("POST", 2),
+    ]
+
+    for name, result in results.items():
+        assert result.status_code == 201
+        assert result.json()["name"] == name
+        assert result.request.url.path == "/api/dcim/sites/"
+
+    assert client.writer.stats.writes == 5
+    assert client.writer.stats.flushes == 2
+
+
+async def test_bulk_partial_update(
+    client: NetboxClient,
+    requests: list[tuple[str, Any]],
+):
+    results: list[Any] = []
+
+    async def update(obj_id: int, delay: float, **fields: Any) -> None:
+        await anyio.sleep(delay)
+        results.append(
+            await client.writer.dcim_sites_partial_update(
+                params={"id": obj_id},
+                body=fields,
+            )
+        )
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(lambda: update(1, 0, description="first"))
+        tg.start_soon(lambda: update(2, 0, description="other"))
+        tg.start_soon(lambda: update(1, 0, slug="merged"))
+        # Sent while the first batch is in flight, must be applied after it.
+        tg.start_soon(lambda: update(1, 0.015, description="second"))
+
+    assert requests == [
+        (
+            "PATCH",
+            [
+                {"id": 1, "description": "first", "slug": "merged"},
+                {"id": 2, "description": "other"},
+            ],
+        ),
+        ("PATCH", [{"id": 1, "description": "second"}]),
+    ]
+
+    assert [result.json()["description"] for result in results] == [
+        "first",
+        "other",
+        "first",
+        "second",
+    ]
+    assert str(results[0].request.url) == "http://netbox.local/api/dcim/sites/1/"
+
+
+async def test_writer_errors(settings: Settings):
+    settings.netbox_write_batch_size = 10
+    settings.netbox_write_batch_window = 0
+    status_code = 400
+
+    def handler(request: Request) -> Response:
+        if status_code == 0:
+            raise RuntimeError("connection reset")
+
+        return Response(status_code, json={"name": ["This field is required."]})
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+    assert client.writer is not None
+
+    result = await client.writer.dcim_sites_create(body={})
+    assert result.status_code == 400
+
+    result = await client.writer.dcim_sites_partial_update(params={"id": 1}, body={})
+    assert result.status_code == 400
+
+    status_code = 0
+
+    async def create() -> None:
+        with pytest.raises(RuntimeError):
+            await client.writer.dcim_sites_create(body={})
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(create)
+        tg.start_soon(create)
+
+    with pytest.raises(KeyError, match="dcim_sites_list"):
+        _ = client.writer.dcim_sites_list
+
+    with pytest.raises(KeyError, match="dcim_sites_bulk_partial_update"):
+        _ = client.writer.dcim_sites_bulk_partial_update
+
+    with pytest.raises(KeyError, match="dcim_regions_create"):
+        _ = client.writer.dcim_regions_create
+
+
+async def test_writer_cancelled(
+    client: NetboxClient,
+    requests: list[tuple[str, Any]],
+):
+    assert client.writer is not None
+    errors: list[WriteCancelledError] = []
+
+    async def follow(name: str) -> None:
+        with pytest.raises(WriteCancelledError) as excinfo:
+            await client.writer.dcim_sites_create(body={"name": name})
+
+        errors.append(excinfo.value)
+
+    async with anyio.create_task_group() as tg:
+        # The caller flushing the batch leaves as soon as it is cancelled.
+        with anyio.fail_after(1), anyio.move_on_after(0.001):
+            tg.start_soon(follow, "b")
+            await client.writer.dcim_sites_create(body={"name": "a"})
+
+    assert requests == []
+    assert [error.sent for error in errors] == [False]
+
+    async with anyio.create_task_group() as tg:
+        # Cancelled while the bulk request is sent.
+        with anyio.move_on_after(0.015):
+            tg.start_soon(follow, "d")
+            await client.writer.dcim_sites_create(body={"name": "c"})
+
+    assert requests == [("POST", [{"name": "c"}, {"name": "d"}])]
+    assert [error.sent for error in errors] == [False, True]
+
+
+def test_writer_disabled(settings: Settings):
+    client = NetboxClient(settings)
+    assert client.writer is None
@@ -3,6 +3,8 @@ import anyio
 
 from nopf.core.channel import (
     create_channel,
+    ChannelFullError,
+    ChannelLimits,
     ChannelSender,
     ChannelReceiver,
     EventCustom,
@@ -122,3 +124,95 @@ async def test_receiver_closed():
 
     with pytest.raises(anyio.BrokenResourceError):
         await sender.send(EventCustom(data="hello"))
+
+
+def test_limits_max_events():
+    limits = ChannelLimits(max_events=2)
+    events = [EventCustom(data=str(i)) for i in range(3)]
+
+    limits.admit(events[0], 10)
+    limits.admit(events[1], 10)
+
+    with pytest.raises(ChannelFullError):
+        limits.admit(events[2], 10)
+
+    assert limits.stats.model_dump() == {"depth": 2, "bytes": 20, "shed": 1}
+
+    limits.release(events[0])
+    limits.release(events[0])
+    limits.admit(events[2], 10)
+
+    assert limits.stats.model_dump() == {"depth": 2, "bytes": 20, "shed": 1}
+
+
+def test_limits_max_bytes():
+    limits = ChannelLimits(max_bytes=100)
+    events = [EventCustom(data=str(i)) for i in range(3)]
+
+    # An event larger than the limit is admitted when the channel is empty.
+    limits.admit(events[0], 150)
+
+    with pytest.raises(ChannelFullError):
+        limits.admit(events[1], 1)
+
+    limits.release(events[0])
+    limits.admit(events[1], 60)
+
+    with pytest.raises(ChannelFullError):
+        limits.admit(events[2], 50)
+
+    assert limits.stats.model_dump() == {"depth": 1, "bytes": 60, "shed": 2}
+
+
+async def test_buffered_channel():
+    limits = ChannelLimits()
+    sender, receiver = create_channel(limits=limits)
+    event = EventCustom(data="hello")
+
+    # Posted events do not wait for a consumer, even without limits.
+    with anyio.fail_after(1):
+        sender.admit(event, 5)
+        await sender.post(event)
+
+    assert limits.stats.depth == 1
+
+    _, received = await receiver.stream.receive()
+    receiver.ack(received)
+    assert limits.stats.depth == 0
+
+    sender.admit(event, 5)
+    sender.release(event)
+    assert limits.stats.depth == 0
+
+
+async def test_release_not_enqueued():
+    limits = ChannelLimits()
+    sender, receiver = create_channel(limits=limits)
+    event = EventCustom(data="hello")
+
+    # The event could not be enqueued, its room is released.
+    await receiver.aclose()
+    sender.admit(event, 5)
+
+    with pytest.raises(anyio.BrokenResourceError):
+        await sender.send(event)
+
+    assert limits.stats.depth == 0
+
+
+async def test_keep_enqueued():
+    limits = ChannelLimits()
+    sender, receiver = create_channel(limits=limits)
+    event = EventCustom(data="hello")
+
+    # The sender stops waiting for the response (i.e. the client
+    # disconnected), but the event is still waiting to be processed.
+    with anyio.move_on_after(0.01):
+        sender.admit(event, 5)
+        await sender.send(event)
+
+    assert limits.stats.depth == 1
+
+    _, received = await receiver.stream.receive()
+    receiver.ack(received)
+    assert limits.stats.depth == 0
@@ -0,0 +1,112 @@
+import pytest
+import anyio
+
+from nopf.core.channel import ChannelMessage, EventDelete, EventUpdate
+from nopf.core.coalescing import UpdateCoalescer, merge_updates
+from nopf.schema import WebhookPayload
+
+
+pytestmark = pytest.mark.anyio
+
+
+def payload(event: str, obj_id: int, name: str, prev: str | None) -> WebhookPayload:
+    data = {"id": obj_id, "name": name}
+    return WebhookPayload(
+        event=event,
+        timestamp="2025-01-01T00:00:00Z",
+        model="dcim.site",
+        username="admin",
+        request_id=f"request-{name}",
+        data=data,
+        snapshots={
+            "prechange": {"id": obj_id, "name": prev} if prev else None,
+            "postchange": data,
+        },
+    )
+
+
+def update_event(obj_id: int, name: str, prev: str) -> EventUpdate:
+    return EventUpdate(payload=payload("updated", obj_id, name, prev))
+
+
+def test_merge_updates():
+    first = update_event(1, "b", "a")
+    last = update_event(1, "c", "b")
+    merged = merge_updates(first, last)
+
+    assert merged.payload.data == {"id": 1, "name": "c"}
+    assert merged.payload.request_id == "request-c"
+    assert merged.payload.snapshots.prechange == {"id": 1, "name": "a"}
+    assert merged.payload.snapshots.postchange == {"id": 1, "name": "c"}
+
+
+async def test_coalesce_updates():
+    flushed: list[tuple[EventUpdate, list[ChannelMessage]]] = []
+
+    async def flush(event: EventUpdate, messages: list[ChannelMessage]) -> None:
+        flushed.append((event, messages))
+
+    coalescer = UpdateCoalescer(0.05, flush)
+    events = [
+        update_event(1, "b", "a"),
+        update_event(2, "x", "w"),
+        update_event(1, "c", "b"),
+        update_event(1, "d", "c"),
+    ]
+
+    async with anyio.create_task_group() as tg:
+        await tg.start(coalescer.run)
+
+        for event in events:
+            coalescer.hold(None, event)
+
+        assert coalescer.pending == 2
+        assert coalescer.coalesced == 2
+        assert flushed == []
+
+        await anyio.sleep(0.1)
+        assert coalescer.pending == 0
+
+        # A new window starts with the next update.
+        last_event = update_event(1, "e", "d")
+        coalescer.hold(None, last_event)
+        assert coalescer.pending == 1
+
+        # The pending updates are flushed once the coalescer is closed.
+        coalescer.close()
+
+    assert [event for event, _ in flushed] == [
+        merge_updates(events[0], events[3]),
+        events[1],
+        last_event,
+    ]
+    assert flushed[0][1] == [(None, events[0]), (None, events[2]), (None, events[3])]
+    assert flushed[1][1] == [(None, events[1])]
+
+
+async def test_delete_cancels_updates():
+    flushed = []
+
+    async def flush(event: EventUpdate, messages: list[ChannelMessage]) -> None:
+        flushed.append(event)
+
+    coalescer = UpdateCoalescer(0.05, flush)
+    events = [update_event(1, "b", "a"), update_event(1, "c", "b")]
+
+    async with anyio.create_task_group() as tg:
+        await tg.start(coalescer.run)
+
+        for event in events:
+            coalescer.hold(None, event)
+
+        deleted = EventDelete(payload=payload("deleted", 1, "c", "c"))
+        assert coalescer.cancel(deleted) == [(None, event) for event in events]
+        assert coalescer.pending == 0
+
+        # Nothing is pending for the object anymore.
+        assert coalescer.cancel(deleted) == []
+
+        await anyio.sleep(0.1)
+        coalescer.close()
+
+    assert flushed == []
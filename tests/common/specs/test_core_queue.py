@@ -0,0 +1,223 @@
+from pathlib import Path
+
+import sqlite3
+
+import pytest
+import anyio
+
+from nopf.core.channel import (
+    create_channel,
+    ChannelReceiver,
+    EventCreate,
+    EventCustom,
+    EventDelete,
+    EventUpdate,
+)
+from nopf.core.queue import DurableQueue, decode_event, encode_event
+from nopf.schema import WebhookPayload
+
+
+pytestmark = pytest.mark.anyio
+
+
+def payload(event: str, obj_id: int) -> WebhookPayload:
+    data = {"id": obj_id}
+    return WebhookPayload(
+        event=event,
+        timestamp="2025-01-01T00:00:00Z",
+        model="dcim.site",
+        username="admin",
+        request_id="00000000-0000-0000-0000-000000000000",
+        data=data,
+        snapshots={"prechange": None, "postchange": data},
+    )
+
+
+def test_encode_event():
+    for event in [
+        EventCreate(payload=payload("created", 1)),
+        EventUpdate(payload=payload("updated", 1)),
+        EventDelete(payload=payload("deleted", 1)),
+    ]:
+        assert decode_event(encode_event(event)) == event
+
+
+async def test_group_commit(tmp_path: Path):
+    queue = DurableQueue(str(tmp_path / "events.db"), commit_interval=0.05)
+    events = [EventUpdate(payload=payload("updated", i)) for i in range(10)]
+
+    async with anyio.create_task_group() as tg:
+        await tg.start(queue.run)
+
+        async with anyio.create_task_group() as producers:
+            for event in events:
+                producers.start_soon(queue.put, event)
+
+        # All events were committed in a single transaction.
+        assert queue.commits == 1
+        assert queue.depth == 10
+
+        for event in events[:4]:
+            queue.ack(event)
+
+        # Unknown events are ignored.
+        queue.ack(EventCustom(data="hello"))
+
+        tg.cancel_scope.cancel()
+
+    # Acknowledgements are committed when the queue is closed.
+    queue = DurableQueue(str(tmp_path / "events.db"))
+    await queue.open()
+
+    try:
+        assert queue.pending() == events[4:]
+
+    finally:
+        await queue.close()
+
+
+async def test_max_batch(tmp_path: Path):
+    queue = DurableQueue(
+        str(tmp_path / "events.db"),
+        commit_interval=10.0,
+        max_batch=2,
+    )
+
+    async with anyio.create_task_group() as tg:
+        await tg.start(queue.run)
+
+        # The transaction is committed as soon as it is full.
+        with anyio.fail_after(5):
+            async with anyio.create_task_group() as producers:
+                for i in range(2):
+                    producers.start_soon(
+                        queue.put,
+                        EventCreate(payload=payload("created", i)),
+                    )
+
+        assert queue.commits == 1
+
+        with anyio.move_on_after(0.1):
+            await queue.put(EventCreate(payload=payload("created", 2)))
+
+        assert queue.commits == 1
+        tg.cancel_scope.cancel()
+
+
+async def test_commit_error(tmp_path: Path):
+    queue = DurableQueue(str(tmp_path / "events.db"), commit_interval=0.0)
+    event = EventCreate(payload=payload("created", 1))
+
+    async with anyio.create_task_group() as tg:
+        await tg.start(queue.run)
+        await queue.put(event)
+
+        # The next event reuses an existing row ID.
+        queue._next_id = 1
+
+        with pytest.raises(Exception, match="UNIQUE constraint"):
+            await queue.put(EventCreate(payload=payload("created", 2)))
+
+        assert queue.depth == 1
+        tg.cancel_scope.cancel()
+
+
+async def test_dead_letter(tmp_path: Path):
+    path = str(tmp_path / "events.db")
+    event = EventCreate(payload=payload("created", 1))
+
+    async with anyio.create_task_group() as tg:
+        await tg.start(DurableQueue(path).run)
+        tg.cancel_scope.cancel()
+
+    conn = sqlite3.connect(path)
+
+    with conn:
+        conn.execute('INSERT INTO events VALUES (1, \'{"type": "unknown"}\')')
+        conn.execute("INSERT INTO events VALUES (2, ?)", (encode_event(event),))
+
+    # The undecodable event is skipped and moved to the dead-letter table.
+    queue = DurableQueue(path, commit_interval=0.0)
+
+    async with anyio.create_task_group() as tg:
+        await tg.start(queue.run)
+        assert queue.pending() == [event]
+        await queue.commit()
+        tg.cancel_scope.cancel()
+
+    assert conn.execute("SELECT id FROM events").fetchall() == [(2,)]
+    assert conn.execute("SELECT id FROM dead_events").fetchall() == [(1,)]
+    conn.close()
+
+
+async def test_put_after_close(tmp_path: Path):
+    queue = DurableQueue(str(tmp_path / "events.db"))
+
+    async with anyio.create_task_group() as tg:
+        await tg.start(queue.run)
+        tg.cancel_scope.cancel()
+
+    with pytest.raises(anyio.ClosedResourceError):
+        await queue.put(EventCreate(payload=payload("created", 1)))
+
+
+async def test_channel_replay(tmp_path: Path):
+    path = str(tmp_path / "events.db")
+    processed = []
+
+    async def consumer(rx: ChannelReceiver, ack: bool) -> None:
+        async for resp_tx, event in rx.stream:
+            processed.append(event)
+
+            if ack:
+                rx.ack(event)
+
+            if resp_tx is not None:
+                await resp_tx.send(None)
+
+    # The operator stops before the event is acknowledged.
+    queue = DurableQueue(path)
+    event = EventUpdate(payload=payload("updated", 1))
+
+    async with anyio.create_task_group() as tg:
+        await tg.start(queue.run)
+        tx, rx = create_channel(queue)
+        tg.start_soon(consumer, rx, False)
+
+        await tx.send(event)
+        await tx.post(EventCustom(data="hello"))
+        tg.cancel_scope.cancel()
+
+    assert processed == [event, EventCustom(data="hello")]
+
+    # Only the webhook event is processed again after a restart.
+    processed.clear()
+    queue = DurableQueue(path)
+
+    async with anyio.create_task_group() as tg:
+        await tg.start(queue.run)
+        tx, rx = create_channel(queue)
+        tg.start_soon(consumer, rx.clone(), True)
+
+        await tx.replay()
+        await anyio.wait_all_tasks_blocked()
+        tg.cancel_scope.cancel()
+
+    assert processed == [event]
+
+    queue = DurableQueue(path)
+    await queue.open()
+
+    try:
+        assert queue.pending() == []
+
+    finally:
+        await queue.close()
+
+
+async def test_memory_channel():
+    tx, rx = create_channel()
+
+    # Without a durable queue, there is nothing to replay or acknowledge.
+    await tx.replay()
+    rx.ack(EventCustom(data="hello"))
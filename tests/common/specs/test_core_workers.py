@@ -0,0 +1,96 @@
+import pytest
+import anyio
+
+from nopf.core.channel import EventCustom, EventUpdate
+from nopf.core.workers import OrderedWorkerPool, default_event_key
+from nopf.schema import WebhookPayload
+
+
+pytestmark = pytest.mark.anyio
+
+
+def update_event(model: str, obj_id: int) -> EventUpdate:
+    data = {"id": obj_id}
+    return EventUpdate(
+        payload=WebhookPayload(
+            event="updated",
+            timestamp="2025-01-01T00:00:00Z",
+            model=model,
+            username="admin",
+            request_id="00000000-0000-0000-0000-000000000000",
+            data=data,
+            snapshots={"prechange": None, "postchange": data},
+        ),
+    )
+
+
+def test_default_event_key():
+    assert default_event_key(update_event("dcim.site", 1)) == ("dcim.site", 1)
+    assert default_event_key(update_event("dcim.site", 1)) != default_event_key(
+        update_event("dcim.region", 1),
+    )
+    assert default_event_key(EventCustom(data="hello")) is None
+
+
+async def test_ordered_per_key():
+    pool = OrderedWorkerPool(size=4, queue_depth=10)
+    processed = []
+
+    def job(name: str, delay: float):
+        async def run() -> None:
+            await anyio.sleep(delay)
+            processed.append(name)
+
+        return run
+
+    async with anyio.create_task_group() as tg:
+        await tg.start(pool.run)
+
+        await pool.submit("a", job("a1", 0.05))
+        await pool.submit("b", job("b1", 0.01))
+        await pool.submit("a", job("a2", 0.0))
+        await pool.submit("b", job("b2", 0.0))
+        assert pool.queued == 2
+
+        pool.close()
+
+    # Keys are processed concurrently, jobs of a key in order.
+    assert processed == ["b1", "b2", "a1", "a2"]
+    assert pool.queued == 0
+
+
+async def test_queue_depth():
+    pool = OrderedWorkerPool(size=1, queue_depth=1)
+    release = anyio.Event()
+    submitted = 0
+
+    async def blocked() -> None:
+        await release.wait()
+
+    async def submit_all() -> None:
+        nonlocal submitted
+
+        for key in ["a", "b", "c"]:
+            await pool.submit(key, blocked)
+            submitted += 1
+
+    async with anyio.create_task_group() as tg:
+        await tg.start(pool.run)
+        tg.start_soon(submit_all)
+        await anyio.wait_all_tasks_blocked()
+
+        # The first job is running, the second one is queued.
+        assert submitted == 2
+        assert pool.queued == 1
+
+        release.set()
+        await anyio.wait_all_tasks_blocked()
+        assert submitted == 3
+
+        pool.close()
+
+
+@pytest.mark.parametrize("size, queue_depth", [(0, 1), (1, 0)])
+def test_invalid_pool(size: int, queue_depth: int):
+    with pytest.raises(ValueError, match="Invalid worker pool"):
+        OrderedWorkerPool(size=size, queue_depth=queue_depth)
@@ -1,8 +1,149 @@
 import pytest
 
-from nopf.client import Version
+from httpx import ConnectError, MockTransport, Request, Response
+
+from nopf.client import NetboxClient, Version
+from nopf.settings import Settings
+
+
+pytestmark = pytest.mark.anyio
 
 
 def test_invalid_version():
     with pytest.raises(ValueError):
         Version("invalid")
+
+
+async def test_validation_stats(settings: Settings):
+    settings.netbox_response_validation = "sampled"
+    settings.netbox_response_validation_sample_interval = 2
+
+    def handler(request: Request) -> Response:
+        return Response(200, json={"id": 1, "name": "site", "slug": "site"})
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+
+    assert client.title == "NetBox REST API"
+    assert client.operations.dcim_sites_retrieve.validation.mode == "sampled"
+
+    for _ in range(3):
+        await client.operations.dcim_sites_retrieve(params={"id": 1})
+
+    await client.operations.dcim_sites_partial_update(params={"id": 1}, body={})
+
+    stats = client.validation_stats
+    assert stats.validated == 3
+    assert stats.skipped == 1
+
+
+def test_lazy_operations(settings: Settings):
+    client = NetboxClient(settings)
+
+    assert list(client.operations) == []
+
+    operation = client.operations.dcim_sites_retrieve
+    assert operation.name == "dcim_sites_retrieve"
+    assert operation.__doc__ == "Get a site object."
+    assert client.operations.dcim_sites_retrieve is operation
+    assert list(client.operations) == [operation]
+
+    with pytest.raises(KeyError, match="unknown_operation"):
+        _ = client.operations.unknown_operation
+
+
+def test_warmup(settings: Settings):
+    client = NetboxClient(settings)
+    client.operations.warmup(["dcim_sites_list", "dcim_sites_destroy"])
+
+    assert sorted(operation.name for operation in client.operations) == [
+        "dcim_sites_destroy",
+        "dcim_sites_list",
+    ]
+
+
+def test_warmup_unknown_operation(settings: Settings):
+    client = NetboxClient(settings)
+    client.operations.warmup(["unknown_operation", "dcim_sites_list"])
+
+    assert [operation.name for operation in client.operations] == [
+        "dcim_sites_list",
+    ]
+
+
+async def test_timeouts(settings: Settings):
+    settings.netbox_timeout = 2.0
+    settings.netbox_operation_timeouts = {"dcim_sites_list": 30.0}
+    timeouts = {}
+
+    def handler(request: Request) -> Response:
+        timeouts[request.url.path] = request.extensions["timeout"]["read"]
+
+        if request.url.path == "/api/dcim/sites/":
+            return Response(200, json={"count": 0, "results": []})
+
+        return Response(200, json={"id": 1, "name": "site", "slug": "site"})
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+
+    await client.operations.dcim_sites_list()
+    await client.operations.dcim_sites_retrieve(params={"id": 1})
+
+    async for _ in client.operations.dcim_sites_list.stream():
+        pass
+
+    assert timeouts == {"/api/dcim/sites/": 30.0, "/api/dcim/sites/1/": 2.0}
+
+
+async def test_default_projection(settings: Settings):
+    settings.netbox_exclude_fields = ["config_context"]
+    settings.netbox_omit_fields = ["custom_fields", "tags"]
+    queries = []
+
+    def handler(request: Request) -> Response:
+        queries.append(dict(request.url.params))
+        return Response(200, json={"id": 1, "name": "site"})
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+    await client.operations.dcim_sites_retrieve(params={"id": 1})
+    await client.operations.status_retrieve()
+
+    # Only the reads of model objects are projected.
+    assert queries == [
+        {"exclude": "config_context", "omit": "custom_fields,tags"},
+        {},
+    ]
+
+
+def test_operation_timeouts_from_env(
+    settings: Settings,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setenv(
+        "NETBOX_OPERATION_TIMEOUTS",
+        "dcim_devices_list=30, dcim_sites_list=2.5",
+    )
+    settings = Settings(**settings.model_dump(exclude={"netbox_operation_timeouts"}))
+
+    assert settings.netbox_operation_timeouts == {
+        "dcim_devices_list": 30.0,
+        "dcim_sites_list": 2.5,
+    }
+
+
+async def test_prewarm(settings: Settings):
+    requests = 0
+
+    def handler(request: Request) -> Response:
+        nonlocal requests
+        requests += 1
+        assert request.url.path == "/api/status/"
+
+        if requests == 1:
+            raise ConnectError("Connection refused")
+
+        return Response(200, json={"netbox-version": "4.2.6"})
+
+    client = NetboxClient(settings, transport=MockTransport(handler))
+    await client.prewarm(3)
+
+    assert requests == 3
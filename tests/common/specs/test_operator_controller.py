@@ -0,0 +1,362 @@
+from typing import Any
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from collections.abc import Iterator
+from functools import partial
+from pathlib import Path
+
+import anyio
+import logbook
+from pydantic import ValidationError
+
+from nopf.client import _client
+from nopf.core.channel import (
+    ChannelFullError,
+    ChannelLimits,
+    Event,
+    EventCreate,
+    EventCustom,
+    EventDelete,
+    EventUpdate,
+)
+from nopf.core.handlers import Handlers
+from nopf.core.queue import DurableQueue
+from nopf.operator import ASYNC_ACK_MAX_EVENTS, channel_limits
+from nopf.operator.controller import task as controller_task
+from nopf.schema import WebhookPayload
+from nopf.settings import Settings
+
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        self.invalidated: list[WebhookPayload] = []
+
+    def invalidate(self, payload: WebhookPayload) -> None:
+        self.invalidated.append(payload)
+
+
+def payload(event: str, obj_id: int, name: str) -> WebhookPayload:
+    data = {"id": obj_id, "name": name}
+    return WebhookPayload(
+        event=event,
+        timestamp="2025-01-01T00:00:00Z",
+        model="dcim.site",
+        username="admin",
+        request_id=f"request-{name}",
+        data=data,
+        snapshots={"prechange": None, "postchange": data},
+    )
+
+
+@pytest.fixture
+def client() -> Iterator[FakeClient]:
+    client = FakeClient()
+    token = _client.set(client)  # type: ignore[arg-type]
+
+    try:
+        yield client
+
+    finally:
+        _client.reset(token)
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+async def test_dispatch(client: FakeClient, workers: int):
+    handlers = Handlers()
+    on_create = AsyncMock()
+    on_delete = AsyncMock()
+    on_custom = AsyncMock()
+
+    async def on_update(payload: WebhookPayload) -> None:
+        raise ValueError("update failed")
+
+    handlers.add_create_handler("dcim.site", on_create)
+    handlers.add_update_handler("dcim.site", on_update)
+    handlers.add_delete_handler("dcim.site", on_delete)
+    handlers.add_custom_handler(on_custom)
+
+    created = payload("created", 1, "a")
+    updated = payload("updated", 1, "b")
+    deleted = payload("deleted", 1, "b")
+
+    async with anyio.create_task_group() as tg:
+        tx = await tg.start(controller_task, handlers, workers)
+
+        await tx.send(EventCreate(payload=created))
+        await tx.send(EventCustom(data="hello"))
+
+        # Handler errors are raised to the sender.
+        with pytest.raises(ValueError, match="update failed"):
+            await tx.send(EventUpdate(payload=updated))
+
+        # Or logged, if nobody waits for the event.
+        # The events are processed by another task.
+        with logbook.TestHandler().applicationbound() as log:
+            await tx.post(EventUpdate(payload=updated))
+            await tx.send(EventDelete(payload=deleted))
+
+        [record] = log.records
+        assert record.message == "Unhandled exception in event handler"
+        assert record.extra["event.type"] == "EventUpdate"
+        assert record.extra["event.model"] == "dcim.site"
+        assert record.extra["event.id"] == 1
+        assert record.extra["event.request_id"] == "request-b"
+
+        with pytest.raises(ValueError, match="Invalid event type"):
+            await tx.send(object())  # type: ignore[arg-type]
+
+        await tx.aclose()
+
+    on_create.assert_awaited_once_with(created)
+    on_delete.assert_awaited_once_with(deleted)
+    on_custom.assert_awaited_once_with("hello")
+
+    # The cached objects are invalidated when their event is received, and
+    # again before the handlers are called.
+    assert client.invalidated == [
+        created,
+        created,
+        updated,
+        updated,
+        updated,
+        updated,
+        deleted,
+        deleted,
+    ]
+
+
+@pytest.mark.parametrize(
+    "env",
+    ["NOPF_CONTROLLER_WORKERS", "NOPF_CONTROLLER_QUEUE_DEPTH"],
+)
+def test_invalid_settings(
+    settings: Settings,
+    monkeypatch: pytest.MonkeyPatch,
+    env: str,
+):
+    monkeypatch.setenv(env, "0")
+    fields = {"controller_workers", "controller_queue_depth"}
+
+    with pytest.raises(ValidationError):
+        Settings(**settings.model_dump(exclude=fields))
+
+
+def test_async_ack_limits(settings: Settings):
+    assert channel_limits(settings).max_events == 0
+
+    # Acknowledged events are bounded, unless a limit is configured.
+    settings.server_async_ack = True
+    assert channel_limits(settings).max_events == ASYNC_ACK_MAX_EVENTS
+
+    settings.channel_max_bytes = 1024
+    limits = channel_limits(settings)
+    assert (limits.max_events, limits.max_bytes) == (0, 1024)
+
+
+async def test_event_key_error():
+    handlers = Handlers()
+
+    def event_key(event: Event) -> Any:
+        raise KeyError("site")
+
+    async with anyio.create_task_group() as tg:
+        tx = await tg.start(
+            partial(controller_task, handlers, 4, event_key=event_key),
+        )
+
+        with pytest.raises(KeyError, match="site"):
+            await tx.send(EventCustom(data="hello"))
+
+        await tx.aclose()
+
+
+async def test_coalescing_event_key_error():
+    handlers = Handlers()
+
+    def event_key(event: Event) -> Any:
+        raise KeyError("site")
+
+    async with anyio.create_task_group() as tg:
+        tx = await tg.start(
+            partial(
+                controller_task, handlers, event_key=event_key, coalesce_window=0.1
+            ),
+        )
+
+        # The update is not held, the error is raised to the sender.
+        with pytest.raises(KeyError, match="site"):
+            await tx.send(EventUpdate(payload=payload("updated", 1, "a")))
+
+        await tx.aclose()
+
+
+async def test_load_shedding():
+    handlers = Handlers()
+    limits = ChannelLimits(max_events=1)
+    release = anyio.Event()
+
+    async def on_update(payload: WebhookPayload) -> None:
+        await release.wait()
+
+    handlers.add_update_handler("dcim.site", on_update)
+    first = EventUpdate(payload=payload("updated", 1, "a"))
+    second = EventUpdate(payload=payload("updated", 2, "b"))
+
+    async with anyio.create_task_group() as tg:
+        tx = await tg.start(partial(controller_task, handlers, limits=limits))
+
+        tx.admit(first, 10)
+        await tx.post(first)
+
+        # The first event is still being processed.
+        with pytest.raises(ChannelFullError):
+            tx.admit(second, 10)
+
+        assert limits.stats.model_dump() == {"depth": 1, "bytes": 10, "shed": 1}
+
+        release.set()
+        await anyio.wait_all_tasks_blocked()
+        assert limits.stats.depth == 0
+
+        tx.admit(second, 10)
+        await tx.send(second)
+        assert limits.stats.depth == 0
+
+        await tx.aclose()
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+async def test_coalescing(client: FakeClient, workers: int):
+    handlers = Handlers()
+    updates: list[WebhookPayload] = []
+    on_delete = AsyncMock()
+
+    async def on_update(payload: WebhookPayload) -> None:
+        updates.append(payload)
+
+    handlers.add_update_handler("dcim.site", on_update)
+    handlers.add_delete_handler("dcim.site", on_delete)
+
+    async with anyio.create_task_group() as tg:
+        tx = await tg.start(
+            partial(controller_task, handlers, workers, coalesce_window=0.2),
+        )
+
+        async with anyio.create_task_group() as senders:
+            # Successive updates of an object are processed once.
+            for name in ["a", "b", "c"]:
+                senders.start_soon(
+                    tx.send,
+                    EventUpdate(payload=payload("updated", 1, name)),
+                )
+
+            await tx.post(EventUpdate(payload=payload("updated", 2, "x")))
+
+            # The held updates are invalidated when received.
+            await anyio.wait_all_tasks_blocked()
+            assert len(client.invalidated) == 4
+            assert updates == []
+
+        assert sorted(update.data["name"] for update in updates) == ["c", "x"]
+
+        # A delete cancels the pending updates, their senders are answered.
+        updates.clear()
+
+        async with anyio.create_task_group() as senders:
+            senders.start_soon(
+                tx.send,
+                EventUpdate(payload=payload("updated", 1, "d")),
+            )
+            await anyio.sleep(0.01)
+            await tx.send(EventDelete(payload=payload("deleted", 1, "d")))
+
+        assert updates == []
+        on_delete.assert_awaited_once()
+
+        # The pending updates are flushed when the controller stops.
+        await tx.post(EventUpdate(payload=payload("updated", 3, "y")))
+        await tx.aclose()
+
+    assert [update.data["name"] for update in updates] == ["y"]
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+async def test_replay_order(tmp_path: Path, workers: int):
+    path = str(tmp_path / "events.db")
+
+    # The operator stops before the event is processed.
+    queue = DurableQueue(path)
+
+    async with anyio.create_task_group() as tg:
+        await tg.start(queue.run)
+        await queue.put(EventUpdate(payload=payload("updated", 1, "old")))
+        tg.cancel_scope.cancel()
+
+    handlers = Handlers()
+    processed = []
+
+    async def on_update(payload: WebhookPayload) -> None:
+        processed.append(payload.data["name"])
+
+    handlers.add_update_handler("dcim.site", on_update)
+    queue = DurableQueue(path)
+    limits = ChannelLimits()
+
+    async with anyio.create_task_group() as tg:
+        await tg.start(queue.run)
+        tx = await tg.start(
+            partial(controller_task, handlers, workers, queue=queue, limits=limits),
+        )
+
+        # The recovered event is enqueued (and counted) before the controller
+        # accepts new events.
+        assert limits.stats.depth == 1
+
+        await tx.send(EventUpdate(payload=payload("updated", 1, "new")))
+        assert processed == ["old", "new"]
+        assert limits.stats.depth == 0
+
+        assert queue.depth == 0
+        tg.cancel_scope.cancel()
+
+
+async def test_coalescing_event_key():
+    handlers = Handlers()
+    updates: list[WebhookPayload] = []
+
+    async def on_update(payload: WebhookPayload) -> None:
+        updates.append(payload)
+
+    def event_key(event: Event) -> Any:
+        return event.payload.model  # type: ignore[attr-defined]
+
+    on_create = AsyncMock()
+    handlers.add_create_handler("dcim.site", on_create)
+    handlers.add_update_handler("dcim.site", on_update)
+
+    async with anyio.create_task_group() as tg:
+        tx = await tg.start(
+            partial(
+                controller_task,
+                handlers,
+                4,
+                event_key=event_key,
+                coalesce_window=0.1,
+            ),
+        )
+
+        await tx.send(EventCreate(payload=payload("created", 1, "a")))
+
+        # The updates are grouped by the ordering key.
+        await tx.post(EventUpdate(payload=payload("updated", 1, "a")))
+        await tx.post(EventUpdate(payload=payload("updated", 2, "b")))
+        await tx.aclose()
+
+    on_create.assert_awaited_once()
+    assert [update.data["name"] for update in updates] == ["b"]
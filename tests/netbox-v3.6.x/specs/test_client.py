@@ -1,5 +1,6 @@
 import pytest
 
+from pathlib import Path
 import re
 
 from nopf.client import NetboxClient
@@ -30,6 +31,31 @@ async def test_from_api(netbox_token: str):
     assert client.license == "Apache v2 License"
 
 
+async def test_load_from_api(netbox_token: str, tmp_path: Path):
+    settings = Settings(
+        netbox_api="http://localhost:8080",
+        netbox_token=netbox_token,
+        server_bind_host="0.0.0.0",
+        server_bind_port=5000,
+        server_callback_name="pytest",
+        server_callback_url="http://host.docker.internal:5000",
+        netbox_schema_cache_dir=str(tmp_path / "cache"),
+    )
+
+    client = await NetboxClient.load(settings)
+    assert (tmp_path / "cache").exists()
+
+    client = await NetboxClient.load(settings)
+
+    assert client.title == "NetBox REST API"
+    assert client.version.major == 3
+    assert client.version.minor == 6
+    assert client.version.patch == 9
+    assert client.version.meta == ""
+    assert str(client.version) == "3.6.9 (3.6)"
+    assert client.license == "Apache v2 License"
+
+
 async def test_from_json_file(netbox_token: str):
     settings = Settings(
         netbox_api="http://localhost:8080",
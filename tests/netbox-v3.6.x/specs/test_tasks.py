@@ -4,10 +4,12 @@ import pytest
 from threading import Event
 
 from anyio.abc import TaskStatus
-from anyio import to_thread, sleep
+from anyio import create_task_group, to_thread, sleep
 
-from nopf.core.channel import ChannelSender, EventCustom
+from nopf.core.channel import ChannelSender, Event as ChannelEvent, EventCustom
 
+from nopf.client import NetboxClient
+from nopf.client.priority import current_priority
 from nopf.operator import Operator
 from nopf.settings import Settings
 
@@ -52,3 +54,147 @@ async def test_send_custom_event(settings: Settings):
         await sleep(0.5)
 
     custom_notifier.assert_called_once_with("test")
+
+
+async def test_post_custom_event(settings: Settings):
+    op = Operator(settings)
+
+    custom_notifier = MagicMock()
+
+    @op.task
+    async def notify(tx: ChannelSender, task_status: TaskStatus[None]):
+        task_status.started()
+
+        # Handler errors are logged, they are not sent back to the task.
+        await tx.post(EventCustom(data="fail"))
+        await tx.post(EventCustom(data="test"))
+
+    @op.on_custom
+    async def on_custom_event(data: str):
+        if data == "fail":
+            raise RuntimeError("test")
+
+        custom_notifier(data)
+
+    async with run_operator(op):
+        await sleep(0.5)
+
+    custom_notifier.assert_called_once_with("test")
+
+
+async def test_warmup_operations(settings: Settings):
+    settings.netbox_warmup_operations = [
+        "dcim_sites_list",
+        "dcim_sites_retrieve",
+        "unknown_operation",
+    ]
+    op = Operator(settings)
+    clients = []
+
+    @op.task
+    async def notify(tx: ChannelSender, task_status: TaskStatus[None]):
+        task_status.started()
+
+        clients.append(NetboxClient.main())
+
+    async with run_operator(op):
+        await sleep(0.5)
+
+    # The operations were built and compiled before their first call, the
+    # unknown operation was skipped.
+    [client] = clients
+    operations = sorted(client.operations, key=lambda operation: operation.name)
+    assert [operation.name for operation in operations] == [
+        "dcim_sites_list",
+        "dcim_sites_retrieve",
+    ]
+
+    compiled = {pointer for pointer, _ in client._validators._validators}
+
+    for operation in operations:
+        assert operation._response_pointer("200") in compiled
+
+
+async def test_prewarm_connections(settings: Settings):
+    settings.netbox_prewarm_connections = 3
+    op = Operator(settings)
+    connections = []
+
+    @op.task
+    async def notify(tx: ChannelSender, task_status: TaskStatus[None]):
+        task_status.started()
+
+        # Tasks are started once the connections are pre-warmed.
+        pool = NetboxClient.main()._http._transport._pool
+        connections.extend(pool.connections)
+
+    async with run_operator(op):
+        await sleep(0.5)
+
+    assert len(connections) >= 3
+
+
+async def test_request_priorities(settings: Settings):
+    settings.netbox_request_priorities = True
+    op = Operator(settings)
+    priorities = []
+
+    @op.task
+    async def notify(tx: ChannelSender, task_status: TaskStatus[None]):
+        task_status.started()
+
+        priorities.append(current_priority())
+        await tx.send(EventCustom(data="test"))
+
+    @op.on_custom
+    async def on_custom_event(data: str):
+        priorities.append(current_priority())
+
+    async with run_operator(op):
+        await sleep(0.5)
+
+    assert priorities == ["low", "high"]
+
+
+async def test_concurrent_controller(settings: Settings):
+    settings.controller_workers = 4
+    settings.controller_queue_depth = 2
+    op = Operator(settings)
+    processed = []
+    errors = []
+
+    @op.ordering_key
+    def ordering_key(event: ChannelEvent):
+        if not isinstance(event, EventCustom) or event.data == "invalid":
+            raise ValueError("No ordering key")
+
+        return event.data[0]
+
+    @op.task
+    async def notify(tx: ChannelSender, task_status: TaskStatus[None]):
+        task_status.started()
+
+        async with create_task_group() as tg:
+            for data in ["a1", "b1", "a2", "b2"]:
+                tg.start_soon(tx.clone().send, EventCustom(data=data))
+                await sleep(0.01)
+
+        try:
+            await tx.send(EventCustom(data="invalid"))
+
+        except ValueError as err:
+            errors.append(str(err))
+
+    @op.on_custom
+    async def on_custom_event(data: str):
+        if data.endswith("1"):
+            await sleep(0.1)
+
+        processed.append(data)
+
+    async with run_operator(op):
+        await sleep(0.5)
+
+    # The slow handler of `a1` did not delay `b1`.
+    assert processed == ["a1", "a2", "b1", "b2"]
+    assert errors == ["No ordering key"]
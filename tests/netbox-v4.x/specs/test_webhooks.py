@@ -1,5 +1,6 @@
 import pytest
 
+from pathlib import Path
 from threading import Event
 from anyio import to_thread
 
@@ -101,3 +102,94 @@ async def test_callbacks(settings: Settings, netbox_client: HttpClient):
         assert await to_thread.run_sync(delete_region_event.wait, 5.0), (
             "Delete region event not received"
         )
+
+
+async def test_durable_event_queue(
+    settings: Settings,
+    netbox_client: HttpClient,
+    tmp_path: Path,
+):
+    settings.event_queue_path = str(tmp_path / "events.db")
+    settings.controller_workers = 4
+    op = Operator(settings)
+
+    create_site_event = Event()
+
+    @op.on_create("dcim.site")
+    async def on_create_site(payload: WebhookPayload):
+        create_site_event.set()
+
+    async with run_operator(op):
+        resp = await netbox_client.post(
+            "/api/dcim/sites/",
+            json={"name": "Queued Site", "slug": "queued-site", "status": "planned"},
+        )
+        resp.raise_for_status()
+        obj_id = resp.json()["id"]
+        assert await to_thread.run_sync(create_site_event.wait, 5.0), (
+            "Create site event not received"
+        )
+
+        resp = await netbox_client.delete(f"/api/dcim/sites/{obj_id}/")
+        resp.raise_for_status()
+
+
+async def test_coalesced_updates(settings: Settings, netbox_client: HttpClient):
+    settings.server_async_ack = True
+    settings.controller_coalesce_window = 2.0
+    op = Operator(settings)
+
+    updates: list[WebhookPayload] = []
+    update_site_event = Event()
+    delete_site_event = Event()
+
+    @op.on_update("dcim.site")
+    async def on_update_site(payload: WebhookPayload):
+        updates.append(payload)
+        update_site_event.set()
+
+    @op.on_delete("dcim.site")
+    async def on_delete_site(payload: WebhookPayload):
+        delete_site_event.set()
+
+    async with run_operator(op):
+        resp = await netbox_client.post(
+            "/api/dcim/sites/",
+            json={"name": "Coalesced Site", "slug": "coalesced-site"},
+        )
+        resp.raise_for_status()
+        obj_id = resp.json()["id"]
+
+        for description in ["first", "second"]:
+            resp = await netbox_client.patch(
+                f"/api/dcim/sites/{obj_id}/",
+                json={"description": description},
+            )
+            resp.raise_for_status()
+
+        assert await to_thread.run_sync(update_site_event.wait, 5.0), (
+            "Update site event not received"
+        )
+
+        # Both updates were merged into a single event.
+        assert len(updates) == 1
+        assert updates[0].snapshots.prechange["description"] == ""
+        assert updates[0].snapshots.postchange["description"] == "second"
+
+        # The pending update is cancelled by the deletion.
+        update_site_event.clear()
+        resp = await netbox_client.patch(
+            f"/api/dcim/sites/{obj_id}/",
+            json={"description": "third"},
+        )
+        resp.raise_for_status()
+
+        resp = await netbox_client.delete(f"/api/dcim/sites/{obj_id}/")
+        resp.raise_for_status()
+
+        assert await to_thread.run_sync(delete_site_event.wait, 5.0), (
+            "Delete site event not received"
+        )
+
+        assert not await to_thread.run_sync(update_site_event.wait, 3.0)
+        assert len(updates) == 1